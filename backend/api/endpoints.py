@@ -1,7 +1,9 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, UploadFile, File
+from fastapi.responses import JSONResponse
 from typing import List, Optional
 from backend.core.models import Zone, Event, Track
 from backend.perception.orchestrator import PerceptionOrchestrator
+from backend.core.zone_store import ZoneStore
 import json
 import os
 import time
@@ -19,6 +21,7 @@ class ChatRequest(BaseModel):
 
 # Global orchestrator instance (simple singleton for MVP)
 orchestrator = PerceptionOrchestrator()
+zone_store = ZoneStore()
 
 class ConnectionManager:
     """Manages WebSocket connections"""
@@ -78,6 +81,13 @@ orchestrator.set_callback(system_callback)
 @router.on_event("startup")
 async def startup_event():
     asyncio.create_task(manager.process_queue())
+    # Persisted zones -> precompiled, versioned zone sets
+    try:
+        records, version = zone_store.load_all()
+        orchestrator.load_zones(records, version)
+        logger.info(f"Loaded {len(records)} zones (v{version})")
+    except Exception as e:
+        logger.error(f"Zone load failed: {e}")
 
 @router.post("/start")
 async def start_perception(source: str = "0", simulation: bool = False):
@@ -178,6 +188,8 @@ async def get_telemetry():
             "recording_status": "Active" if orchestrator.recording else "Standby",
             "active_use_case": orchestrator.use_case,
             "sahi_status": "Enabled" if orchestrator.detector.use_sahi else "Disabled",
+            "pipeline": orchestrator.get_pipeline_stats(),
+            "sensors": orchestrator.get_sensor_stats(),
             "station": {
                 "id": "STATION-Z01",
                 "name": "Command Station Alpha",
@@ -254,13 +266,48 @@ async def video_feed():
     return StreamingResponse(generate(), media_type="multipart/x-mixed-replace; boundary=frame")
 
 @router.get("/zones", response_model=List[Zone])
-async def get_zones():
-    return orchestrator.zone_engine.zones
+async def get_zones(stream: Optional[str] = None):
+    # Serialized once per zone set version
+    zone_set = orchestrator.get_zone_set(stream)
+    if zone_set is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": f"Unknown stream {stream}"})
+    return JSONResponse(zone_set.to_json(), headers={"X-Zones-Version": str(zone_set.version)})
 
 @router.post("/zones")
-async def create_zone(zone: Zone):
-    orchestrator.zone_engine.add_zone(zone)
-    return {"status": "added", "zone": zone}
+async def create_zone(zone: Zone, stream: Optional[str] = None):
+    if zone.id in orchestrator.zone_records:
+        return {"status": "error", "message": f"Zone {zone.id} already exists, use PUT /zones/{zone.id}"}
+    try:
+        version = zone_store.save(zone, stream)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    version = orchestrator.add_zone(zone, stream=stream, version=version)
+    return {"status": "added", "zone": zone, "version": version}
+
+@router.put("/zones/{zone_id}")
+async def update_zone(zone_id: str, zone: Zone, stream: Optional[str] = None):
+    if zone_id not in orchestrator.zone_records or zone.id != zone_id:
+        return {"status": "error", "message": f"Unknown zone {zone_id}"}
+    try:
+        version = zone_store.save(zone, stream)
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    version = orchestrator.add_zone(zone, stream=stream, version=version)
+    return {"status": "updated", "zone": zone, "version": version}
+
+@router.delete("/zones/{zone_id}")
+async def delete_zone(zone_id: str):
+    if zone_id not in orchestrator.zone_records:
+        return {"status": "error", "message": f"Unknown zone {zone_id}"}
+    try:
+        version = zone_store.delete(zone_id)
+        if version is None:
+            # Zone was never persisted: still advance the stored counter so both versions agree
+            version = zone_store.bump()
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    version = orchestrator.remove_zone(zone_id, version=version)
+    return {"status": "deleted", "zone_id": zone_id, "version": version}
 
 @router.post("/ziva/chat")
 async def ziva_chat(request: ChatRequest):
@@ -331,20 +378,46 @@ async def upload_custom_model(file: UploadFile = File(...)):
     model_dir = "backend/data/models/custom"
     os.makedirs(model_dir, exist_ok=True)
     
-    path = f"{model_dir}/{file.filename}"
+    # Both paths come from one plain file name: nothing in the upload name can leave model_dir
+    filename = os.path.basename(file.filename or "")
+    if filename != file.filename or "\\" in filename or not filename.endswith(".pt") or filename.startswith("."):
+        return JSONResponse(status_code=400, content={"status": "error", "message": "Expected a plain .pt file name"})
+    path = f"{model_dir}/{filename}"
+    staging_dir = f"{model_dir}/staging"
+    os.makedirs(staging_dir, exist_ok=True)
+    staged = f"{staging_dir}/{filename}"
     
+    if orchestrator.model_swapper.busy:
+        return JSONResponse(status_code=409, content={"status": "error", "message": "A model swap is already in progress"})
+
     try:
-        with open(path, "wb") as buffer:
+        # The installed weights stay untouched until the swapped-in upload passed probation
+        with open(staged, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
             
-        # Trigger hot-reload in Orchestrator (Mock for now, real logic in V2.3)
-        # orchestrator.detector.load_model(path)
+        # Hot-swap: load + shadow-validate in the background, swap between frames
+        if not orchestrator.model_swapper.submit(staged, install_path=path):
+            os.remove(staged)
+            return JSONResponse(status_code=409, content={"status": "error", "message": "A model swap is already in progress"})
         logger.info(f"Custom Model Uploaded: {path}")
         
-        return {"status": "deployed", "model_path": path, "message": "Neural Engine Updated"}
+        return {"status": "loading", "model_path": path, "message": "Neural Engine loading, poll /models/status"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@router.get("/models/status")
+async def get_model_status():
+    """Hot-swap state, swap time and before/after inference throughput"""
+    return orchestrator.model_swapper.get_status()
+
+@router.post("/models/rollback")
+async def rollback_model():
+    """Restore the previous model while the swapped-in one is still on probation"""
+    if orchestrator.model_swapper.rollback():
+        # Applied by the inference stage at the next frame boundary
+        return {"status": "rollback_requested"}
+    return {"status": "error", "message": "No previous model to roll back to"}
+
 @router.get("/sentry/discover")
 async def discover_legacy_streams():
     """Scan local network for Analog DVRs and IP cameras (Simulated)"""
@@ -9,7 +9,74 @@ class Settings(BaseSettings):
     # AI / Perception Config
     MODEL_PATH: str = "yolov8n.pt"  # Default to nano for speed
     CONFIDENCE_THRESHOLD: float = 0.3
+    POSE_MODEL_PATH: str = "yolov8n-pose.pt"
+    POSE_MODE: str = "cascade"  # cascade: detector + pose on person crops | full: pose model replaces the detector
+    POSE_MAX_CROPS: int = 8  # Person crops per frame sent to the pose model
+    POSE_REFRESH_INTERVAL: float = 1.0  # Seconds before a track's skeleton is refreshed anyway
+    INFERENCE_BACKEND: str = "torch"  # torch | onnx | openvino | onnx_int8 (exports cached under DATA_DIR/model_cache)
+    INT8_USE_CASES: str = ""  # Comma-separated use cases served by the INT8 model, e.g. "perimeter,traffic"
+    INT8_CALIBRATION_VIDEO: str = "mall_theft.mp4"  # Local footage sampled for INT8 calibration
+    INT8_CALIBRATION_FRAMES: int = 64
+
+    # Model Cache (warm models shared across use-case switches)
+    MODEL_CACHE_SIZE: int = 3  # Loaded models kept in the LRU cache
+    MODEL_CACHE_MAX_MB: float = 1024.0  # Estimated memory cap for cached models
+    PREWARM_MODELS: str = "yolov8n.pt,yolov8n-pose.pt"  # Loaded at startup; "path" or "path:backend"
+
+    # Perception Pipeline (capture -> inference -> analysis -> render)
+    PIPELINE_QUEUE_SIZE: int = 2
+    PIPELINE_DROP_POLICY: str = "drop_oldest"  # drop_oldest | drop_newest | block
+    PIPELINE_FILE_DROP_POLICY: str = "block"  # Files are prefetched without loss
+
+    # Sensor Capture
+    THREADED_CAPTURE: bool = True  # Background grabber per VideoSensor
+    CAPTURE_BUFFER_SIZE: int = 4  # Ring buffer slots per grabber
+    CAPTURE_FPS_LIMIT: int = 30  # Frames delivered per second per sensor (0 = unlimited)
+    FILE_PLAYBACK_REALTIME: bool = True  # Pace files to container PTS; False = offline, as fast as possible
+    SIM_FRAME_SKIP: int = 0  # Frames skipped (grab() only, no decode) between reads in simulation
+    VIDEO_BACKEND: str = "opencv"  # opencv | ffmpeg (decode-time scaling via ffmpeg subprocess)
+    FFMPEG_THREADS: int = 0  # ffmpeg decoder threads (0 = auto)
+    CAPTURE_PROCESSES: bool = False  # One capture process per sensor, frames via shared memory
+    SHM_RING_SLOTS: int = 16  # Frame slots per shared-memory ring
+
+    # Detector Cadence (base interval; the adaptive scheduler moves around it)
+    DETECTOR_INTERVAL: int = 1  # Live sources: run the detector every Nth frame
+    SIM_DETECTOR_INTERVAL: int = 8  # Simulation: run the detector every Nth frame
+    ADAPTIVE_SCHEDULER: bool = True  # Adjust cadence from measured latency and scene activity
+    TARGET_LATENCY_MS: float = 150.0  # End-to-end budget, capture -> analysis
+    TARGET_DISPLAY_FPS: float = 30.0
+    SCHEDULER_MAX_INTERVAL: int = 15
+    SCHEDULER_IDLE_INTERVAL: int = 6  # Cadence when no objects are tracked
+    SCHEDULER_FAST_SPEED: float = 400.0  # Display px/s above which tracks count as fast
+    SCHEDULER_ALERT_HOLD: float = 5.0  # Seconds an engine alert keeps the detector on every frame
+    OPTICAL_FLOW_PROPAGATION: bool = True  # Move boxes with Lucas-Kanade flow between detector frames
+
+    # Detection-Level Tracking
+    TRACKER_TYPE: str = "centroid"  # centroid | bytetrack (Kalman + IoU + lapjv; faster than centroid only in dense scenes)
+    TRACK_LOW_THRESH: float = 0.1  # Detections down to this score may extend existing tracks (new tracks need CONFIDENCE_THRESHOLD)
+    TRACK_MATCH_IOU: float = 0.2  # Minimum IoU between a predicted track box and its detection
+    TRACK_BUFFER: int = 40  # Detector updates a lost track is kept for re-association
+
+    # Motion-Gated Inference (MOG2 pre-filter per stream)
+    MOTION_GATING: bool = False  # Skip the detector on static scenes, infer only changed regions
+    MOTION_GATE_MIN_AREA: float = 0.002  # Foreground share of the frame that counts as motion
+    MOTION_GATE_HOLD_FRAMES: int = 5  # Keep inferring this many frames after motion stops
+    MOTION_GATE_REFRESH_FRAMES: int = 30  # Forced full-frame pass on static scenes (stationary objects)
     
+    # Adaptive SAHI Slicing (industrial mode; tiles planned per camera)
+    SAHI_SLICE_SIZE: int = 640  # Tile edge in AI proxy pixels
+    SAHI_OVERLAP: float = 0.2  # Overlap between neighbouring tiles
+    SAHI_CAMERA_TILES: str = ""  # Per-camera overrides, comma-separated "source:size:overlap" (source as passed to /start or pool:)
+    SAHI_ADAPTIVE: bool = True  # Run only tiles with motion or recent detections; False = every tile
+    SAHI_FULL_SWEEP_INTERVAL: int = 10  # Every Nth SAHI frame runs all tiles (objects that appear without motion)
+    SAHI_MOTION_MIN_AREA: float = 0.002  # Changed-pixel share of a tile that counts as motion
+    SAHI_TILE_REUSE: bool = True  # Tiles unchanged since their last inference reuse its detections
+
+    # Zone Events (per track and zone: enter, dwell, exit)
+    ZONE_DWELL_SECONDS: float = 10.0  # Time inside a zone before a dwell event
+    ZONE_EXIT_GRACE: float = 1.0  # Seconds outside before an exit counts (absorbs missed detections)
+    ZONE_EVENT_COOLDOWN: float = 30.0  # Re-entering the same zone within this window raises no event
+
     # Data Storage
     DATA_DIR: str = "backend/data"
     DATABASE_URL: Optional[str] = None
@@ -34,3 +34,12 @@ class ZoneModel(Base):
     type = Column(String)
     points_json = Column(Text) # Stored as JSON string
     active = Column(Boolean, default=True)
+    disallowed_json = Column(Text, nullable=True) # ObjectType values, JSON list
+    stream = Column(String, nullable=True) # Stream id (camera source) of a pooled stream; NULL = all streams
+    version = Column(Integer, default=0) # Zone set version of the last write
+
+class ZoneVersionModel(Base):
+    __tablename__ = "zone_versions"
+
+    id = Column(Integer, primary_key=True) # Single row, id 1
+    version = Column(Integer, default=0) # Bumped by every zone save and delete
@@ -0,0 +1,98 @@
+import json
+import logging
+from typing import List, Optional, Tuple
+from backend.core.database import SessionLocal
+from backend.core.models import Zone, Point, ObjectType
+from backend.core.sql_models import ZoneModel, ZoneVersionModel
+
+logger = logging.getLogger(__name__)
+
+class ZoneStore:
+    """
+    Zones persisted in the zones table. Rows are (Zone, stream id) pairs; stream None applies to every camera.
+
+    The zone set version is a counter kept in its own row (zone_versions) and bumped in
+    the same transaction as every save and delete, so it never goes back, also not when
+    the zone written last is deleted.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _to_zone(row: ZoneModel) -> Zone:
+        disallowed = json.loads(row.disallowed_json) if row.disallowed_json else None
+        return Zone(
+            id=row.id,
+            name=row.name,
+            type=row.type,
+            polygon=[Point(x=x, y=y) for x, y in json.loads(row.points_json or "[]")],
+            active=bool(row.active),
+            **({"disallowed_types": [ObjectType(d) for d in disallowed]} if disallowed is not None else {})
+        )
+
+    @staticmethod
+    def _counter(db) -> ZoneVersionModel:
+        counter = db.get(ZoneVersionModel, 1)
+        if counter is None:
+            # Databases from before the counter row: continue after the newest zone row
+            latest = max((v or 0 for (v,) in db.query(ZoneModel.version)), default=0)
+            counter = ZoneVersionModel(id=1, version=latest)
+            db.add(counter)
+        return counter
+
+    @classmethod
+    def _bump(cls, db) -> int:
+        counter = cls._counter(db)
+        counter.version = (counter.version or 0) + 1
+        return counter.version
+
+    @staticmethod
+    def _fill_row(row: ZoneModel, zone: Zone, stream: Optional[str], version: int):
+        row.name = zone.name
+        row.type = zone.type.value
+        row.points_json = json.dumps([[p.x, p.y] for p in zone.polygon])
+        row.active = zone.active
+        row.disallowed_json = json.dumps([d.value for d in zone.disallowed_types])
+        row.stream = stream
+        row.version = version
+
+    def load_all(self) -> Tuple[List[Tuple[Zone, Optional[str]]], int]:
+        """All stored zones and the current zone set version"""
+        with self.session_factory() as db:
+            records = []
+            for row in db.query(ZoneModel).all():
+                try:
+                    records.append((self._to_zone(row), row.stream))
+                except Exception as e:
+                    logger.error(f"Skipping unreadable zone {row.id}: {e}")
+            version = self._counter(db).version or 0
+        return records, version
+
+    def bump(self) -> int:
+        """Advance the zone set version for a change that wrote no zone row. Returns the new version."""
+        with self.session_factory() as db:
+            version = self._bump(db)
+            db.commit()
+            return version
+
+    def save(self, zone: Zone, stream: Optional[str]) -> int:
+        """Insert or update one zone. Returns the new zone set version."""
+        with self.session_factory() as db:
+            version = self._bump(db)
+            row = db.get(ZoneModel, zone.id) or ZoneModel(id=zone.id)
+            self._fill_row(row, zone, stream, version)
+            db.add(row)
+            db.commit()
+            return version
+
+    def delete(self, zone_id: str) -> Optional[int]:
+        """Remove one zone. Returns the new zone set version, None if the zone is not stored."""
+        with self.session_factory() as db:
+            row = db.get(ZoneModel, zone_id)
+            if row is None:
+                return None
+            version = self._bump(db)
+            db.delete(row)
+            db.commit()
+            return version
@@ -5,11 +5,12 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.core.config import settings
-from backend.core.database import engine, Base
+from backend.core.database import engine, Base, ensure_columns
 from backend.core.sql_models import *
 
 # Create Tables
 Base.metadata.create_all(bind=engine)
+ensure_columns(ZoneModel)
 
 # Configure logging
 logging.basicConfig(
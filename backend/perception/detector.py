@@ -2,9 +2,12 @@ from ultralytics import YOLO
 import logging
 import cv2
 import numpy as np
+from typing import Optional
 from backend.core.config import settings
-from backend.perception.tracker import CentroidTracker
-from backend.perception.engines.sahi import AdvancedDetector
+from backend.perception.tracker import CentroidTracker, ByteTracker
+from backend.perception.model_registry import ModelRegistry
+from backend.perception.pose_cascade import PoseCascade
+from backend.perception.slice_planner import SlicePlanner
 from backend.perception.engines.traffic import TrafficEngine
 from backend.perception.engines.security import SecurityEngine
 from backend.perception.engines.industrial import IndustrialEngine
@@ -56,32 +59,131 @@ class MotionDetector:
                 return annotated
         return MotionResults(tracks, frame)
 
+class MotionGate:
+    """
+    Cheap MOG2 pre-filter in front of the detector (one per camera stream).
+    Foreground-mask statistics on a downscaled frame decide whether the full
+    model runs at all; when it does, the changed region (grown to cover the
+    boxes already being tracked) is returned so only that crop is inferred.
+    """
+    def __init__(self, min_area_ratio: float = 0.002, hold_frames: int = 5, refresh_frames: int = 30,
+                 roi_padding: int = 32, max_roi_ratio: float = 0.6, downscale: int = 4):
+        self.bg_subtractor = cv2.createBackgroundSubtractorMOG2(history=300, varThreshold=25, detectShadows=False)
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self.min_area_ratio = min_area_ratio    # Foreground share that counts as motion
+        self.hold_frames = hold_frames          # Keep inferring briefly after motion stops
+        self.refresh_frames = refresh_frames    # Forced full-frame pass for stationary objects
+        self.roi_padding = roi_padding
+        self.max_roi_ratio = max_roi_ratio      # Larger changed regions run on the full frame
+        self.downscale = max(1, downscale)
+
+        self.hold = 0
+        self.since_run = 0
+        self.frames_seen = 0
+        self.frames_gated = 0
+        self.frames_cropped = 0
+        self.fg_ratio = 0.0
+
+    def evaluate(self, frame, prior_boxes=()):
+        """
+        Returns (run, roi). run=False means the scene is static and inference can
+        be skipped; roi is (x1, y1, x2, y2) in frame pixels, or None for the full frame.
+        """
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (w // self.downscale, h // self.downscale), interpolation=cv2.INTER_AREA)
+        fg_mask = self.bg_subtractor.apply(small)
+        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, self.kernel)
+
+        self.frames_seen += 1
+        self.fg_ratio = cv2.countNonZero(fg_mask) / fg_mask.size
+        moving = self.fg_ratio >= self.min_area_ratio
+        if moving:
+            self.hold = self.hold_frames
+        elif self.hold > 0:
+            self.hold -= 1
+
+        self.since_run += 1
+        if not moving and self.hold == 0 and self.since_run < self.refresh_frames:
+            self.frames_gated += 1
+            return False, None
+
+        self.since_run = 0
+        if not moving:
+            return True, None
+
+        # Changed region in full-resolution pixels, grown to keep current tracks in view
+        x, y, bw, bh = cv2.boundingRect(fg_mask)
+        x1, y1 = x * self.downscale, y * self.downscale
+        x2, y2 = (x + bw) * self.downscale, (y + bh) * self.downscale
+        for bx1, by1, bx2, by2 in prior_boxes:
+            x1, y1 = min(x1, bx1), min(y1, by1)
+            x2, y2 = max(x2, bx2), max(y2, by2)
+
+        pad = self.roi_padding
+        x1, y1 = max(0, int(x1) - pad), max(0, int(y1) - pad)
+        x2, y2 = min(w, int(x2) + pad), min(h, int(y2) + pad)
+        if (x2 - x1) * (y2 - y1) > self.max_roi_ratio * w * h:
+            return True, None
+
+        self.frames_cropped += 1
+        return True, (x1, y1, x2, y2)
+
+    def get_stats(self):
+        return {
+            "frames_seen": self.frames_seen,
+            "frames_gated": self.frames_gated,
+            "frames_cropped": self.frames_cropped,
+            "gated_ratio": round(self.frames_gated / self.frames_seen, 3) if self.frames_seen else 0.0,
+            "fg_ratio": round(self.fg_ratio, 4)
+        }
+
 class ObjectDetector:
+    ENGINE_CLASSES = {
+        "traffic": TrafficEngine,
+        "security": SecurityEngine,
+        "industrial": IndustrialEngine,
+        "mall_cctv": MallSecurityEngine,
+        "perimeter": PerimeterSecurityEngine,
+        "general": None
+    }
+
     def __init__(self, model_path: str = settings.MODEL_PATH):
         logger.info(f"Loading Advanced YOLO model with SAHI support...")
         try:
-            self.advanced_model = AdvancedDetector(model_path)
+            # Warm LRU cache: use-case switches reuse loaded models instead of rebuilding them
+            self.model_registry = ModelRegistry(
+                max_models=settings.MODEL_CACHE_SIZE,
+                max_memory_mb=settings.MODEL_CACHE_MAX_MB
+            )
+            self.advanced_model = self.model_registry.get(model_path, self.backend_for("general"))
+            self.model_registry.prewarm(self._prewarm_specs())
+            self.inference_errors = 0  # Failed model calls (watched by hot-swap probation)
             # INCREASED PERSISTENCE: 40 frames memory, 200px max move
-            self.tracker = CentroidTracker(max_disappeared=40, max_distance=200)
+            self.tracker = self.create_tracker()
             self.names = self.advanced_model.model.names
             self.motion_detector = MotionDetector()
             
             # Engine Registry
-            self.engines = {
-                "traffic": TrafficEngine(),
-                "security": SecurityEngine(),
-                "industrial": IndustrialEngine(),
-                "mall_cctv": MallSecurityEngine(),
-                "perimeter": PerimeterSecurityEngine(),
-                "general": None
-            }
+            self.engines = {name: self.create_engine(name) for name in self.ENGINE_CLASSES}
             self.active_engine = self.engines["general"]
             self.use_sahi = False
+            self.use_case = "general"
+            self.pose_cascade_active = False  # Mall cascade: pose on person crops after detection
             
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
             raise e
 
+    @property
+    def advanced_model(self):
+        return self._advanced_model
+
+    @advanced_model.setter
+    def advanced_model(self, model):
+        """The live model is pinned in the registry, so the LRU never evicts weights in use"""
+        self._advanced_model = model
+        self.model_registry.pin("active", model)
+
     def set_use_case(self, use_case: str):
         if use_case not in self.engines:
             logger.warning(f"Unknown use case: {use_case}")
@@ -91,78 +193,233 @@ class ObjectDetector:
         self.active_engine = self.engines[use_case]
         
         # Specialized Model Loading
+        model_path = self.advanced_model.model_path
         if use_case == "industrial":
             self.use_sahi = True
             logger.info("Industrial Mode: SAHI Enabled")
+        elif use_case == "mall_cctv" and settings.POSE_MODE == "cascade":
+            self.use_sahi = False
+            # Regular detector tracks people; pose runs on person crops only (see PoseCascade)
+            if self.advanced_model.is_pose:
+                model_path = "yolov8n.pt"
+            logger.info("Mall Mode: Pose cascade on person crops")
         elif use_case == "mall_cctv":
             self.use_sahi = False
             # Load Pose Model if not already loaded
-            if not str(self.advanced_model.model.ckpt_path).endswith("-pose.pt"):
+            if not self.advanced_model.is_pose:
                  logger.info("Mall Mode: Loading Pose Estimation Model...")
-                 self.advanced_model = AdvancedDetector("yolov8n-pose.pt")
+                 model_path = settings.POSE_MODEL_PATH
         else:
             self.use_sahi = False
             # Revert to standard model if currently using pose
-            if str(self.advanced_model.model.ckpt_path).endswith("-pose.pt"):
+            if self.advanced_model.is_pose:
                 logger.info("Reverting to Standard Object Detection Model...")
-                self.advanced_model = AdvancedDetector("yolov8n.pt")
-            self.use_sahi = False
+                model_path = "yolov8n.pt"
+
+        self.use_case = use_case
+        self.pose_cascade_active = use_case == "mall_cctv" and settings.POSE_MODE == "cascade"
+        backend = self.current_backend()
+        if (model_path, backend) != (self.advanced_model.model_path, self.advanced_model.requested_backend):
+            self.advanced_model = self.model_registry.get(model_path, backend)
+            self.names = self.advanced_model.model.names
+
+    def _prewarm_specs(self):
+        """(model_path, backend) pairs from PREWARM_MODELS; pose uses the mall_cctv backend"""
+        specs = []
+        for entry in settings.PREWARM_MODELS.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            model_path, _, backend = entry.partition(":")
+            if not backend:
+                backend = self.backend_for("mall_cctv" if model_path.endswith("-pose.pt") else "general")
+            specs.append((model_path, backend))
+        return specs
+
+    def current_backend(self) -> str:
+        """Backend the active use case's detector runs on (the mall cascade detector is a general one)"""
+        return self.backend_for("general" if self.pose_cascade_active else self.use_case)
+
+    @staticmethod
+    def backend_for(use_case: str) -> str:
+        """Use cases listed in INT8_USE_CASES trade a little accuracy for INT8 throughput"""
+        int8_cases = {u.strip() for u in settings.INT8_USE_CASES.split(",") if u.strip()}
+        return "onnx_int8" if use_case in int8_cases else settings.INFERENCE_BACKEND
+
+    def create_tracker(self):
+        """Fresh detection-level tracker (one per camera stream)"""
+        if settings.TRACKER_TYPE == "bytetrack":
+            return ByteTracker(
+                max_disappeared=settings.TRACK_BUFFER,
+                high_thresh=settings.CONFIDENCE_THRESHOLD,
+                low_thresh=settings.TRACK_LOW_THRESH,
+                match_thresh=1.0 - settings.TRACK_MATCH_IOU
+            )
+        return CentroidTracker(max_disappeared=40, max_distance=200)
+
+    def _detection_conf(self, conf: float, trackers) -> float:
+        """
+        Score threshold for the model call. Trackers that associate low-confidence
+        detections (ByteTracker) need to see them.
+        """
+        return min([conf] + [getattr(t, 'low_thresh', conf) for t in trackers])
+
+    def create_engine(self, use_case: str):
+        """Fresh engine instance with its own state (one per camera stream)"""
+        engine_cls = self.ENGINE_CLASSES.get(use_case)
+        return engine_cls() if engine_cls else None
+
+    def create_pose_cascade(self) -> PoseCascade:
+        """Per-stream pose stage; the pose model itself is shared through the registry"""
+        return PoseCascade(
+            lambda: self.model_registry.get(settings.POSE_MODEL_PATH, self.backend_for("mall_cctv")),
+            max_crops=settings.POSE_MAX_CROPS,
+            refresh_interval=settings.POSE_REFRESH_INTERVAL
+        )
 
-    def track(self, frame, conf: float = settings.CONFIDENCE_THRESHOLD, mode="yolo"):
+    def create_motion_gate(self):
+        """Fresh MOG2 inference gate (one per camera stream)"""
+        return MotionGate(
+            min_area_ratio=settings.MOTION_GATE_MIN_AREA,
+            hold_frames=settings.MOTION_GATE_HOLD_FRAMES,
+            refresh_frames=settings.MOTION_GATE_REFRESH_FRAMES
+        )
+
+    @staticmethod
+    def _sahi_camera_tiles(camera: str):
+        """(slice_size, overlap) override for a camera source (stream id) from SAHI_CAMERA_TILES, or None"""
+        for entry in settings.SAHI_CAMERA_TILES.split(","):
+            parts = entry.strip().rsplit(":", 2)
+            if len(parts) != 3 or parts[0] != camera:
+                continue
+            try:
+                return int(parts[1]), float(parts[2])
+            except ValueError:
+                logger.warning(f"Ignoring malformed SAHI_CAMERA_TILES entry: {entry.strip()}")
+        return None
+
+    def create_slice_planner(self, camera: str = "") -> SlicePlanner:
+        """Fresh SAHI tile planner (one per camera stream); tile geometry may be overridden per camera source"""
+        slice_size, overlap = self._sahi_camera_tiles(camera) or (settings.SAHI_SLICE_SIZE, settings.SAHI_OVERLAP)
+        return SlicePlanner(
+            slice_size=slice_size,
+            overlap=overlap,
+            adaptive=settings.SAHI_ADAPTIVE,
+            full_sweep_interval=settings.SAHI_FULL_SWEEP_INTERVAL,
+            motion_threshold=settings.SAHI_MOTION_MIN_AREA,
+            reuse=settings.SAHI_TILE_REUSE
+        )
+
+    @staticmethod
+    def _crop(frame, roi):
+        if roi is None:
+            return frame, (0, 0)
+        x1, y1, x2, y2 = roi
+        return frame[y1:y2, x1:x2], (x1, y1)
+
+    def track(self, frame, conf: float = settings.CONFIDENCE_THRESHOLD, mode="yolo", tracker=None, roi=None,
+              planner: Optional[SlicePlanner] = None):
         if mode == "motion":
             return self.motion_detector.track(frame)
             
         try:
-            results = self.advanced_model.predict(frame, use_slicing=self.use_sahi, conf=conf)
-            
+            # SAHI tiles the full frame itself; crops only apply to plain inference
+            tracker = tracker or self.tracker
+            crop, offset = self._crop(frame, None if self.use_sahi else roi)
+            results = self.advanced_model.predict(crop, use_slicing=self.use_sahi,
+                                                  conf=self._detection_conf(conf, [tracker]),
+                                                  planner=planner if self.use_sahi else None)
+            return self._track_results(results, frame, tracker, offset)
+        except Exception as e:
+            self.inference_errors += 1
+            logger.error(f"Advanced tracking failed: {e}")
+            return self.motion_detector.track(frame)
+
+    def track_batch(self, frames: list, trackers: list, conf: float = settings.CONFIDENCE_THRESHOLD, rois: list = None,
+                    planners: list = None):
+        """
+        Run one batched inference call over N stream frames and update each
+        stream's own tracker. SAHI falls back to per-frame slicing, with each
+        stream's tiles chosen by its own planner.
+        Optional per-frame rois restrict inference to motion-gated crops.
+        """
+        rois = rois or [None] * len(frames)
+        if self.use_sahi:
+            planners = planners or [None] * len(frames)
+            return [self.track(f, conf=conf, tracker=t, planner=p) for f, t, p in zip(frames, trackers, planners)]
+
+        crops = [self._crop(f, roi) for f, roi in zip(frames, rois)]
+        try:
+            batch_results = self.advanced_model.predict_batch([c for c, _ in crops],
+                                                              conf=self._detection_conf(conf, trackers))
+        except Exception as e:
+            self.inference_errors += 1
+            logger.error(f"Batched inference failed: {e}")
+            return [self.track(f, conf=conf, tracker=t, roi=roi) for f, t, roi in zip(frames, trackers, rois)]
+
+        return [self._track_results(r, f, t, offset)
+                for r, f, t, (_, offset) in zip(batch_results, frames, trackers, crops)]
+
+    @staticmethod
+    def _gather_payloads(tracks, payloads):
+        """
+        Carry per-detection arrays (keypoints, confidences, embeddings, ...) to the
+        tracks matched this frame, using the tracker's det_idx: one gather per payload.
+        """
+        if not tracks:
+            return
+        det_idx = np.array([t.get('det_idx', -1) for t in tracks], dtype=int)
+        matched = np.flatnonzero(det_idx >= 0)
+        if len(matched) == 0:
+            return
+        for name, values in payloads.items():
+            if values is None:
+                continue
+            gathered = values[det_idx[matched]]
+            for i, value in zip(matched, gathered):
+                tracks[i][name] = value
+
+    def _track_results(self, results, frame, tracker, offset=(0, 0)):
+        try:
             # Process with custom tracker to maintain IDs
-            rects = []
-            labels = []
-            
-            # results might be YOLO native or SAHI wrapper
             if hasattr(results, 'boxes') and results.boxes:
-                for box in results.boxes:
-                    b = box.xyxy[0].cpu().numpy()
-                    cls = int(box.cls[0])
-                    label = self.names[cls]
-                    
-                    # Strict filtering for Mall Mode (People Only)
-                    if self.active_engine and getattr(self.active_engine, 'name', '') == 'Mall_Protector_V1':
-                        if label != 'person':
-                            continue
-
-                    rects.append(b)
-                    labels.append(label)
+                # One device->host copy per frame instead of one per box
+                xyxy = results.boxes.xyxy.cpu().numpy()
+                cls_ids = results.boxes.cls.cpu().numpy().astype(int)
+                confs = results.boxes.conf.cpu().numpy()
+            elif hasattr(results, 'detections'):
+                # Merged SAHI tiles: host arrays already in frame coordinates
+                xyxy, cls_ids, confs = results.xyxy, results.cls, results.conf
             elif hasattr(results, 'custom_tracks'):
-                # Already tracked by SAHI or motion, just pass through
+                # Already tracked by motion, just pass through
                 return results
+            else:
+                xyxy, cls_ids, confs = np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=int), np.zeros(0)
 
-            tracks = self.tracker.update(rects, labels)
-            
-            # Match keypoints to tracks if available
+            if offset != (0, 0) and len(xyxy):
+                # Crop coordinates -> frame coordinates
+                xyxy = xyxy + np.array([offset[0], offset[1], offset[0], offset[1]], dtype=xyxy.dtype)
+            labels = [self.names[c] for c in cls_ids]
+
+            # Strict filtering for Mall Mode (People Only)
+            keep = np.arange(len(labels))
+            if self.active_engine and getattr(self.active_engine, 'name', '') == 'Mall_Protector_V1':
+                keep = np.array([i for i, label in enumerate(labels) if label == 'person'], dtype=int)
+            rects = list(xyxy[keep])
+            labels = [labels[i] for i in keep]
+
+            tracks = tracker.update(rects, labels, confs[keep] if len(keep) else None)
+
+            # Per-detection payloads, aligned with rects (the tracker reports det_idx into rects)
+            payloads = {'confidence': confs[keep] if len(keep) else None}
             if hasattr(results, 'keypoints') and results.keypoints is not None:
                 raw_kpts = results.keypoints.data.cpu().numpy() # [N, 17, 3] (x,y,conf)
-                # Map based on index since rects were appended in order
-                # NOTE: This assumes CentroidTracker didn't reorder too much, but it creates new track objects.
-                # We need to map raw_rects[i] -> tracks.
-                
-                # A simple distance match is safer since tracker might drop/add
-                for track in tracks:
-                    tx, ty = track['centroid']
-                    best_dist = 9999
-                    best_idx = -1
-                    
-                    for i, rect in enumerate(rects):
-                        rx = (rect[0] + rect[2]) / 2
-                        ry = (rect[1] + rect[3]) / 2
-                        dist = ((tx-rx)**2 + (ty-ry)**2)**0.5
-                        if dist < best_dist:
-                            best_dist = dist
-                            best_idx = i
-                    
-                    if best_idx != -1 and best_dist < 50: # Threshold
-                        if best_idx < len(raw_kpts):
-                            track['keypoints'] = raw_kpts[best_idx]
+                if offset != (0, 0) and len(raw_kpts):
+                    raw_kpts = raw_kpts.copy()
+                    raw_kpts[:, :, 0] += offset[0]
+                    raw_kpts[:, :, 1] += offset[1]
+                payloads['keypoints'] = raw_kpts[keep] if len(keep) else None
+            self._gather_payloads(tracks, payloads)
             
             class TrackingResults:
                 def __init__(self, tracks, orig_img, names):
@@ -293,6 +550,7 @@ class ObjectDetector:
             return TrackingResults(tracks, frame, self.names)
 
         except Exception as e:
+            self.inference_errors += 1
             logger.error(f"Advanced tracking failed: {e}")
             return self.motion_detector.track(frame)
 
@@ -1,8 +1,11 @@
+import os
 import numpy as np
 import cv2
 from typing import List, Dict, Any, Optional, Tuple
 from ultralytics import YOLO
 import logging
+from backend.perception.model_export import export_model
+from backend.perception.slice_planner import SlicePlanner, slice_grid
 
 logger = logging.getLogger(__name__)
 
@@ -18,28 +21,20 @@ class SlicingDetector:
         self.slice_size = slice_size
         self.overlap = overlap
 
-    def detect(self, img: np.ndarray, conf: float = 0.25) -> List[Dict[str, Any]]:
-        h, w = img.shape[:2]
-        all_results = []
-        
-        # Calculate stride
-        stride = int(self.slice_size * (1 - self.overlap))
-        
-        slices = []
-        coords = []
-        
+    def detect(self, img: np.ndarray, conf: float = 0.25, tiles: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """tiles: (N, 4) x1, y1, x2, y2 to run; None runs the full grid"""
         # 1. Generate slices
-        for y in range(0, h - self.slice_size + stride, stride):
-            for x in range(0, w - self.slice_size + stride, stride):
-                # Clamp to image boundaries
-                y_end = min(y + self.slice_size, h)
-                x_end = min(x + self.slice_size, w)
-                y_start = max(0, y_end - self.slice_size)
-                x_start = max(0, x_end - self.slice_size)
-                
-                slice_img = img[y_start:y_end, x_start:x_end]
-                slices.append(slice_img)
-                coords.append((x_start, y_start))
+        if tiles is None:
+            h, w = img.shape[:2]
+            tiles = slice_grid(h, w, self.slice_size, self.overlap)
+        return self.merge(self.detect_tiles(img, conf, tiles))
+
+    def detect_tiles(self, img: np.ndarray, conf: float, tiles: np.ndarray) -> List[List[Dict[str, Any]]]:
+        """Detections per tile, projected to image coordinates but not yet merged"""
+        if len(tiles) == 0:
+            return []
+        slices = [img[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+        coords = [(int(x1), int(y1)) for x1, y1, _, _ in tiles]
 
         # 2. Run inference in batches if possible, or sequentially
         # For simplicity, we run a single call if chunks are small, 
@@ -47,9 +42,10 @@ class SlicingDetector:
         results = self.model(slices, conf=conf, verbose=False)
         
         # 3. Project results back to original image space
-        projected_boxes = []
+        per_tile = []
         for i, res in enumerate(results):
             x_off, y_off = coords[i]
+            projected_boxes = []
             if res.boxes:
                 for box in res.boxes:
                     b = box.xyxy[0].cpu().numpy()
@@ -63,11 +59,12 @@ class SlicingDetector:
                         'confidence': score,
                         'label': self.model.names[cls]
                     })
+            per_tile.append(projected_boxes)
+        return per_tile
 
+    def merge(self, per_tile: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
         # 4. Non-Maximum Suppression (NMS) on projected boxes
-        merged_results = self._nms(projected_boxes, iou_threshold=0.5)
-        
-        return merged_results
+        return self._nms([box for boxes in per_tile for box in boxes], iou_threshold=0.5)
 
     def _nms(self, boxes: List[Dict], iou_threshold: float) -> List[Dict]:
         if not boxes:
@@ -86,51 +83,71 @@ class SlicingDetector:
         return [boxes[i] for i in indices.flatten()]
 
 class AdvancedDetector:
-    """Wrapper that combines standard inference and SAHI optionally"""
-    def __init__(self, model_path: str):
-        self.model = YOLO(model_path)
+    """
+    Wrapper that combines standard inference and SAHI optionally.
+    backend selects the runtime: "torch" (default), or "onnx" / "openvino" which
+    load a cached export of the same weights; results keep the Ultralytics interface.
+    """
+    def __init__(self, model_path: str, backend: str = "torch"):
+        self.model_path = model_path  # Original .pt, used to identify the model (e.g. pose)
+        self.requested_backend = backend
+        self.backend = backend
+        self.is_pose = os.path.basename(model_path).endswith("-pose.pt")
+
+        runtime_path = export_model(model_path, backend) if backend != "torch" else model_path
+        if runtime_path == model_path:
+            self.backend = "torch"
+        self.model = YOLO(runtime_path, task="pose" if self.is_pose else "detect")
         self.slicer = SlicingDetector(self.model)
+        logger.info(f"Loaded {model_path} ({self.backend})")
 
-    def predict(self, frame: np.ndarray, use_slicing: bool = False, conf: float = 0.25):
+    def predict(self, frame: np.ndarray, use_slicing: bool = False, conf: float = 0.25,
+                planner: Optional[SlicePlanner] = None):
         if not use_slicing:
             return self.model(frame, conf=conf, verbose=False)[0]
         
         # Run SAHI
-        sahi_results = self.slicer.detect(frame, conf=conf)
+        if planner is None:
+            sahi_results = self.slicer.detect(frame, conf=conf)
+        else:
+            # Only the planned tiles are inferred; unchanged tiles contribute their cached detections
+            tiles = planner.plan(frame, model=self)  # Tile cache is per model
+            planner.record(self.slicer.detect_tiles(frame, conf, tiles))
+            sahi_results = self.slicer.merge(planner.tile_results())
+            planner.observe([r['bbox'] for r in sahi_results])
         return self._wrap_sahi_results(sahi_results, frame)
 
+    def predict_batch(self, frames: List[np.ndarray], conf: float = 0.25, imgsz: Optional[int] = None):
+        """Single batched forward pass over frames from several streams (or crops)"""
+        if not frames:
+            return []
+        if imgsz:
+            return self.model(frames, conf=conf, imgsz=imgsz, verbose=False)
+        return self.model(frames, conf=conf, verbose=False)
+
     def _wrap_sahi_results(self, results: List[Dict], frame: np.ndarray):
-        """Convert SAHI dicts into a structure compatible with the orchestrator"""
-        class SAHIWrapper:
+        """
+        Merged SAHI detections as host arrays in frame coordinates (xyxy, cls, conf).
+        Untracked: ObjectDetector feeds them to the stream's tracker for IDs.
+        """
+        class SAHIResults:
             def __init__(self, results, orig_img, names):
-                self.custom_tracks = []
+                self.detections = results
                 self.orig_img = orig_img
                 self.names = names
                 self.boxes = [] # Placeholder to avoid index errors
-                
-                for i, r in enumerate(results):
-                    self.custom_tracks.append({
-                        'box': r['bbox'],
-                        'label': r['label'],
-                        'id': i + 1000, # Offset to avoid collision with standard tracker IDs
-                        'disappeared': 0,
-                        'centroid': [int((r['bbox'][0]+r['bbox'][2])/2), int((r['bbox'][1]+r['bbox'][3])/2)]
-                    })
+                self.xyxy = np.array([r['bbox'] for r in results], dtype=np.float32).reshape(-1, 4)
+                self.cls = np.array([r['class'] for r in results], dtype=int)
+                self.conf = np.array([r['confidence'] for r in results], dtype=np.float32)
             
             def plot(self):
-                # Custom plotting for SAHI results
+                # Custom plotting for raw SAHI detections
                 annotated = self.orig_img.copy()
-                for t in self.custom_tracks:
-                    x1, y1, x2, y2 = map(int, t['box'])
-                    status = t.get('status', 'normal')
-                    color = (0, 0, 255) if status == 'suspicious' else (0, 255, 255) # Red if sus, else Cyan
-                    
-                    cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 2)
-                    label = f"SAHI:{t['label']}"
-                    if status == 'suspicious': label += " [SUSPICIOUS]"
-                    
-                    cv2.putText(annotated, label, (x1, y1-10), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1)
+                for r in self.detections:
+                    x1, y1, x2, y2 = map(int, r['bbox'])
+                    cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 255, 255), 2)
+                    cv2.putText(annotated, f"SAHI:{r['label']}", (x1, y1-10), 
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
                 return annotated
 
-        return SAHIWrapper(results, frame, self.model.names)
+        return SAHIResults(results, frame, self.model.names)
@@ -0,0 +1,228 @@
+import os
+import time
+import select
+import shutil
+import threading
+import subprocess
+import logging
+import numpy as np
+from typing import Tuple, Optional, Dict, Any, List
+from backend.perception.sensor import VideoSensor, VideoSensorConfig, FrameGrabber
+
+logger = logging.getLogger(__name__)
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+class FFmpegVideoSensor(VideoSensor):
+    """
+    VideoSensor backed by an ffmpeg subprocess.
+    The decoder scales straight to the display and proxy resolutions, so 1080p/4K
+    feeds never materialise at full size in Python. Both outputs are stacked into
+    one rawvideo BGR frame:
+
+        +---------------------------+
+        | display (W x H)           |
+        +--------------+------------+
+        | proxy (w x h)| padding    |
+        +--------------+------------+
+
+    Each frame is read straight from the pipe into a preallocated numpy slot.
+    Slots are recycled round-robin (the grabber keeps decoding while the pipeline
+    still holds earlier frames), so read()/read_scaled() hand out copies: the one
+    memcpy per frame at the capture boundary replaces a per-frame allocation.
+
+    ffmpeg reports a bad source only by exiting, so connect() waits for the first
+    frame (or the exit) for up to connect_timeout. When a running decoder exits,
+    it is respawned after a backoff that doubles per failed restart up to
+    max_backoff, so a dead source does not busy-loop.
+    """
+
+    def __init__(self, config: VideoSensorConfig, ring_slots: int = 16, connect_timeout: float = 10.0,
+                 max_backoff: float = 5.0):
+        super().__init__(config)
+        self.proc: Optional[subprocess.Popen] = None
+        self.connect_timeout = connect_timeout
+        self.max_backoff = max_backoff
+        self.restarts = 0
+        self._failures = 0  # Consecutive restarts of decoders that died young
+        self._spawned_at = 0.0
+        self._primed = False  # First frame read by connect() waits in the current ring slot
+        self._stop = threading.Event()
+
+        dw, dh = config.display_size
+        pw, ph = config.proxy_size
+        self.canvas_w = max(dw, pw)
+        self.canvas_h = dh + ph
+        self.frame_bytes = self.canvas_w * self.canvas_h * 3
+
+        # Preallocated ring of frame slots; the grabber buffers views into these
+        self.ring = np.empty((max(ring_slots, config.buffer_size + 8), self.canvas_h, self.canvas_w, 3), dtype=np.uint8)
+        self.ring_idx = 0
+
+    def _build_command(self) -> List[str]:
+        source = str(self.config.source)
+        dw, dh = self.config.display_size
+        pw, ph = self.config.proxy_size
+
+        cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin", "-threads", str(self.config.decoder_threads)]
+        if source.isdigit():
+            # Local webcam (V4L2 on Linux edge boxes)
+            self.is_webcam = True
+            cmd += ["-f", "v4l2", "-i", f"/dev/video{source}"]
+        else:
+            self.is_webcam = False
+            if source.startswith("rtsp://"):
+                cmd += ["-rtsp_transport", "tcp"]
+            if self.config.is_file:
+                if self.config.realtime:
+                    cmd += ["-re"]  # Pace to container PTS
+                cmd += ["-stream_loop", "-1"]  # Loop files like the OpenCV backend
+            cmd += ["-i", source]
+
+        # Decimation before scaling so dropped frames are never scaled
+        pre = []
+        if self.config.frame_skip:
+            pre.append(f"select='not(mod(n\\,{self.config.frame_skip + 1}))'")
+            pre.append("setpts=N/FRAME_RATE/TB")
+        if self.config.fps_limit:
+            pre.append(f"fps={self.config.fps_limit}")
+        if self.is_webcam:
+            pre.append("hflip")  # Mirror webcam
+        pre.append("split=2[d][p]")
+
+        filter_graph = (
+            f"[0:v]{','.join(pre)};"
+            f"[d]scale={dw}:{dh},pad={self.canvas_w}:{dh}:0:0[dout];"
+            f"[p]scale={pw}:{ph},pad={self.canvas_w}:{ph}:0:0[pout];"
+            f"[dout][pout]vstack=inputs=2[out]"
+        )
+        cmd += [
+            "-filter_complex", filter_graph,
+            "-map", "[out]",
+            "-f", "rawvideo", "-pix_fmt", "bgr24",
+            "pipe:1"
+        ]
+        return cmd
+
+    def connect(self) -> bool:
+        logger.info(f"Connecting to video sensor via ffmpeg: {self.config.name} ({self.config.source})")
+        if self.config.is_file and not os.path.isfile(str(self.config.source)):
+            logger.error(f"Failed to open video source: {self.config.source}")
+            return False
+
+        self._stop.clear()
+        if not self._spawn():
+            return False
+        # Wait for the first frame: a bad URL or device only shows as an early exit
+        if not self._fill(self.ring[self.ring_idx], deadline=time.time() + self.connect_timeout):
+            logger.error(f"ffmpeg could not open {self.config.source} for {self.config.name}")
+            self._kill()
+            return False
+        self._primed = True
+
+        self.is_active = True
+        if self.config.threaded:
+            mode = FrameGrabber.PREFETCH if self.config.is_file else FrameGrabber.LATEST
+            self.grabber = FrameGrabber(self._read_pair, self.config.name, mode=mode,
+                                        buffer_size=self.config.buffer_size)
+            self.grabber.start()
+            logger.info(f"Background grabber started for {self.config.name} ({mode})")
+        return True
+
+    def _spawn(self) -> bool:
+        self._spawned_at = time.time()
+        try:
+            self.proc = subprocess.Popen(
+                self._build_command(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0  # Raw FileIO: readinto() lands directly in our buffer
+            )
+            return True
+        except OSError as e:
+            logger.error(f"Failed to start ffmpeg for {self.config.name}: {e}")
+            return False
+
+    def _kill(self):
+        if self.proc:
+            self.proc.kill()
+            self.proc.wait(timeout=2.0)
+            self.proc = None
+
+    def disconnect(self):
+        self.is_active = False
+        self._stop.set()  # Cuts a restart backoff short
+        if self.grabber:
+            self.grabber.stop()
+            self.grabber = None
+        self._kill()
+        logger.info(f"Disconnected from {self.config.name}")
+
+    def _fill(self, slot: np.ndarray, deadline: Optional[float] = None) -> bool:
+        """Read one frame from the pipe into slot. False on EOF, or when deadline passes first."""
+        view = memoryview(slot.reshape(-1))
+        filled = 0
+        while filled < self.frame_bytes:
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not select.select([self.proc.stdout], [], [], remaining)[0]:
+                    return False
+            n = self.proc.stdout.readinto(view[filled:])
+            if not n:
+                return False
+            filled += n
+        return True
+
+    def _restart(self):
+        """Stream ended (camera dropped / process died): respawn the decoder after a capped backoff"""
+        self._kill()
+        if time.time() - self._spawned_at > 2 * self.max_backoff:
+            self._failures = 0  # Ran a good while: a fresh outage, not a flapping source
+        self._failures += 1
+        self.restarts += 1
+        backoff = min(self.max_backoff, 0.1 * 2 ** (self._failures - 1))
+        logger.warning(f"EOF or error reading from {self.config.name}, restarting ffmpeg in {backoff:.1f}s")
+        if not self._stop.wait(backoff) and self.is_active:
+            self._spawn()
+
+    def _read_pair(self) -> Tuple[bool, Optional[Tuple[np.ndarray, np.ndarray]]]:
+        if not self.is_active:
+            return False, None
+        if not self.proc:
+            self._restart()  # Previous respawn failed
+            return False, None
+
+        slot = self.ring[self.ring_idx]
+        if self._primed:
+            self._primed = False
+        elif not self._fill(slot):
+            self._restart()
+            return False, None
+
+        self.ring_idx = (self.ring_idx + 1) % len(self.ring)
+        dw, dh = self.config.display_size
+        pw, ph = self.config.proxy_size
+        return True, (slot[:dh, :dw], slot[dh:dh + ph, :pw])
+
+    def _next_pair(self):
+        if self.grabber:
+            return self.grabber.read()
+        return self._read_pair()
+
+    def read(self) -> Tuple[bool, Optional[object]]:
+        ret, pair = self._next_pair()
+        return (True, pair[0].copy()) if ret else (False, None)
+
+    def read_scaled(self) -> Tuple[bool, Optional[object], Optional[object]]:
+        # Copies leave the ring: downstream stages may hold frames longer than the ring lasts
+        ret, pair = self._next_pair()
+        if not ret:
+            return False, None, None
+        return True, pair[0].copy(), pair[1].copy()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["backend"] = "ffmpeg"
+        stats["restarts"] = self.restarts
+        return stats
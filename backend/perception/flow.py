@@ -0,0 +1,133 @@
+import copy
+import logging
+import cv2
+import numpy as np
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class FlowPropagator:
+    """
+    Moves detector boxes between detector frames with sparse Lucas-Kanade flow.
+
+    On every detector frame (keyframe) a handful of corners is seeded inside each
+    track's box on the AI proxy. On the frames in between, the corners are tracked
+    with pyramidal LK, filtered with a forward-backward check, and each box is shifted
+    by the median displacement of its surviving points. Boxes stay in display
+    coordinates; `scale` maps proxy pixels to display pixels.
+    """
+
+    def __init__(self, max_points: int = 20, win_size: Tuple[int, int] = (15, 15), max_level: int = 2,
+                 fb_threshold: float = 1.0, min_points: int = 3):
+        self.max_points = max_points        # Corners seeded per track
+        self.win_size = win_size
+        self.max_level = max_level
+        self.fb_threshold = fb_threshold    # Forward-backward error (px) beyond which a point is dropped
+        self.min_points = min_points        # Fewer surviving points -> box is left where it is
+        self.criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+
+        self.prev_gray: Optional[np.ndarray] = None
+        self.points = np.empty((0, 1, 2), dtype=np.float32)
+        self.owners = np.empty((0,), dtype=np.int64)  # Track ID per point
+
+        self.frames_propagated = 0
+        self.avg_points = 0.0
+
+    @staticmethod
+    def _gray(frame: np.ndarray) -> np.ndarray:
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+    def reset(self, proxy: np.ndarray, results, scale: Tuple[float, float] = (1.0, 1.0)):
+        """Keyframe: the detector just ran on this proxy, reseed points inside its boxes"""
+        gray = self._gray(proxy)
+        self.prev_gray = gray
+        points, owners = [], []
+
+        h, w = gray.shape[:2]
+        for t in getattr(results, 'custom_tracks', None) or []:
+            if t.get('disappeared', 0) > 0:
+                continue
+            x1, y1, x2, y2 = t['box']
+            # Display -> proxy, shrunk 10% so corners land on the object rather than the background
+            bw, bh = (x2 - x1) / scale[0], (y2 - y1) / scale[1]
+            px1 = int(max(0, x1 / scale[0] + 0.1 * bw))
+            py1 = int(max(0, y1 / scale[1] + 0.1 * bh))
+            px2 = int(min(w, x2 / scale[0] - 0.1 * bw))
+            py2 = int(min(h, y2 / scale[1] - 0.1 * bh))
+            if px2 - px1 < 4 or py2 - py1 < 4:
+                continue
+
+            corners = cv2.goodFeaturesToTrack(gray[py1:py2, px1:px2], maxCorners=self.max_points,
+                                              qualityLevel=0.01, minDistance=3)
+            if corners is None:
+                continue
+            corners[:, 0, 0] += px1
+            corners[:, 0, 1] += py1
+            points.append(corners.astype(np.float32))
+            owners.append(np.full(len(corners), t['id'], dtype=np.int64))
+
+        if points:
+            self.points = np.concatenate(points)
+            self.owners = np.concatenate(owners)
+        else:
+            self.points = np.empty((0, 1, 2), dtype=np.float32)
+            self.owners = np.empty((0,), dtype=np.int64)
+
+    def propagate(self, proxy: np.ndarray, results, scale: Tuple[float, float] = (1.0, 1.0)):
+        """Returns a copy of results with every tracked box moved to this frame"""
+        gray = self._gray(proxy)
+        if self.prev_gray is None or results is None or len(self.points) == 0:
+            self.prev_gray = gray
+            return results
+
+        p1, st, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, self.points, None,
+                                             winSize=self.win_size, maxLevel=self.max_level, criteria=self.criteria)
+        p0r, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, p1, None,
+                                                   winSize=self.win_size, maxLevel=self.max_level, criteria=self.criteria)
+        fb_error = np.abs(self.points - p0r).reshape(-1, 2).max(axis=1)
+        good = (st.ravel() == 1) & (st_back.ravel() == 1) & (fb_error < self.fb_threshold)
+
+        motion = (p1 - self.points).reshape(-1, 2)
+        shifts: Dict[int, Tuple[float, float]] = {}
+        for track_id in np.unique(self.owners[good]):
+            sel = good & (self.owners == track_id)
+            if np.count_nonzero(sel) < self.min_points:
+                continue
+            dx, dy = np.median(motion[sel], axis=0)
+            shifts[int(track_id)] = (float(dx) * scale[0], float(dy) * scale[1])
+
+        self.points = p1[good].reshape(-1, 1, 2)
+        self.owners = self.owners[good]
+        self.prev_gray = gray
+        self.frames_propagated += 1
+        self.avg_points = 0.9 * self.avg_points + 0.1 * len(self.points)
+
+        if not shifts:
+            return results
+        propagated = copy.copy(results)
+        propagated.custom_tracks = [self._shift(t, shifts.get(t['id'])) for t in results.custom_tracks]
+        return propagated
+
+    @staticmethod
+    def _shift(track: Dict[str, Any], shift: Optional[Tuple[float, float]]) -> Dict[str, Any]:
+        if shift is None:
+            return track
+        dx, dy = shift
+        x1, y1, x2, y2 = track['box']
+        moved = dict(track)
+        moved['box'] = [x1 + dx, y1 + dy, x2 + dx, y2 + dy]
+        if 'centroid' in track:
+            moved['centroid'] = [int(track['centroid'][0] + dx), int(track['centroid'][1] + dy)]
+        if track.get('keypoints') is not None:
+            kpts = track['keypoints'].copy()
+            kpts[:, 0] += dx
+            kpts[:, 1] += dy
+            moved['keypoints'] = kpts
+        return moved
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "frames_propagated": self.frames_propagated,
+            "points": len(self.points),
+            "avg_points": round(self.avg_points, 1)
+        }
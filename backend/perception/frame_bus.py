@@ -0,0 +1,227 @@
+import time
+import logging
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from typing import Tuple, Optional, Dict, Any
+from backend.perception.sensor import BaseSensor, VideoSensorConfig, create_video_sensor
+
+logger = logging.getLogger(__name__)
+
+class SharedFrameRing:
+    """
+    Fixed-slot frame ring in multiprocessing.shared_memory.
+
+    Layout: [int64 slot_seq[slots]] [int64 latest_seq] [uint8 frames[slots, H, W, 3]]
+    Each frame is a canvas holding the display frame on top and the AI proxy
+    below it (same layout as the ffmpeg backend), so one write publishes both.
+
+    Writer protocol per frame n (seqlock): slot_seq[slot] = -1, copy pixels,
+    slot_seq[slot] = n, latest_seq = n. A reader holding (slot, seq) can check
+    is_valid() to detect that the writer has lapped the ring.
+    """
+
+    def __init__(self, name: Optional[str], slots: int, display_size: Tuple[int, int],
+                 proxy_size: Tuple[int, int], create: bool = False):
+        self.slots = slots
+        self.display_size = display_size
+        self.proxy_size = proxy_size
+        dw, dh = display_size
+        pw, ph = proxy_size
+        self.canvas_shape = (dh + ph, max(dw, pw), 3)
+
+        self.header_bytes = (slots + 1) * 8
+        frame_bytes = int(np.prod(self.canvas_shape))
+        size = self.header_bytes + slots * frame_bytes
+
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.name = self.shm.name
+        self.header = np.ndarray((slots + 1,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray((slots,) + self.canvas_shape, dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=self.header_bytes)
+        if create:
+            self.header[:] = 0
+
+    @property
+    def latest_seq(self) -> int:
+        return int(self.header[self.slots])
+
+    def write(self, display: np.ndarray, proxy: np.ndarray) -> int:
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        dw, dh = self.display_size
+        pw, ph = self.proxy_size
+
+        self.header[slot] = -1  # Writing
+        self.frames[slot, :dh, :dw] = display
+        self.frames[slot, dh:dh + ph, :pw] = proxy
+        self.header[slot] = seq
+        self.header[self.slots] = seq
+        return seq
+
+    def latest(self) -> Tuple[int, int]:
+        """Returns (seq, slot) of the newest complete frame, or (0, -1) if none"""
+        seq = self.latest_seq
+        if seq <= 0:
+            return 0, -1
+        slot = seq % self.slots
+        if self.header[slot] != seq:
+            return 0, -1
+        return seq, slot
+
+    def views(self, slot: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-copy (display, proxy) views into a slot"""
+        dw, dh = self.display_size
+        pw, ph = self.proxy_size
+        canvas = self.frames[slot]
+        return canvas[:dh, :dw], canvas[dh:dh + ph, :pw]
+
+    def is_valid(self, slot: int, seq: int) -> bool:
+        return int(self.header[slot]) == seq
+
+    def close(self):
+        # Drop numpy views before releasing the mapping
+        self.header = None
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # Frames still referenced downstream; the mapping is released when they are collected
+            logger.warning(f"Shared frame ring {self.name} closed with live views")
+
+    def unlink(self):
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _capture_worker_main(config: VideoSensorConfig, shm_name: str, slots: int, stop_event, ready_event):
+    """Capture process entry point: decode one sensor and publish into the ring"""
+    logging.basicConfig(level=logging.INFO)
+    ring = SharedFrameRing(shm_name, slots, config.display_size, config.proxy_size)
+    sensor = create_video_sensor(config)
+    if not sensor.connect():
+        logger.error(f"Capture worker failed to connect: {config.name}")
+        ring.close()
+        return  # Process exits without setting ready_event
+    ready_event.set()
+
+    try:
+        while not stop_event.is_set():
+            ret, display, proxy = sensor.read_scaled()
+            if not ret:
+                time.sleep(0.05)
+                continue
+            ring.write(display, proxy)
+    finally:
+        sensor.disconnect()
+        ring.close()
+
+
+class SharedMemorySensor(BaseSensor):
+    """
+    Orchestrator-side handle for a VideoSensor running in its own capture process.
+    The worker decodes and scales frames into a SharedFrameRing, so the main process
+    never pays for decode and the GIL is not shared with capture. The writer never
+    waits for readers, so read() and read_scaled() copy the newest slot out of the
+    ring and re-check its sequence afterwards; a frame overwritten mid-copy is dropped.
+    """
+
+    def __init__(self, config: VideoSensorConfig, slots: int = 16, connect_timeout: float = 10.0):
+        super().__init__(config)
+        self.config: VideoSensorConfig = config
+        self.slots = slots
+        self.connect_timeout = connect_timeout  # Seconds to wait for the worker to open the source
+        self.ring: Optional[SharedFrameRing] = None
+        self.process: Optional[mp.Process] = None
+        self._ctx = mp.get_context("spawn")  # Never fork a process holding Torch/OpenCV threads
+        self._stop_event = None
+        self._ready_event = None
+        self.last_seq = 0
+        self.last_slot = -1
+        self.frames_read = 0
+        self.dropped_frames = 0  # Frames published but never read (gaps in seq)
+        self.torn_frames = 0  # Frames overwritten by the writer while being copied
+
+    def connect(self) -> bool:
+        logger.info(f"Starting capture process for {self.config.name} ({self.config.source})")
+        self.ring = SharedFrameRing(None, self.slots, self.config.display_size, self.config.proxy_size, create=True)
+        self._stop_event = self._ctx.Event()
+        self._ready_event = self._ctx.Event()
+        self.process = self._ctx.Process(
+            target=_capture_worker_main,
+            args=(self.config, self.ring.name, self.slots, self._stop_event, self._ready_event),
+            name=f"capture-{self.config.name}",
+            daemon=True
+        )
+        self.process.start()
+
+        # The worker opens the source itself: wait for its ready signal, or for it to exit
+        deadline = time.time() + self.connect_timeout
+        while not self._ready_event.wait(timeout=0.05):
+            if not self.process.is_alive() or time.time() >= deadline:
+                logger.error(f"Capture process for {self.config.name} failed to open {self.config.source}")
+                self.disconnect()
+                return False
+        self.is_active = True
+        return True
+
+    def disconnect(self):
+        self.is_active = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self.process:
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        if self.ring:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
+        logger.info(f"Disconnected from {self.config.name}")
+
+    def read_slot(self, timeout: float = 0.5) -> Tuple[int, int]:
+        """Wait for a frame newer than the last one read. Returns (seq, slot) or (0, -1)."""
+        deadline = time.time() + timeout
+        while self.is_active and self.ring is not None:
+            seq, slot = self.ring.latest()
+            if seq > self.last_seq:
+                if self.last_seq:
+                    self.dropped_frames += seq - self.last_seq - 1
+                self.last_seq, self.last_slot = seq, slot
+                self.frames_read += 1
+                return seq, slot
+            if time.time() >= deadline:
+                break
+            time.sleep(0.002)
+        return 0, -1
+
+    def read_scaled(self) -> Tuple[bool, Optional[object], Optional[object]]:
+        seq, slot = self.read_slot()
+        if slot < 0:
+            return False, None, None
+        display, proxy = (view.copy() for view in self.ring.views(slot))
+        if not self.ring.is_valid(slot, seq):
+            # Writer lapped the ring during the copy (seqlock): the copy may be torn
+            self.torn_frames += 1
+            return False, None, None
+        return True, display, proxy
+
+    def read(self) -> Tuple[bool, Optional[object]]:
+        ret, display, _ = self.read_scaled()
+        return ret, display
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.config.name,
+            "active": self.is_active,
+            "threaded": False,
+            "backend": "shared_memory",
+            "worker_alive": bool(self.process and self.process.is_alive()),
+            "published": self.ring.latest_seq if self.ring else 0,
+            "frames_read": self.frames_read,
+            "dropped_frames": self.dropped_frames,
+            "torn_frames": self.torn_frames
+        }
@@ -0,0 +1,241 @@
+import os
+import time
+import logging
+import threading
+import numpy as np
+from typing import Callable, Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Swap lifecycle
+IDLE = "idle"
+LOADING = "loading"          # Loading + warm-up on the background thread
+VALIDATING = "validating"    # Shadow inference on live frames
+READY = "ready"              # Validated, waiting for the next frame boundary
+SWAPPED = "swapped"          # Live; on probation until probation_frames detector runs pass
+ROLLBACK_REQUESTED = "rollback_requested"  # Restore queued for the next frame boundary
+ROLLED_BACK = "rolled_back"  # Failed on live frames, previous model restored
+FAILED = "failed"            # Load or validation failed, previous model never left
+
+
+class ModelSwapper:
+    """
+    Atomic hot-swap of the detector model without pausing the perception loop.
+
+    submit() loads and warms the new model on a background thread, then runs
+    shadow inference on a few copies of live AI proxy frames. The inference stage
+    calls on_frame() between frames; that is the only place the detector's model
+    reference changes (swaps and rollbacks alike), so a frame never mixes two
+    models. After the swap the new model is on probation: too many inference
+    errors over its detector frames roll back to the previous one. A staged upload
+    only replaces the installed weights file once probation passed, so a restart
+    never loads a model that was rolled back.
+    """
+
+    def __init__(self, detector, live_inference_ms: Callable[[], float], shadow_frames: int = 5,
+                 shadow_timeout: float = 3.0, probation_frames: int = 30, max_errors: int = 3):
+        self.detector = detector
+        self.live_inference_ms = live_inference_ms  # Current live detector latency (ms, EMA)
+        self.shadow_frames = shadow_frames
+        self.shadow_timeout = shadow_timeout
+        self.probation_frames = probation_frames
+        self.max_errors = max_errors
+
+        self.state = IDLE
+        self.model_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._frames: List[np.ndarray] = []
+        self._candidate = None
+        self._install_path: Optional[str] = None
+        self._previous = None
+        self._errors_at_swap = 0
+        self._probation_seen = 0
+        self._submitted_at = 0.0
+        self.metrics: Dict[str, Any] = {}
+
+    @property
+    def busy(self) -> bool:
+        """A swap is in flight, including probation (its staged upload is not installed yet)"""
+        on_probation = self.state == SWAPPED and self._previous is not None
+        return on_probation or self.state in (LOADING, VALIDATING, READY, ROLLBACK_REQUESTED)
+
+    def submit(self, model_path: str, backend: Optional[str] = None, install_path: Optional[str] = None) -> bool:
+        """
+        Start loading a new model in the background. Returns False if a swap is in flight.
+        backend defaults to the one the detector resolves for its active use case.
+        install_path: model_path is a staged upload that replaces this file once the model
+        passed probation (and is deleted if it fails or is rolled back), so live weights
+        are never overwritten early.
+        """
+        backend = backend or self.detector.current_backend()
+        with self._lock:
+            if self.busy:
+                return False
+            self.state = LOADING
+            self.model_path = model_path
+            self._install_path = install_path
+            self.error = None
+            self._frames = []
+            self._candidate = None
+            self._submitted_at = time.time()
+            self.metrics = {"before_inference_ms": round(self.live_inference_ms(), 2)}
+
+        threading.Thread(target=self._prepare, args=(model_path, backend),
+                         name="model-hot-swap", daemon=True).start()
+        return True
+
+    def offer_frame(self, proxy: np.ndarray):
+        """Inference stage hands over live frames while a candidate needs shadow inference"""
+        if self.state in (LOADING, VALIDATING) and len(self._frames) < self.shadow_frames:
+            self._frames.append(proxy.copy())  # Sensor buffers are recycled
+
+    def _prepare(self, model_path: str, backend: str):
+        try:
+            start = time.perf_counter()
+            # Uploads may overwrite a file of the same name: never serve stale cached weights
+            self.detector.model_registry.invalidate(model_path)
+            candidate = self.detector.model_registry.get(model_path, backend)
+            self.detector.model_registry.pin("candidate", candidate)
+            self.metrics["load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+            self.state = VALIDATING
+            deadline = time.time() + self.shadow_timeout
+            while len(self._frames) < self.shadow_frames and time.time() < deadline:
+                time.sleep(0.05)
+            frames = list(self._frames) or [np.zeros((480, 854, 3), dtype=np.uint8)]
+
+            self._check_compatible(candidate)
+            timings = []
+            for frame in frames:
+                t0 = time.perf_counter()
+                result = candidate.predict(frame)
+                timings.append((time.perf_counter() - t0) * 1000)
+                if not hasattr(result, 'boxes'):
+                    raise ValueError("model output has no boxes")
+            self.metrics["shadow_frames"] = len(self._frames)
+            self.metrics["shadow_inference_ms"] = round(float(np.median(timings)), 2)
+        except Exception as e:
+            logger.error(f"Hot-swap of {model_path} failed, keeping current model: {e}")
+            self.detector.model_registry.unpin("candidate")
+            self._discard_staged()
+            with self._lock:
+                self.state = FAILED
+                self.error = str(e)
+            return
+
+        with self._lock:
+            self._candidate = candidate
+            self.state = READY
+        logger.info(f"Model {model_path} validated, swapping at next frame boundary")
+
+    def _check_compatible(self, candidate):
+        """The candidate must solve the live model's task over the same classes (engines key on them)"""
+        live = self.detector.advanced_model.model
+        live_task, task = getattr(live, 'task', None), getattr(candidate.model, 'task', None)
+        if task != live_task:
+            raise ValueError(f"model task {task!r} does not match the live model's {live_task!r}")
+        if dict(candidate.model.names) != dict(live.names):
+            raise ValueError(f"model classes {dict(candidate.model.names)} do not match the live model's")
+
+    def _discard_staged(self):
+        """Delete a staged upload and forget its cached runtime"""
+        if not self._install_path:
+            return
+        self.detector.model_registry.invalidate(self.model_path)
+        if os.path.exists(self.model_path):
+            os.remove(self.model_path)
+
+    def _install(self):
+        """Probation passed: the staged upload replaces the installed file, cache entry included"""
+        if not self._install_path:
+            return
+        os.replace(self.model_path, self._install_path)
+        self.detector.model_registry.rename(self.model_path, self._install_path)
+        self.model_path = self._install_path
+        self._install_path = None
+
+    def on_frame(self, ran_detector: bool = True):
+        """
+        Called by the inference stage between frames. ran_detector says whether the
+        frame just finished ran the model; only those count towards probation.
+        """
+        if self.state == READY:
+            self._swap()
+        elif self.state == ROLLBACK_REQUESTED:
+            self._restore()
+        elif self.state == SWAPPED and self._previous is not None and ran_detector:
+            self._check_probation()
+
+    def _swap(self):
+        with self._lock:
+            candidate, self._candidate = self._candidate, None
+            if candidate is None:
+                return
+            t0 = time.perf_counter()
+            self._previous = self.detector.advanced_model
+            self.detector.model_registry.pin("previous", self._previous)
+            self.detector.advanced_model = candidate  # Pinned as "active"
+            self.detector.model_registry.unpin("candidate")
+            self.detector.names = candidate.model.names
+            self.metrics["swap_us"] = round((time.perf_counter() - t0) * 1e6, 1)
+            self.metrics["submit_to_live_s"] = round(time.time() - self._submitted_at, 2)
+            self._errors_at_swap = self.detector.inference_errors
+            self._probation_seen = 0
+            self.state = SWAPPED
+        logger.info(f"Hot-swapped detector model -> {self.model_path} ({self.metrics['swap_us']} us)")
+
+    def _check_probation(self):
+        self._probation_seen += 1
+        errors = self.detector.inference_errors - self._errors_at_swap
+        if errors >= self.max_errors:
+            self.error = f"{errors} inference errors after swap"
+            self._restore()
+            return
+        if self._probation_seen >= self.probation_frames:
+            after_ms = self.live_inference_ms()
+            self.metrics["after_inference_ms"] = round(after_ms, 2)
+            before_ms = self.metrics.get("before_inference_ms") or 0.0
+            if before_ms and after_ms:
+                self.metrics["throughput_ratio"] = round(before_ms / after_ms, 2)  # >1 = faster
+            try:
+                self._install()
+            except Exception as e:
+                # The swapped-in model keeps running; only the file on disk stays the old one
+                logger.error(f"Installing {self.model_path} failed: {e}")
+                self.error = f"install failed: {e}"
+            self._previous = None  # Probation passed; release the old model
+            self.detector.model_registry.unpin("previous")
+            logger.info(f"Model {self.model_path} passed probation: {self.metrics}")
+
+    def rollback(self, reason: str = "manual") -> bool:
+        """Queue a restore of the previous model; on_frame() applies it at the next frame boundary"""
+        with self._lock:
+            if self._previous is None or self.state != SWAPPED:
+                return False
+            self.state = ROLLBACK_REQUESTED
+            self.error = reason
+        logger.info(f"Rollback of {self.model_path} requested: {reason}")
+        return True
+
+    def _restore(self):
+        with self._lock:
+            if self._previous is None:
+                return
+            self.detector.advanced_model = self._previous
+            self.detector.names = self._previous.model.names
+            self._previous = None
+            self.detector.model_registry.unpin("previous")
+            self.state = ROLLED_BACK
+            self._discard_staged()
+        logger.error(f"Rolled back hot-swap of {self.model_path}: {self.error}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "model_path": self.model_path,
+            "active_model": getattr(self.detector.advanced_model, 'model_path', None),
+            "on_probation": self.state in (SWAPPED, ROLLBACK_REQUESTED) and self._previous is not None,
+            "error": self.error,
+            "metrics": dict(self.metrics)
+        }
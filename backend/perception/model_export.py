@@ -0,0 +1,200 @@
+import os
+import re
+import shutil
+import hashlib
+import logging
+import cv2
+import numpy as np
+from typing import Optional, List
+from ultralytics import YOLO
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Inference backends for AdvancedDetector
+TORCH = "torch"
+ONNX = "onnx"
+OPENVINO = "openvino"
+ONNX_INT8 = "onnx_int8"  # Post-training static INT8 quantization of the ONNX export
+
+BACKENDS = (TORCH, ONNX, OPENVINO, ONNX_INT8)
+
+def weights_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """Short SHA-256 of a weights file: exports are cached per exact set of weights"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def _local_weights(model_path: str) -> Optional[str]:
+    """Resolve the .pt on disk (Ultralytics downloads stock weights on first load)"""
+    if os.path.isfile(model_path):
+        return model_path
+    try:
+        ckpt = YOLO(model_path).ckpt_path
+    except Exception as e:
+        logger.error(f"Cannot resolve weights {model_path}: {e}")
+        return None
+    return ckpt if ckpt and os.path.isfile(ckpt) else None
+
+def cached_export_path(model_path: str, backend: str, weights_file: str, imgsz: int) -> str:
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    key = f"{stem}-{weights_hash(weights_file)}-{imgsz}"
+    cache_dir = os.path.join(settings.DATA_DIR, "model_cache", key)
+    if backend == OPENVINO:
+        return os.path.join(cache_dir, f"{stem}_openvino_model")  # OpenVINO IR is a directory
+    if backend == ONNX_INT8:
+        return os.path.join(cache_dir, f"{stem}-int8.onnx")
+    return os.path.join(cache_dir, f"{stem}.onnx")
+
+def export_model(model_path: str, backend: str = ONNX, imgsz: int = 640) -> str:
+    """
+    Export a YOLO .pt to ONNX / OpenVINO IR once and return the cached artifact.
+    Loading the artifact with YOLO() keeps the standard Results interface.
+    Falls back to the original weights (PyTorch path) if export is not possible.
+    """
+    if backend == TORCH:
+        return model_path
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown inference backend '{backend}', using PyTorch")
+        return model_path
+
+    weights_file = _local_weights(model_path)
+    if weights_file is None:
+        return model_path
+
+    target = cached_export_path(model_path, backend, weights_file, imgsz)
+    if os.path.exists(target):
+        logger.info(f"Using cached {backend} export: {target}")
+        return target
+
+    if backend == ONNX_INT8:
+        return _quantize_int8(model_path, target, imgsz)
+
+    logger.info(f"Exporting {model_path} to {backend} (one-time, cached at {target})...")
+    try:
+        # Dynamic batch keeps pooled track_batch() on one forward pass; simplify folds constants for the CPU EP
+        exported = YOLO(weights_file).export(
+            format=backend, imgsz=imgsz, dynamic=True,
+            simplify=(backend == ONNX), verbose=False
+        )
+    except Exception as e:
+        logger.error(f"{backend} export failed for {model_path}, staying on PyTorch: {e}")
+        return model_path
+
+    # Ultralytics writes next to the weights; move into the cache atomically
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    staging = f"{target}.tmp"
+    if os.path.isdir(staging):
+        shutil.rmtree(staging)
+    elif os.path.exists(staging):
+        os.remove(staging)
+    shutil.move(str(exported), staging)
+    os.replace(staging, target)
+    return target
+
+
+def letterbox(frame: np.ndarray, imgsz: int = 640) -> np.ndarray:
+    """Ultralytics-style letterbox (114 grey padding) -> float32 NCHW RGB in [0, 1]"""
+    h, w = frame.shape[:2]
+    r = imgsz / max(h, w)
+    nw, nh = int(round(w * r)), int(round(h * r))
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    canvas[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    rgb = canvas[:, :, ::-1].transpose(2, 0, 1)
+    return np.ascontiguousarray(rgb, dtype=np.float32)[None] / 255.0
+
+def video_frame_count(video_path: str) -> int:
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return max(total, 0)
+
+def calibration_indices(total: int, count: int) -> np.ndarray:
+    """Frame indices calibration_frames() samples from a video of `total` frames"""
+    if total <= 0:
+        return np.zeros(0, dtype=int)
+    return np.unique(np.linspace(0, total - 1, num=min(count, total)).astype(int))
+
+def read_frames(video_path: str, indices, size=(854, 480)) -> List[np.ndarray]:
+    """Frames at the given indices, resized to AI proxy resolution"""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    for idx in indices:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+        ret, frame = cap.read()
+        if ret:
+            frames.append(cv2.resize(frame, size))
+    cap.release()
+    return frames
+
+def calibration_frames(video_path: str, count: int, size=(854, 480)) -> List[np.ndarray]:
+    """Evenly spaced frames from local footage at AI proxy resolution (what the model sees live)"""
+    return read_frames(video_path, calibration_indices(video_frame_count(video_path), count), size)
+
+def _head_nodes(onnx_path: str) -> List[str]:
+    """
+    Nodes of the final Detect/Pose head (highest /model.N/ block). Box decoding
+    and DFL are very sensitive to INT8, so the head stays in FP32.
+    """
+    import onnx
+
+    graph = onnx.load(onnx_path).graph
+    pattern = re.compile(r"/model\.(\d+)/")
+    indices = []
+    for node in graph.node:
+        match = pattern.search(node.name)
+        if match:
+            indices.append(int(match.group(1)))
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    return [node.name for node in graph.node if head in node.name]
+
+def _quantize_int8(model_path: str, target: str, imgsz: int) -> str:
+    try:
+        import onnx
+        from onnxruntime.quantization import (
+            CalibrationDataReader, QuantFormat, QuantType, quantize_static
+        )
+    except ImportError as e:
+        logger.error(f"onnxruntime quantization unavailable, staying on PyTorch: {e}")
+        return model_path
+
+    fp32_path = export_model(model_path, ONNX, imgsz)
+    if fp32_path == model_path:
+        return model_path
+
+    frames = calibration_frames(settings.INT8_CALIBRATION_VIDEO, settings.INT8_CALIBRATION_FRAMES)
+    if not frames:
+        logger.error(f"No calibration frames in {settings.INT8_CALIBRATION_VIDEO}, INT8 disabled")
+        return model_path
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self, frames, input_name):
+            self._batches = ({input_name: letterbox(f, imgsz)} for f in frames)
+
+        def get_next(self):
+            return next(self._batches, None)
+
+    input_name = onnx.load(fp32_path).graph.input[0].name
+
+    logger.info(f"Quantizing {model_path} to INT8 on {len(frames)} frames from {settings.INT8_CALIBRATION_VIDEO}...")
+    staging = f"{target}.tmp"
+    try:
+        quantize_static(
+            fp32_path, staging, FrameReader(frames, input_name),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            nodes_to_exclude=_head_nodes(fp32_path)
+        )
+    except Exception as e:
+        logger.error(f"INT8 quantization failed for {model_path}, staying on PyTorch: {e}")
+        return model_path
+
+    os.replace(staging, target)
+    return target
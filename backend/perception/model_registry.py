@@ -0,0 +1,178 @@
+import os
+import time
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from backend.perception.engines.sahi import AdvancedDetector
+
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """
+    LRU cache of loaded AdvancedDetectors keyed by (model_path, backend).
+
+    Every model is warmed up with a dummy inference right after loading, so the
+    first real frame does not pay for lazy allocation. The cache is bounded by
+    both a model count and an estimated memory cap; the least recently used
+    models are evicted first, except pinned ones: models still in use (the
+    detector's live model, a hot-swap's previous model or candidate) stay cached
+    and counted however old. Concurrent requests for a model that is still
+    loading wait for that load instead of starting a second one.
+    """
+
+    def __init__(self, max_models: int = 3, max_memory_mb: float = 1024.0,
+                 warmup_shape: Tuple[int, int, int] = (480, 854, 3)):
+        self.max_models = max(1, max_models)
+        self.max_memory_mb = max_memory_mb
+        self.warmup_shape = warmup_shape
+
+        self._models: "OrderedDict[Tuple[str, str], AdvancedDetector]" = OrderedDict()
+        self._memory_mb: Dict[Tuple[str, str], float] = {}
+        self._load_ms: Dict[Tuple[str, str], float] = {}
+        self._loading: Dict[Tuple[str, str], threading.Event] = {}
+        self._pinned: Dict[str, AdvancedDetector] = {}  # role -> model in use
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_path: str, backend: str = "torch") -> AdvancedDetector:
+        """Return a warm model, loading it on a miss (blocking the caller only)"""
+        key = (model_path, backend)
+        while True:
+            with self._lock:
+                model = self._models.get(key)
+                if model is not None:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return model
+                pending = self._loading.get(key)
+                if pending is None:
+                    self.misses += 1
+                    self._loading[key] = threading.Event()
+                    break
+            # Another thread (e.g. pre-warm) is loading this model
+            pending.wait()
+
+        try:
+            model, elapsed_ms, memory_mb = self._load(model_path, backend)
+            with self._lock:
+                self._models[key] = model
+                self._memory_mb[key] = memory_mb
+                self._load_ms[key] = elapsed_ms
+                self._evict(keep=key)
+            return model
+        finally:
+            with self._lock:
+                self._loading.pop(key).set()
+
+    def pin(self, role: str, model: Optional[AdvancedDetector]):
+        """Protect a model in use from eviction under a role ("active", "previous", ...); None unpins"""
+        with self._lock:
+            if model is None:
+                self._pinned.pop(role, None)
+            else:
+                self._pinned[role] = model
+
+    def unpin(self, role: str):
+        self.pin(role, None)
+
+    def invalidate(self, model_path: str):
+        """Forget every cached runtime of a model (e.g. its weights file was replaced)"""
+        with self._lock:
+            for key in [k for k in self._models if k[0] == model_path]:
+                self._models.pop(key)
+                self._memory_mb.pop(key, None)
+                self._load_ms.pop(key, None)
+
+    def rename(self, old_path: str, new_path: str):
+        """
+        The weights file of cached models moved (e.g. an upload was installed): re-key them
+        under the new path, replacing cached runtimes of the file that was overwritten there
+        """
+        with self._lock:
+            for key in [k for k in self._models if k[0] == new_path]:
+                self._models.pop(key)
+                self._memory_mb.pop(key, None)
+                self._load_ms.pop(key, None)
+            for key in [k for k in self._models if k[0] == old_path]:
+                new_key = (new_path, key[1])
+                model = self._models.pop(key)
+                model.model_path = new_path
+                self._models[new_key] = model
+                self._memory_mb[new_key] = self._memory_mb.pop(key, 0.0)
+                self._load_ms[new_key] = self._load_ms.pop(key, 0.0)
+
+    def prewarm(self, specs: List[Tuple[str, str]], background: bool = True):
+        """Load and warm the given (model_path, backend) pairs, by default off the caller's thread"""
+        def _run():
+            for model_path, backend in specs:
+                try:
+                    self.get(model_path, backend)
+                except Exception as e:
+                    logger.error(f"Pre-warm failed for {model_path} ({backend}): {e}")
+
+        if not background:
+            _run()
+            return None
+        thread = threading.Thread(target=_run, name="model-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def _load(self, model_path: str, backend: str) -> Tuple[AdvancedDetector, float, float]:
+        start = time.perf_counter()
+        model = AdvancedDetector(model_path, backend=backend)
+        # Dummy inference: first-call allocations, kernel selection and graph optimisation happen here
+        model.predict(np.zeros(self.warmup_shape, dtype=np.uint8))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        memory_mb = self._estimate_memory_mb(model)
+        logger.info(f"Model ready: {model_path} ({model.backend}) in {elapsed_ms:.0f} ms, ~{memory_mb:.0f} MB")
+        return model, elapsed_ms, memory_mb
+
+    @staticmethod
+    def _estimate_memory_mb(model: AdvancedDetector) -> float:
+        """Parameter bytes for PyTorch models, artifact size on disk for exported runtimes"""
+        try:
+            params = model.model.model.parameters()
+            return sum(p.numel() * p.element_size() for p in params) / 1e6
+        except Exception:
+            pass
+
+        path = str(getattr(model.model, "ckpt_path", None) or model.model_path)
+        if os.path.isdir(path):
+            return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files) / 1e6
+        if os.path.isfile(path):
+            return os.path.getsize(path) / 1e6
+        return 0.0
+
+    def _evict(self, keep: Tuple[str, str]):
+        """Drop least recently used unpinned models until both caps hold (called with the lock held)"""
+        pinned = {id(model) for model in self._pinned.values()}
+        while len(self._models) > self.max_models or sum(self._memory_mb.values()) > self.max_memory_mb:
+            key = next((k for k, m in self._models.items() if k != keep and id(m) not in pinned), None)
+            if key is None:
+                break  # Everything left is in use
+            self._models.pop(key)
+            self._memory_mb.pop(key, None)
+            self.evictions += 1
+            logger.info(f"Evicted model from cache: {key[0]} ({key[1]})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": [
+                    {"model": k[0], "backend": k[1], "memory_mb": round(self._memory_mb.get(k, 0.0), 1),
+                     "load_ms": round(self._load_ms.get(k, 0.0), 1)}
+                    for k in self._models
+                ],
+                "loading": [k[0] for k in self._loading],
+                "pinned": {role: model.model_path for role, model in self._pinned.items()},
+                "memory_mb": round(sum(self._memory_mb.values()), 1),
+                "max_memory_mb": self.max_memory_mb,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
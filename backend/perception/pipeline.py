@@ -0,0 +1,232 @@
+import queue
+import threading
+import time
+import logging
+import traceback
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Drop policies for a full stage queue
+DROP_OLDEST = "drop_oldest"   # Latest-frame-wins: evict the stalest item, keep the new one
+DROP_NEWEST = "drop_newest"   # Keep what is queued, discard the incoming item
+BLOCK = "block"               # Backpressure: wait for the consumer to make room
+
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+@dataclass
+class StreamFrame:
+    """One camera's share of a pipeline packet"""
+    name: str
+    display_frame: Any = None       # 720p frame used for rendering/engines
+    ai_proxy: Any = None            # 480p frame used for inference
+    status: str = "fresh"           # fresh | stale | missing (pooled sources)
+    results: Any = None             # Detector output (custom_tracks)
+    ran_ai: bool = False
+    tracks: List[Any] = field(default_factory=list)
+
+
+@dataclass
+class FramePacket:
+    """A capture tick travelling through the perception pipeline (one or more streams)"""
+    seq: int
+    captured_at: float
+    streams: List[StreamFrame] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+class StageQueue:
+    """Bounded hand-off queue between two pipeline stages with a drop policy"""
+
+    def __init__(self, name: str, maxsize: int = 2, drop_policy: str = DROP_OLDEST):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.drop_policy = drop_policy
+        self._queue = queue.Queue(maxsize=self.maxsize)
+        self.put_count = 0
+        self.drop_count = 0
+
+    def put(self, item, stop_event: Optional[threading.Event] = None) -> bool:
+        """Enqueue an item. Returns False if the item was dropped."""
+        self.put_count += 1
+        if self.drop_policy == BLOCK:
+            while stop_event is None or not stop_event.is_set():
+                try:
+                    self._queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+
+        self.drop_count += 1
+        if self.drop_policy == DROP_NEWEST:
+            return False
+
+        # DROP_OLDEST: evict the head and retry once (consumer may race us)
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def get(self, timeout: float = 0.1):
+        return self._queue.get(timeout=timeout)
+
+    def clear(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth(),
+            "capacity": self.maxsize,
+            "policy": self.drop_policy,
+            "enqueued": self.put_count,
+            "dropped": self.drop_count
+        }
+
+
+class PipelineStage:
+    """
+    A worker thread that pulls items from an input queue, processes them and
+    pushes the result to the next stage. A handler returning None consumes
+    the item (e.g. nothing to forward).
+    """
+
+    def __init__(self, name: str, handler: Callable, input_queue: Optional[StageQueue] = None,
+                 output_queue: Optional[StageQueue] = None):
+        self.name = name
+        self.handler = handler
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.processed = 0
+        self.errors = 0
+        self.avg_latency_ms = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, stop_event: threading.Event):
+        self._stop_event = stop_event
+        self._thread = threading.Thread(target=self._run, name=f"stage-{self.name}", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: float = 1.0):
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            if self.input_queue is not None:
+                try:
+                    item = self.input_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            else:
+                # Source stage: the handler produces items itself
+                item = None
+
+            start = time.perf_counter()
+            try:
+                out = self.handler(item)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Pipeline stage '{self.name}' error: {e}")
+                traceback.print_exc()
+                continue
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if out is None:
+                continue
+
+            # EMA keeps the figure stable for the dashboard
+            self.avg_latency_ms = elapsed_ms if self.processed == 0 else 0.9 * self.avg_latency_ms + 0.1 * elapsed_ms
+            self.processed += 1
+            if isinstance(out, FramePacket):
+                out.timings[self.name] = elapsed_ms
+
+            if self.output_queue is not None:
+                self.output_queue.put(out, self._stop_event)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.avg_latency_ms, 2)
+        }
+
+
+class PerceptionPipeline:
+    """
+    Chains stages with bounded queues: capture -> inference -> analysis -> render.
+    Each stage runs on its own thread so a slow encode or engine never stalls
+    capture or inference.
+    """
+
+    def __init__(self, queue_size: int = 2, drop_policy: str = DROP_OLDEST,
+                 queue_policies: Optional[Dict[str, str]] = None):
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.queue_policies = queue_policies or {}
+        self.stages: List[PipelineStage] = []
+        self.queues: List[StageQueue] = []
+        self._stop_event = threading.Event()
+
+    def add_stage(self, name: str, handler: Callable) -> PipelineStage:
+        """Append a stage; a queue is created between it and the previous stage."""
+        input_queue = None
+        if self.stages:
+            prev = self.stages[-1]
+            queue_name = f"{prev.name}->{name}"
+            input_queue = StageQueue(
+                queue_name,
+                maxsize=self.queue_size,
+                drop_policy=self.queue_policies.get(name, self.drop_policy)
+            )
+            prev.output_queue = input_queue
+            self.queues.append(input_queue)
+
+        stage = PipelineStage(name, handler, input_queue=input_queue)
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        self._stop_event.clear()
+        for stage in self.stages:
+            stage.start(self._stop_event)
+
+    def stop(self):
+        self._stop_event.set()
+        for stage in self.stages:
+            stage.join()
+        for q in self.queues:
+            q.clear()
+
+    @property
+    def running(self) -> bool:
+        return not self._stop_event.is_set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "stages": {s.name: s.get_stats() for s in self.stages},
+            "queues": {q.name: q.get_stats() for q in self.queues}
+        }
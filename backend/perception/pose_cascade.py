@@ -0,0 +1,138 @@
+import time
+import logging
+import numpy as np
+from typing import Dict, Any, List, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+class PoseCascade:
+    """
+    Second stage of the mall cascade (one per camera stream).
+
+    The regular detector finds and tracks people; this stage runs the pose model
+    on a single batch of padded person crops, only for tracks that need it:
+    suspicious ones first, then new tracks, tracks that moved since their last
+    pose, and finally stale ones. Keypoints are written straight onto the track
+    that produced the crop (no centroid re-matching); tracks skipped this frame
+    keep their last skeleton, shifted with the box.
+    """
+
+    def __init__(self, model_provider, max_crops: int = 8, refresh_interval: float = 1.0,
+                 move_threshold: float = 40.0, padding: float = 0.1, imgsz: int = 320, conf: float = 0.25):
+        self.model_provider = model_provider  # () -> AdvancedDetector running a -pose model
+        self.max_crops = max_crops
+        self.refresh_interval = refresh_interval  # Seconds before a skeleton is considered stale
+        self.move_threshold = move_threshold      # Display px the box centre may move before re-posing
+        self.padding = padding
+        self.imgsz = imgsz                        # Crops are small; no need for 640 letterboxing
+        self.conf = conf
+
+        self.poses: Dict[int, Dict[str, Any]] = {}  # track_id -> {'keypoints', 'center', 'time'}
+        self.crops_run = 0
+        self.frames_run = 0
+
+    @staticmethod
+    def _center(box) -> np.ndarray:
+        return np.array([(box[0] + box[2]) / 2, (box[1] + box[3]) / 2], dtype=np.float32)
+
+    def select(self, tracks: List[Dict[str, Any]], suspicious_ids: Iterable[int] = (), now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Tracks that need a fresh pose this frame, most important first, capped at max_crops"""
+        now = now or time.time()
+        suspicious = set(suspicious_ids)
+        ranked = []
+        for t in tracks:
+            if t.get('label') != 'person' or t.get('disappeared', 0) > 0:
+                continue
+            cached = self.poses.get(t['id'])
+            if t['id'] in suspicious:
+                priority = 0
+            elif cached is None:
+                priority = 1
+            elif np.linalg.norm(self._center(t['box']) - cached['center']) > self.move_threshold:
+                priority = 2
+            elif now - cached['time'] > self.refresh_interval:
+                priority = 3
+            else:
+                continue
+            ranked.append((priority, t['id'], t))
+        ranked.sort(key=lambda r: (r[0], r[1]))
+        return [t for _, _, t in ranked[:self.max_crops]]
+
+    def process(self, frame: np.ndarray, tracks: List[Dict[str, Any]], suspicious_ids: Iterable[int] = ()):
+        """Run pose on the selected crops and attach keypoints (frame coordinates) to every person track"""
+        now = time.time()
+        selected = self.select(tracks, suspicious_ids, now)
+        if selected:
+            self._run(frame, selected, now)
+
+        live_ids = set()
+        for t in tracks:
+            live_ids.add(t['id'])
+            cached = self.poses.get(t['id'])
+            if cached is None or cached['keypoints'] is None:
+                continue
+            # Skipped this frame: carry the last skeleton along with the box
+            shift = self._center(t['box']) - cached['center']
+            kpts = cached['keypoints'].copy()
+            kpts[:, :2] += shift
+            t['keypoints'] = kpts
+
+        for track_id in [k for k in self.poses if k not in live_ids]:
+            del self.poses[track_id]
+
+    def _run(self, frame: np.ndarray, selected: List[Dict[str, Any]], now: float):
+        h, w = frame.shape[:2]
+        crops, origins, inner_boxes = [], [], []
+        for t in selected:
+            x1, y1, x2, y2 = t['box']
+            pad_x, pad_y = (x2 - x1) * self.padding, (y2 - y1) * self.padding
+            cx1, cy1 = int(max(0, x1 - pad_x)), int(max(0, y1 - pad_y))
+            cx2, cy2 = int(min(w, x2 + pad_x)), int(min(h, y2 + pad_y))
+            if cx2 - cx1 < 8 or cy2 - cy1 < 8:
+                continue
+            crops.append(frame[cy1:cy2, cx1:cx2])
+            origins.append((cx1, cy1, t))
+            inner_boxes.append([x1 - cx1, y1 - cy1, x2 - cx1, y2 - cy1])
+
+        if not crops:
+            return
+        try:
+            results = self.model_provider().predict_batch(crops, conf=self.conf, imgsz=self.imgsz)
+        except Exception as e:
+            logger.error(f"Pose cascade failed: {e}")
+            return
+
+        self.frames_run += 1
+        self.crops_run += len(crops)
+        for (ox, oy, t), inner, res in zip(origins, inner_boxes, results):
+            kpts = self._best_pose(res, np.array(inner, dtype=np.float32))
+            if kpts is not None:
+                kpts[:, 0] += ox
+                kpts[:, 1] += oy
+            self.poses[t['id']] = {'keypoints': kpts, 'center': self._center(t['box']), 'time': now}
+
+    @staticmethod
+    def _best_pose(res, inner: np.ndarray) -> Optional[np.ndarray]:
+        """Skeleton of the crop's pose detection overlapping the tracked box the most"""
+        if res.boxes is None or len(res.boxes) == 0 or res.keypoints is None:
+            return None
+        boxes = res.boxes.xyxy.cpu().numpy()
+        x1 = np.maximum(boxes[:, 0], inner[0])
+        y1 = np.maximum(boxes[:, 1], inner[1])
+        x2 = np.minimum(boxes[:, 2], inner[2])
+        y2 = np.minimum(boxes[:, 3], inner[3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        union = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]) + \
+                (inner[2] - inner[0]) * (inner[3] - inner[1]) - inter
+        iou = inter / np.maximum(union, 1e-6)
+        best = int(iou.argmax())
+        if iou[best] < 0.3:
+            return None
+        return res.keypoints.data.cpu().numpy()[best].copy()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "frames_run": self.frames_run,
+            "crops_run": self.crops_run,
+            "posed_tracks": sum(1 for p in self.poses.values() if p['keypoints'] is not None)
+        }
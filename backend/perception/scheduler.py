@@ -0,0 +1,152 @@
+import math
+import time
+import logging
+from typing import Dict, Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Why the current cadence was chosen (reported in telemetry)
+REASON_FIXED = "fixed"                # Adaptive scheduling disabled
+REASON_WARMUP = "warmup"              # No timings measured yet
+REASON_STEADY = "steady"              # Configured base cadence
+REASON_IDLE = "idle"                  # No tracks: slow down
+REASON_FAST_MOTION = "fast_motion"    # Tracks moving fast: speed up
+REASON_ALERT = "alert"                # Engine alert in progress: every frame
+REASON_BUDGET = "latency_budget"      # Measured cost forces a slower cadence
+
+
+class InferenceScheduler:
+    """
+    Decides on which frames the full detector runs.
+
+    The preferred interval follows the scene (alert -> 1, fast motion -> 2,
+    idle -> idle_interval, otherwise the configured base). It is then floored by
+    the measured cost: the detector may only run as often as the display frame
+    budget allows (inference_ms amortised over the interval plus the per-frame
+    work must fit in 1000 / target_fps), and the floor is raised further while
+    end-to-end latency stays above target.
+    """
+
+    def __init__(self, base_interval: int = 1, adaptive: bool = True, target_latency_ms: float = 150.0,
+                 target_fps: float = 30.0, max_interval: int = 15, idle_interval: int = 6,
+                 fast_speed: float = 400.0, alert_hold: float = 5.0):
+        self.base_interval = max(1, base_interval)
+        self.adaptive = adaptive
+        self.target_latency_ms = target_latency_ms
+        self.target_fps = target_fps
+        self.max_interval = max(self.base_interval, max_interval)
+        self.idle_interval = idle_interval
+        self.fast_speed = fast_speed        # Display px per second
+        self.alert_hold = alert_hold        # Seconds an alert keeps the cadence at 1
+
+        self.interval = self.base_interval
+        self.reason = REASON_FIXED if not adaptive else REASON_WARMUP
+        self.frames_since_run = 0
+        self.latency_backoff = 0
+
+        # EMAs of measured costs (ms)
+        self.inference_ms = 0.0
+        self.light_ms = 0.0          # Inference-stage cost on non-detector frames (flow, gating)
+        self.analysis_ms = 0.0
+        self.latency_ms = 0.0        # Capture -> analysis done
+
+        self.track_count = 0
+        self.track_speed = 0.0
+        self.last_alert = 0.0
+        self._last_centroids: Dict[Any, tuple] = {}
+
+    @staticmethod
+    def _ema(current: float, sample: float, alpha: float = 0.2) -> float:
+        return sample if current == 0.0 else (1 - alpha) * current + alpha * sample
+
+    def should_run(self, force: bool = False) -> bool:
+        """Called once per frame; True when the detector should run on it"""
+        self.frames_since_run += 1
+        if force or self.frames_since_run >= self.interval:
+            self.frames_since_run = 0
+            return True
+        return False
+
+    def record_inference(self, elapsed_ms: float, ran_detector: bool):
+        if ran_detector:
+            self.inference_ms = self._ema(self.inference_ms, elapsed_ms)
+        else:
+            self.light_ms = self._ema(self.light_ms, elapsed_ms)
+
+    def record_analysis(self, elapsed_ms: float, latency_ms: float):
+        self.analysis_ms = self._ema(self.analysis_ms, elapsed_ms)
+        self.latency_ms = self._ema(self.latency_ms, latency_ms)
+        self._update_interval()
+
+    def observe_tracks(self, centroids: Iterable, alert: bool = False, now: Optional[float] = None):
+        """
+        Scene state for this frame: (track_key, x, y) display-space centroids and
+        whether any engine raised an alert.
+        """
+        now = now or time.time()
+        if alert:
+            self.last_alert = now
+
+        speeds = []
+        current = {}
+        for key, x, y in centroids:
+            current[key] = (x, y, now)
+            prev = self._last_centroids.get(key)
+            if prev and now > prev[2]:
+                speeds.append(math.hypot(x - prev[0], y - prev[1]) / (now - prev[2]))
+        self._last_centroids = current
+        self.track_count = len(current)
+        self.track_speed = self._ema(self.track_speed, max(speeds) if speeds else 0.0, alpha=0.3)
+
+    def _update_interval(self):
+        if not self.adaptive:
+            self.interval, self.reason = self.base_interval, REASON_FIXED
+            return
+        if self.inference_ms == 0.0:
+            self.interval, self.reason = self.base_interval, REASON_WARMUP
+            return
+
+        # Scene preference
+        if time.time() - self.last_alert < self.alert_hold:
+            preferred, reason = 1, REASON_ALERT
+        elif self.track_speed > self.fast_speed:
+            preferred, reason = min(2, self.base_interval), REASON_FAST_MOTION
+        elif self.track_count == 0:
+            preferred, reason = max(self.base_interval, self.idle_interval), REASON_IDLE
+        else:
+            preferred, reason = self.base_interval, REASON_STEADY
+
+        # Cost floor: inference_ms / k + light_ms must fit the frame budget
+        frame_budget = 1000.0 / self.target_fps
+        headroom = max(frame_budget - self.light_ms, 1.0)
+        floor = math.ceil(self.inference_ms / headroom)
+
+        # Latency feedback: back off while over target, recover once comfortably under
+        if self.latency_ms > self.target_latency_ms:
+            self.latency_backoff = min(self.latency_backoff + 1, self.max_interval)
+        elif self.latency_ms < 0.8 * self.target_latency_ms and self.latency_backoff > 0:
+            self.latency_backoff -= 1
+        floor = min(floor + self.latency_backoff, self.max_interval)
+
+        interval = max(preferred, floor)
+        if interval > preferred:
+            reason = REASON_BUDGET
+        interval = min(interval, self.max_interval)
+
+        if (interval, reason) != (self.interval, self.reason):
+            logger.debug(f"Detector cadence {self.interval} -> {interval} ({reason})")
+        self.interval, self.reason = interval, reason
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "reason": self.reason,
+            "detector_fps": round(self.target_fps / self.interval, 1),
+            "inference_ms": round(self.inference_ms, 2),
+            "light_ms": round(self.light_ms, 2),
+            "analysis_ms": round(self.analysis_ms, 2),
+            "latency_ms": round(self.latency_ms, 2),
+            "track_count": self.track_count,
+            "track_speed": round(self.track_speed, 1),
+            "latency_backoff": self.latency_backoff
+        }
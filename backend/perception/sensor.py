@@ -2,7 +2,10 @@ from abc import ABC, abstractmethod
 import cv2
 import time
 import logging
-from typing import Iterator, Tuple, Optional, Union
+import threading
+import numpy as np
+from collections import deque
+from typing import Iterator, Tuple, Optional, Union, Dict, Any
 
 logger = logging.getLogger(__name__)
 
@@ -11,11 +14,26 @@ class SensorConfig(ABC):
     pass
 
 class VideoSensorConfig(SensorConfig):
-    def __init__(self, source: Union[str, int], name: str, fps_limit: int = 30, frame_skip: int = 0):
+    def __init__(self, source: Union[str, int], name: str, fps_limit: int = 30, frame_skip: int = 0,
+                 threaded: bool = False, buffer_size: int = 4, realtime: bool = True,
+                 backend: str = "opencv", display_size: Tuple[int, int] = (1280, 720),
+                 proxy_size: Tuple[int, int] = (854, 480), decoder_threads: int = 0):
         self.source = source
         self.name = name
-        self.fps_limit = fps_limit
+        self.fps_limit = fps_limit  # Max frames delivered per second (0 = unlimited)
         self.frame_skip = frame_skip  # Skip N frames between reads (for simulation speedup)
+        self.realtime = realtime  # Pace file playback to the container timestamps
+        self.threaded = threaded  # Decode on a background grabber thread
+        self.buffer_size = buffer_size  # Ring buffer slots for the grabber
+        self.backend = backend  # "opencv" | "ffmpeg"
+        self.display_size = display_size  # (w, h) of the rendering stream
+        self.proxy_size = proxy_size  # (w, h) of the AI proxy stream
+        self.decoder_threads = decoder_threads  # ffmpeg backend decode threads (0 = auto)
+
+    @property
+    def is_file(self) -> bool:
+        # Network streams (rtsp://, http://) are live sources, not seekable files
+        return isinstance(self.source, str) and not self.source.isdigit() and "://" not in self.source
 
 class BaseSensor(ABC):
     """Unified Sensor Interface"""
@@ -39,6 +57,102 @@ class BaseSensor(ABC):
         """Read a single data point/frame"""
         pass
 
+class FrameGrabber:
+    """
+    Background decoder for a VideoSensor with a small ring buffer.
+    - "latest": live sources (webcam/RTSP). The driver buffer is drained continuously
+      and read() returns only the newest frame; older frames count as dropped.
+    - "prefetch": file sources. Frames are decoded ahead in order and never dropped;
+      the grabber waits when the ring is full.
+    """
+    LATEST = "latest"
+    PREFETCH = "prefetch"
+
+    def __init__(self, read_fn, name: str, mode: str = LATEST, buffer_size: int = 4):
+        self.read_fn = read_fn
+        self.name = name
+        self.mode = mode
+        self.buffer = deque(maxlen=max(1, buffer_size))
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+        # Stats
+        self.frames_decoded = 0
+        self.dropped_frames = 0
+        self.decode_fps = 0.0
+        self._fps_window_start = time.time()
+        self._fps_window_count = 0
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"grabber-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+    def _run(self):
+        while self.running:
+            if self.mode == self.PREFETCH:
+                # Lossless: wait for the consumer to free a slot before decoding ahead
+                with self.cond:
+                    while self.running and len(self.buffer) >= self.buffer.maxlen:
+                        self.cond.wait(timeout=0.1)
+                if not self.running:
+                    break
+
+            ret, frame = self.read_fn()
+            if not ret:
+                time.sleep(0.05)
+                continue
+
+            with self.cond:
+                if len(self.buffer) == self.buffer.maxlen:
+                    # Only reachable in LATEST mode: the oldest frame is overwritten
+                    self.dropped_frames += 1
+                self.buffer.append(frame)
+                self.cond.notify_all()
+            self._update_fps()
+
+    def _update_fps(self):
+        self.frames_decoded += 1
+        self._fps_window_count += 1
+        elapsed = time.time() - self._fps_window_start
+        if elapsed >= 1.0:
+            self.decode_fps = self._fps_window_count / elapsed
+            self._fps_window_start = time.time()
+            self._fps_window_count = 0
+
+    def read(self, timeout: float = 0.5) -> Tuple[bool, Optional[object]]:
+        with self.cond:
+            if not self.buffer:
+                self.cond.wait_for(lambda: self.buffer or not self.running, timeout=timeout)
+            if not self.buffer:
+                return False, None
+
+            if self.mode == self.LATEST:
+                frame = self.buffer.pop()
+                self.dropped_frames += len(self.buffer)
+                self.buffer.clear()
+            else:
+                frame = self.buffer.popleft()
+                self.cond.notify_all()
+            return True, frame
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "decode_fps": round(self.decode_fps, 1),
+            "frames_decoded": self.frames_decoded,
+            "dropped_frames": self.dropped_frames,
+            "buffered": len(self.buffer)
+        }
+
 class VideoSensor(BaseSensor):
     """Handles Webcams, IP Cameras, and Video Files"""
     
@@ -46,6 +160,13 @@ class VideoSensor(BaseSensor):
         super().__init__(config)
         self.cap = None
         self.config: VideoSensorConfig = config # Type hint
+        self.grabber: Optional[FrameGrabber] = None
+
+        # Frame pacing / decode-free skipping
+        self.source_fps = 0.0
+        self.skipped_frames = 0  # Frames dropped with grab() (never decoded)
+        self._last_emit = 0.0
+        self._pace_anchor: Optional[Tuple[float, float]] = None  # (wall time, media time ms)
     
     def connect(self) -> bool:
         logger.info(f"Connecting to video sensor: {self.config.name} ({self.config.source})")
@@ -65,26 +186,119 @@ class VideoSensor(BaseSensor):
             return False
             
         self.is_active = True
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.source_fps = fps if fps and fps == fps and fps < 1000 else 0.0  # Guard NaN/garbage
+        self._pace_anchor = None
+        self._last_emit = 0.0
+
+        if self.config.threaded:
+            mode = FrameGrabber.PREFETCH if self.config.is_file else FrameGrabber.LATEST
+            self.grabber = FrameGrabber(self._read_frame, self.config.name, mode=mode,
+                                        buffer_size=self.config.buffer_size)
+            self.grabber.start()
+            logger.info(f"Background grabber started for {self.config.name} ({mode})")
         return True
 
     def disconnect(self):
+        self.is_active = False
+        if self.grabber:
+            self.grabber.stop()
+            self.grabber = None
         if self.cap:
             self.cap.release()
-        self.is_active = False
         logger.info(f"Disconnected from {self.config.name}")
 
     def read(self) -> Tuple[bool, Optional[object]]:
+        if self.grabber:
+            return self.grabber.read()
+        return self._read_frame()
+
+    def read_scaled(self) -> Tuple[bool, Optional[object], Optional[object]]:
+        """Returns (ret, display_frame, ai_proxy) at the configured display/proxy sizes"""
+        ret, frame = self.read()
+        if not ret:
+            return False, None, None
+
+        # --- SENIOR ARCHITECTURE: DUAL-STREAM RENDERING ---
+        # Stream 1: High-Res Display Frame (720p)
+        display_frame = cv2.resize(frame, self.config.display_size)
+
+        # Stream 2: AI Proxy Frame (Sub-sampled for speed, 480p)
+        ai_proxy = cv2.resize(display_frame, self.config.proxy_size)
+        return True, display_frame, ai_proxy
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-sensor decode FPS and dropped-frame counters"""
+        stats = {
+            "name": self.config.name,
+            "active": self.is_active,
+            "threaded": self.grabber is not None,
+            "source_fps": round(self.source_fps, 1),
+            "skipped_frames": self.skipped_frames
+        }
+        if self.grabber:
+            stats.update(self.grabber.get_stats())
+        return stats
+
+    def _file_stride(self) -> int:
+        """Frames advanced per delivered frame for file sources (frame_skip and fps_limit combined)"""
+        stride = self.config.frame_skip + 1
+        if self.config.fps_limit and self.source_fps > self.config.fps_limit:
+            stride = max(stride, int(np.ceil(self.source_fps / self.config.fps_limit)))
+        return stride
+
+    def _skip_frames(self, count: int):
+        # grab() advances the demuxer without decoding/converting pixels
+        for _ in range(count):
+            if not self.cap.grab():
+                return
+            self.skipped_frames += 1
+
+    def _limit_live_rate(self):
+        """Drain frames that arrive faster than fps_limit without decoding them"""
+        self._skip_frames(self.config.frame_skip)
+        if not self.config.fps_limit:
+            return
+        min_interval = 1.0 / self.config.fps_limit
+        while self.is_active and time.time() - self._last_emit < min_interval:
+            if not self.cap.grab():
+                return
+            self.skipped_frames += 1
+
+    def _pace_playback(self):
+        """Sleep until the current frame's presentation time (file sources)"""
+        media_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if not media_ms and self.source_fps:
+            media_ms = self.cap.get(cv2.CAP_PROP_POS_FRAMES) * 1000.0 / self.source_fps
+
+        now = time.time()
+        if self._pace_anchor is None:
+            self._pace_anchor = (now, media_ms)
+            return
+
+        wall_start, media_start = self._pace_anchor
+        delay = wall_start + (media_ms - media_start) / 1000.0 - now
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -0.5:
+            # Fell behind (slow consumer): re-anchor instead of bursting to catch up
+            self._pace_anchor = (now, media_ms)
+
+    def _read_frame(self) -> Tuple[bool, Optional[object]]:
         if not self.is_active or not self.cap:
             return False, None
+
+        if self.config.is_file:
+            self._skip_frames(self._file_stride() - 1)
+        else:
+            self._limit_live_rate()
             
         ret, frame = self.cap.read()
         if not ret:
             # If it's a file (not webcam), loop it
-            # Check if source is a file path (string and not digit)
-            is_file = isinstance(self.config.source, str) and not self.config.source.isdigit()
-            
-            if is_file:
+            if self.config.is_file:
                 logger.info(f"Looping video file: {self.config.source}")
+                self._pace_anchor = None
                 self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
                 ret, frame = self.cap.read()
                 
@@ -101,45 +315,164 @@ class VideoSensor(BaseSensor):
                  # self.is_active = False 
                  return False, None
             
+        if self.config.is_file and self.config.realtime:
+            self._pace_playback()
+        self._last_emit = time.time()
+
         # Mirror webcam (if source was an int/digit)
         if hasattr(self, 'is_webcam') and self.is_webcam:
             frame = cv2.flip(frame, 1)
             
         return True, frame
 
+class PoolChannel:
+    """Latest-frame slot for one pooled sensor, filled by its own decode thread"""
+
+    def __init__(self, sensor: VideoSensor):
+        self.sensor = sensor
+        self.name = sensor.config.name
+        self.frame = None
+        self.proxy = None  # AI proxy scaled by the sensor backend alongside frame
+        self.frame_time = 0.0
+        self.seq = 0
+        self.served_seq = 0  # Last seq handed out in a batch
+        self.thread: Optional[threading.Thread] = None
+
+        # Stats
+        self.decode_fps = 0.0
+        self.frames_decoded = 0
+        self.dropped_frames = 0
+        self._fps_window_start = time.time()
+        self._fps_window_count = 0
+
 class SensorPool:
-    """Manages multiple sensors as a pooled resource for batch processing"""
-    
-    def __init__(self, sensors: list[VideoSensor]):
+    """
+    Manages multiple sensors as a pooled resource for batch processing.
+    Every sensor is decoded on its own thread, so a stalled stream never blocks
+    the others and decode time scales with cores instead of channel count.
+    """
+
+    FRESH = "fresh"      # New frame since the last batch
+    STALE = "stale"      # No new frame within the deadline; last frame is re-served
+    MISSING = "missing"  # No frame yet, or the last one is too old to trust
+
+    def __init__(self, sensors: list[VideoSensor], stale_after: float = 2.0):
         self.sensors = sensors
         self.current_idx = 0
         self.active_sensors = []
-        
+        self.channels: list[PoolChannel] = []
+        self.stale_after = stale_after  # Seconds before a stale channel is reported missing
+        self.cond = threading.Condition()
+        self.running = False
+
     def connect_all(self):
         for sensor in self.sensors:
             if sensor.connect():
                 self.active_sensors.append(sensor)
+                self.channels.append(PoolChannel(sensor))
+
+        self.running = True
+        for channel in self.channels:
+            channel.thread = threading.Thread(target=self._decode_loop, args=(channel,),
+                                              name=f"pool-{channel.name}", daemon=True)
+            channel.thread.start()
         return len(self.active_sensors) > 0
-        
+
     def disconnect_all(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        for channel in self.channels:
+            if channel.thread:
+                channel.thread.join(timeout=1.0)
         for sensor in self.active_sensors:
             sensor.disconnect()
         self.active_sensors.clear()
-        
-    def get_next_batch(self, batch_size: int = 4) -> list[Tuple[str, object]]:
-        """Returns a list of (sensor_name, frame) tuples for batch AI processing"""
+        self.channels.clear()
+
+    def _decode_loop(self, channel: PoolChannel):
+        while self.running:
+            # Display + proxy from the backend (ffmpeg scales both at decode time)
+            ret, frame, proxy = channel.sensor.read_scaled()
+            if not ret:
+                time.sleep(0.05)
+                continue
+
+            with self.cond:
+                if channel.seq > channel.served_seq:
+                    # Previous frame was never consumed (latest-frame-wins)
+                    channel.dropped_frames += 1
+                channel.frame = frame
+                channel.proxy = proxy
+                channel.frame_time = time.time()
+                channel.seq += 1
+                self.cond.notify_all()
+
+            channel.frames_decoded += 1
+            channel._fps_window_count += 1
+            elapsed = time.time() - channel._fps_window_start
+            if elapsed >= 1.0:
+                channel.decode_fps = channel._fps_window_count / elapsed
+                channel._fps_window_start = time.time()
+                channel._fps_window_count = 0
+
+    def get_next_batch(self, batch_size: Optional[int] = None, deadline: float = 0.05) -> list[Dict[str, Any]]:
+        """
+        Returns one entry per selected channel: {'name', 'frame', 'proxy', 'status', 'age'}.
+        Waits at most `deadline` seconds for every channel to deliver a new frame,
+        then returns whatever is ready. Missing/stale channels are marked explicitly
+        ('frame' is None for missing ones).
+        """
+        if not self.channels:
+            return []
+
+        # Round-robin window when there are more channels than batch slots
+        count = len(self.channels) if batch_size is None else min(batch_size, len(self.channels))
+        selected = [self.channels[(self.current_idx + i) % len(self.channels)] for i in range(count)]
+        self.current_idx = (self.current_idx + count) % len(self.channels)
+
         batch = []
-        if not self.active_sensors:
-            return batch
-            
-        # Round-robin selection or just all of them
-        for _ in range(min(batch_size, len(self.active_sensors))):
-            sensor = self.active_sensors[self.current_idx]
-            ret, frame = sensor.read()
-            if ret:
-                batch.append((sensor.config.name, frame))
-            
-            self.current_idx = (self.current_idx + 1) % len(self.active_sensors)
-            
+        with self.cond:
+            self.cond.wait_for(lambda: all(c.seq > c.served_seq for c in selected) or not self.running,
+                               timeout=deadline)
+            now = time.time()
+            for c in selected:
+                age = now - c.frame_time if c.frame is not None else None
+                if c.seq > c.served_seq:
+                    status = self.FRESH
+                elif c.frame is not None and age <= self.stale_after:
+                    status = self.STALE
+                else:
+                    status = self.MISSING
+
+                batch.append({
+                    'name': c.name,
+                    'frame': c.frame if status != self.MISSING else None,
+                    'proxy': c.proxy if status != self.MISSING else None,
+                    'status': status,
+                    'age': age
+                })
+                c.served_seq = c.seq
+
         return batch
 
+    def get_stats(self) -> list[Dict[str, Any]]:
+        now = time.time()
+        return [{
+            "name": c.name,
+            "active": c.sensor.is_active,
+            "threaded": True,
+            "decode_fps": round(c.decode_fps, 1),
+            "frames_decoded": c.frames_decoded,
+            "dropped_frames": c.dropped_frames,
+            "frame_age": round(now - c.frame_time, 3) if c.frame is not None else None
+        } for c in self.channels]
+
+def create_video_sensor(config: VideoSensorConfig) -> VideoSensor:
+    """Instantiate the decoder backend requested by the config"""
+    if config.backend == "ffmpeg":
+        from backend.perception.ffmpeg_sensor import FFmpegVideoSensor, ffmpeg_available
+        if ffmpeg_available():
+            return FFmpegVideoSensor(config)
+        logger.warning("ffmpeg binary not found, falling back to OpenCV decoder")
+    return VideoSensor(config)
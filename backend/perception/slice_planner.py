@@ -0,0 +1,188 @@
+import logging
+import weakref
+import cv2
+import numpy as np
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def slice_grid(h: int, w: int, slice_size: int = 640, overlap: float = 0.2) -> np.ndarray:
+    """Overlapping SAHI tiles covering an h x w frame, as an (N, 4) int array of x1, y1, x2, y2"""
+    stride = max(1, int(slice_size * (1 - overlap)))
+    tiles = []
+    for y in range(0, h - slice_size + stride, stride):
+        for x in range(0, w - slice_size + stride, stride):
+            # Clamp to image boundaries
+            y_end = min(y + slice_size, h)
+            x_end = min(x + slice_size, w)
+            tiles.append((max(0, x_end - slice_size), max(0, y_end - slice_size), x_end, y_end))
+    return np.array(tiles, dtype=np.int32).reshape(-1, 4)
+
+class SlicePlanner:
+    """
+    Chooses which SAHI tiles to run on a frame (one per camera stream).
+
+    A tile runs when pixels inside it changed since the previous planned frame
+    (frame difference on a downscaled gray image, summed per tile through an
+    integral image), or when it overlaps a box detected in one of the last
+    `track_memory` runs. Every `full_sweep_interval` frames all tiles run, so
+    objects that appear without motion are still found. With adaptive=False the
+    planner only fixes the tile geometry and every tile runs on every frame.
+
+    Temporal reuse (reuse=True): each tile keeps the detections and downscaled
+    pixels of its last inference. A selected tile whose pixels still match that
+    snapshot (changed share below motion_threshold) is not inferred again; its
+    cached detections are served instead until it changes or the next full sweep.
+    The cache belongs to the model that filled it: planning for another model
+    (hot-swap, rollback, use-case switch) drops it.
+    """
+
+    def __init__(self, slice_size: int = 640, overlap: float = 0.2, adaptive: bool = True,
+                 full_sweep_interval: int = 10, motion_threshold: float = 0.002, track_margin: int = 32,
+                 track_memory: int = 3, diff_threshold: int = 25, downscale: int = 4, reuse: bool = True):
+        self.slice_size = slice_size
+        self.overlap = overlap
+        self.adaptive = adaptive
+        self.full_sweep_interval = max(1, full_sweep_interval)
+        self.motion_threshold = motion_threshold    # Changed-pixel share of a tile that counts as motion
+        self.track_margin = track_margin            # Prior boxes are grown by this many pixels
+        self.diff_threshold = diff_threshold        # Gray-level difference that counts as a changed pixel
+        self.downscale = max(1, downscale)
+        self.reuse = reuse
+
+        self.tiles = np.zeros((0, 4), dtype=np.int32)
+        self._small_tiles = np.zeros((0, 4), dtype=np.int32)  # Tiles in downscaled pixels
+        self._shape: Optional[Tuple[int, int]] = None
+        self._small: Optional[np.ndarray] = None
+        self._prev_small: Optional[np.ndarray] = None
+        self._recent = deque(maxlen=max(1, track_memory))  # Detected boxes of the last runs
+        self.since_sweep = 0
+        self._run = np.zeros(0, dtype=bool)       # Tiles inferred on the planned frame
+        self._reused = np.zeros(0, dtype=bool)    # Tiles served from cache on the planned frame
+        self._cache: Dict[int, List[Dict[str, Any]]] = {}  # Tile index -> detections of its last run
+        self._refs: Dict[int, np.ndarray] = {}    # Tile index -> downscaled pixels of its last run
+        self._model_ref = None                    # Weak reference to the model the cache came from
+
+        self.frames = 0
+        self.full_sweeps = 0
+        self.tiles_run = 0
+        self.last_tiles = 0
+        self.tiles_reused = 0
+        self.last_reused = 0
+
+    def _reset(self, shape: Tuple[int, int]):
+        self._shape = shape
+        self.tiles = slice_grid(shape[0], shape[1], self.slice_size, self.overlap)
+        small_w, small_h = max(1, shape[1] // self.downscale), max(1, shape[0] // self.downscale)
+        self._small_tiles = np.minimum(self.tiles // self.downscale, [small_w, small_h] * 2)
+        self._prev_small = None
+        self._recent.clear()
+        self._cache.clear()
+        self._refs.clear()
+        self.since_sweep = self.full_sweep_interval  # Geometry changed: sweep everything once
+
+    def _motion_tiles(self, small: np.ndarray) -> np.ndarray:
+        """Tiles whose changed-pixel share reaches motion_threshold"""
+        if self._prev_small is None:
+            return np.ones(len(self.tiles), dtype=bool)
+        changed = (cv2.absdiff(small, self._prev_small) > self.diff_threshold).astype(np.uint8)
+        integral = cv2.integral(changed)
+        t = self._small_tiles
+        x1, y1, x2, y2 = t[:, 0], t[:, 1], t[:, 2], t[:, 3]
+        counts = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+        areas = np.maximum((x2 - x1) * (y2 - y1), 1)
+        return counts / areas >= self.motion_threshold
+
+    def _unchanged_tiles(self, small: np.ndarray) -> np.ndarray:
+        """Cached tiles whose pixels still match the snapshot taken when they were last inferred"""
+        unchanged = np.zeros(len(self.tiles), dtype=bool)
+        for i, ref in self._refs.items():
+            x1, y1, x2, y2 = self._small_tiles[i]
+            changed = cv2.countNonZero((cv2.absdiff(small[y1:y2, x1:x2], ref) > self.diff_threshold).astype(np.uint8))
+            unchanged[i] = changed / max(ref.size, 1) < self.motion_threshold
+        return unchanged
+
+    def _prior_tiles(self, prior_boxes) -> np.ndarray:
+        """Tiles overlapping a recently detected box (grown by track_margin)"""
+        boxes = [np.asarray(b, dtype=np.float32).reshape(-1, 4) for b in self._recent]
+        if len(prior_boxes):
+            boxes.append(np.asarray(prior_boxes, dtype=np.float32).reshape(-1, 4))
+        boxes = np.concatenate(boxes) if boxes else np.zeros((0, 4), dtype=np.float32)
+        if len(boxes) == 0:
+            return np.zeros(len(self.tiles), dtype=bool)
+        m = self.track_margin
+        t = self.tiles[:, None, :]
+        hit = ((t[..., 0] < boxes[:, 2] + m) & (t[..., 2] > boxes[:, 0] - m) &
+               (t[..., 1] < boxes[:, 3] + m) & (t[..., 3] > boxes[:, 1] - m))
+        return hit.any(axis=1)
+
+    def plan(self, frame: np.ndarray, prior_boxes=(), model=None) -> np.ndarray:
+        """
+        Tiles (N, 4, frame pixels) to infer on this frame; prior_boxes adds boxes known
+        to the caller, model is the detector that will run them (cached tile detections
+        of any other model are dropped). Pass their detections to record(), then read
+        tile_results().
+        """
+        h, w = frame.shape[:2]
+        if self._shape != (h, w):
+            self._reset((h, w))
+        if model is not None and (self._model_ref is None or self._model_ref() is not model):
+            self._model_ref = weakref.ref(model)
+            self._cache.clear()
+            self._refs.clear()
+
+        selected = np.ones(len(self.tiles), dtype=bool)
+        reused = np.zeros(len(self.tiles), dtype=bool)
+        self._small = None
+        if self.adaptive:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+            small = cv2.resize(gray, (max(1, w // self.downscale), max(1, h // self.downscale)),
+                               interpolation=cv2.INTER_AREA)
+            self.since_sweep += 1
+            if self.since_sweep >= self.full_sweep_interval:
+                self.since_sweep = 0
+                self.full_sweeps += 1
+            else:
+                selected = self._motion_tiles(small) | self._prior_tiles(prior_boxes)
+                if self.reuse:
+                    reused = selected & self._unchanged_tiles(small)
+                    selected &= ~reused
+            self._prev_small = small
+            self._small = small
+
+        self._run, self._reused = selected, reused
+        self.frames += 1
+        self.last_tiles = int(selected.sum())
+        self.last_reused = int(reused.sum())
+        self.tiles_run += self.last_tiles
+        self.tiles_reused += self.last_reused
+        return self.tiles[selected]
+
+    def record(self, detections: List[List[Dict[str, Any]]]):
+        """Per-tile detections for the tiles returned by the last plan(), in the same order"""
+        for i, dets in zip(np.flatnonzero(self._run), detections):
+            self._cache[i] = dets
+            if self.reuse and self._small is not None:
+                x1, y1, x2, y2 = self._small_tiles[i]
+                self._refs[i] = self._small[y1:y2, x1:x2].copy()
+
+    def tile_results(self) -> List[List[Dict[str, Any]]]:
+        """Detections of the planned frame per tile: fresh for inferred tiles, cached for reused ones"""
+        return [self._cache.get(i, []) for i in np.flatnonzero(self._run | self._reused)]
+
+    def observe(self, boxes):
+        """Boxes detected on the planned frame; their tiles run again on the next frames"""
+        self._recent.append(np.asarray(boxes, dtype=np.float32).reshape(-1, 4))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "slice_size": self.slice_size,
+            "overlap": self.overlap,
+            "tiles_total": len(self.tiles),
+            "tiles_last_frame": self.last_tiles,
+            "tiles_per_frame": round(self.tiles_run / self.frames, 2) if self.frames else 0.0,
+            "tiles_reused_last_frame": self.last_reused,
+            "tiles_reused_per_frame": round(self.tiles_reused / self.frames, 2) if self.frames else 0.0,
+            "full_sweeps": self.full_sweeps
+        }
@@ -0,0 +1,162 @@
+import heapq
+import time
+import logging
+import numpy as np
+from collections import defaultdict
+from typing import Dict, Any, Optional, Tuple
+from backend.perception.track_state import TrackState
+
+logger = logging.getLogger(__name__)
+
+class TrackedObject:
+    """
+    One registry entry. Slotted record with fixed-size ring buffers, so an object
+    costs the same memory on its first frame and its millionth.
+    """
+    __slots__ = (
+        'track_id', 'persistent_id', 'label', 'first_seen', 'last_seen', 'detection_count',
+        'status', 'lock_strength', 'last_bbox', 'last_announcement',
+        '_conf', '_conf_pos', '_conf_count', '_conf_sum', '_pos', '_pos_pos', '_pos_count'
+    )
+
+    def __init__(self, track_id: int, persistent_id: str, label: str, now: float,
+                 confidence_window: int, position_window: int):
+        self.track_id = track_id
+        self.persistent_id = persistent_id
+        self.label = label
+        self.first_seen = now
+        self.last_seen = now
+        self.detection_count = 0
+        self.status = 'active'
+        self.lock_strength = 0.0
+        self.last_bbox: Tuple[int, int, int, int] = (0, 0, 0, 0)
+        self.last_announcement: Optional[float] = None
+
+        self._conf = np.zeros(confidence_window, dtype=np.float32)
+        self._conf_pos = 0
+        self._conf_count = 0
+        self._conf_sum = 0.0
+        self._pos = np.zeros((position_window, 3), dtype=np.float64)  # (x, y, time)
+        self._pos_pos = 0
+        self._pos_count = 0
+
+    def observe(self, confidence: float, bbox: Tuple[int, int, int, int], now: float):
+        self.last_seen = now
+        self.detection_count += 1
+        self.last_bbox = bbox
+
+        # Running sum over the ring: subtract the sample being overwritten
+        size = len(self._conf)
+        if self._conf_count == size:
+            self._conf_sum -= float(self._conf[self._conf_pos])
+        else:
+            self._conf_count += 1
+        self._conf[self._conf_pos] = confidence
+        self._conf_sum += confidence
+        self._conf_pos = (self._conf_pos + 1) % size
+
+        self._pos[self._pos_pos] = ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2, now)
+        self._pos_pos = (self._pos_pos + 1) % len(self._pos)
+        self._pos_count = min(self._pos_count + 1, len(self._pos))
+
+    @property
+    def avg_confidence(self) -> float:
+        return self._conf_sum / self._conf_count if self._conf_count else 0.0
+
+    def positions(self) -> np.ndarray:
+        """Recent (x, y, time) centres, oldest first"""
+        if self._pos_count < len(self._pos):
+            return self._pos[:self._pos_count].copy()
+        return np.roll(self._pos, -self._pos_pos, axis=0)
+
+
+class IndustrialTracker:
+    """
+    Industrial-grade object tracking with persistent IDs and locking.
+
+    Bounded per object: confidence and position histories are ring buffers.
+    Lost objects expire through a min-heap of deadlines holding one entry per
+    object; an entry that comes due for an object seen since is pushed back with
+    its new deadline, so cleanup only touches objects that are actually due.
+    """
+    def __init__(self, lost_timeout: float = 5.0, confidence_window: int = 10, position_window: int = 20):
+        self.lost_timeout = lost_timeout
+        self.confidence_window = confidence_window
+        self.position_window = position_window
+
+        self.object_registry: Dict[int, TrackedObject] = {}  # track_id -> record
+        self.class_counters = defaultdict(int)  # class -> count
+        self.locked_objects = set()  # Currently locked objects
+        self._expiry = []  # (deadline, track_id)
+        self.expired = 0
+
+    def register_object(self, track: TrackState) -> str:
+        """Register or update object with persistent ID"""
+        current_time = time.time()
+        obj = self.object_registry.get(track.id)
+
+        if obj is None:
+            # New object detected
+            class_name = track.label.lower()
+            self.class_counters[class_name] += 1
+            obj = TrackedObject(track.id, f"{class_name}{self.class_counters[class_name]:03d}", track.label,
+                                current_time, self.confidence_window, self.position_window)
+            self.object_registry[track.id] = obj
+            heapq.heappush(self._expiry, (current_time + self.lost_timeout, track.id))
+            obj.observe(track.confidence, track.bbox, current_time)
+            return obj.persistent_id
+
+        obj.observe(track.confidence, track.bbox, current_time)
+
+        # Increase lock strength for consistent detections
+        if obj.detection_count > 3:
+            obj.lock_strength = min(obj.lock_strength + 0.05, 1.0)
+            if obj.lock_strength > 0.7 and track.id not in self.locked_objects:
+                self.locked_objects.add(track.id)
+                obj.status = 'locked'
+
+        return obj.persistent_id
+
+    def should_announce(self, track_id: int) -> bool:
+        """Check if object should be announced"""
+        current_time = time.time()
+        obj = self.object_registry.get(track_id)
+        if obj is None:
+            return False
+        if obj.last_announcement is None:
+            obj.last_announcement = current_time
+            return True
+
+        # Don't announce if recently announced (30 seconds) or object is locked
+        if current_time - obj.last_announcement < 30:
+            return False
+
+        if track_id in self.locked_objects:
+            return False
+
+        obj.last_announcement = current_time
+        return True
+
+    def cleanup_lost_objects(self, current_time: float):
+        """Remove objects that haven't been seen for lost_timeout seconds"""
+        while self._expiry and self._expiry[0][0] <= current_time:
+            _, track_id = heapq.heappop(self._expiry)
+            obj = self.object_registry.get(track_id)
+            if obj is None:
+                continue
+            deadline = obj.last_seen + self.lost_timeout
+            if deadline > current_time:
+                # Seen since this entry was scheduled
+                heapq.heappush(self._expiry, (deadline, track_id))
+                continue
+            del self.object_registry[track_id]
+            self.locked_objects.discard(track_id)
+            self.expired += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "objects": len(self.object_registry),
+            "locked": len(self.locked_objects),
+            "pending_expiry": len(self._expiry),
+            "expired": self.expired
+        }
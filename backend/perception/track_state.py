@@ -0,0 +1,41 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from backend.core.models import Track
+
+@dataclass(slots=True)
+class TrackState:
+    """
+    Hot-path track record passed between tracker, engines, zones and renderer.
+
+    Same attribute names as the API Track schema, but no validation: a pydantic
+    Track is only built when a track actually leaves the process (WebSocket,
+    REST), via to_model()/to_json().
+    """
+    id: int
+    label: str
+    confidence: float
+    bbox: Tuple[int, int, int, int]
+    first_seen: Optional[float] = None
+    last_seen: float = 0.0
+    velocity: Optional[Tuple[float, float]] = None
+    persistent_id: Optional[str] = None
+    status: str = "active"
+    lock_strength: float = 0.0
+    detection_count: int = 1
+    keypoints: Any = None
+    action: Optional[str] = None
+
+    def to_model(self) -> Track:
+        keypoints = self.keypoints.tolist() if isinstance(self.keypoints, np.ndarray) else self.keypoints
+        return Track(
+            id=self.id, label=self.label, confidence=float(self.confidence),
+            bbox=tuple(int(v) for v in self.bbox), velocity=self.velocity,
+            first_seen=self.first_seen, last_seen=self.last_seen,
+            persistent_id=self.persistent_id, status=self.status,
+            lock_strength=self.lock_strength, detection_count=self.detection_count,
+            keypoints=keypoints, action=self.action
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        return self.to_model().model_dump(mode='json')
@@ -1,5 +1,8 @@
 import numpy as np
 from scipy.spatial import distance as dist
+import lap
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from collections import OrderedDict
 import logging
 
@@ -16,15 +19,17 @@ class CentroidTracker:
         self.boxes = OrderedDict()    # ID -> (x1, y1, x2, y2)
         self.labels = OrderedDict()   # ID -> class_name
         self.disappeared = OrderedDict() # ID -> count
+        self.det_index = OrderedDict()   # ID -> index into this frame's rects (-1 if unmatched)
         
         self.max_disappeared = max_disappeared
         self.max_distance = max_distance
 
-    def register(self, centroid, box, label):
+    def register(self, centroid, box, label, det_idx=-1):
         self.objects[self.next_id] = centroid
         self.boxes[self.next_id] = box
         self.labels[self.next_id] = label
         self.disappeared[self.next_id] = 0
+        self.det_index[self.next_id] = det_idx
         self.next_id += 1
 
     def deregister(self, object_id):
@@ -32,12 +37,19 @@ class CentroidTracker:
         del self.disappeared[object_id]
         del self.boxes[object_id]
         del self.labels[object_id]
+        del self.det_index[object_id]
 
-    def update(self, rects, labels):
+    def update(self, rects, labels, scores=None):
         """
         rects: list of (x1, y1, x2, y2)
         labels: list of strings
+        scores: accepted for interface parity with ByteTracker, unused
+        Each returned track carries det_idx: the index of the rect it was matched
+        to (or registered from) this frame, -1 if it was not observed.
         """
+        for object_id in self.det_index:
+            self.det_index[object_id] = -1
+
         if len(rects) == 0:
             for object_id in list(self.disappeared.keys()):
                 self.disappeared[object_id] += 1
@@ -53,7 +65,7 @@ class CentroidTracker:
 
         if len(self.objects) == 0:
             for i in range(0, len(input_centroids)):
-                self.register(input_centroids[i], rects[i], labels[i])
+                self.register(input_centroids[i], rects[i], labels[i], det_idx=i)
         else:
             object_ids = list(self.objects.keys())
             object_centroids = list(self.objects.values())
@@ -78,6 +90,7 @@ class CentroidTracker:
                 self.boxes[object_id] = rects[col]
                 self.labels[object_id] = labels[col]
                 self.disappeared[object_id] = 0
+                self.det_index[object_id] = int(col)
 
                 used_rows.add(row)
                 used_cols.add(col)
@@ -93,7 +106,7 @@ class CentroidTracker:
                         self.deregister(object_id)
             else:
                 for col in unused_cols:
-                    self.register(input_centroids[col], rects[col], labels[col])
+                    self.register(input_centroids[col], rects[col], labels[col], det_idx=int(col))
 
         return self.get_tracks()
 
@@ -107,6 +120,328 @@ class CentroidTracker:
                 "label": self.labels[object_id],
                 "box": [float(x) for x in box],  # [x1, y1, x2, y2]
                 "centroid": [int(x) for x in self.objects[object_id]],
-                "disappeared": self.disappeared[object_id]
+                "disappeared": self.disappeared[object_id],
+                "det_idx": self.det_index[object_id]
             })
         return tracks
+
+
+def overlap_pairs(a, b):
+    """
+    Index pairs (i, j) of (N, 4) and (M, 4) xyxy boxes whose extents overlap.
+    Sort-and-sweep: b is sorted by x1 once and each box in a only visits the b boxes
+    whose x1 falls in [a.x1 - widest b, a.x2), so the cost follows the number of
+    nearby pairs instead of N * M.
+    """
+    empty = np.zeros(0, dtype=np.int64)
+    if len(a) == 0 or len(b) == 0:
+        return empty, empty
+    order = np.argsort(b[:, 0], kind='stable')
+    bx1 = b[order, 0]
+    widest = float((b[:, 2] - b[:, 0]).max())
+    lo = np.searchsorted(bx1, a[:, 0] - widest, side='right')
+    hi = np.searchsorted(bx1, a[:, 2], side='left')
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return empty, empty
+
+    # Expand the per-row [lo, hi) windows into flat candidate pairs
+    rows = np.repeat(np.arange(len(a)), counts)
+    window_start = np.cumsum(counts) - counts
+    cols = order[np.arange(total) - np.repeat(window_start, counts) + np.repeat(lo, counts)]
+    hit = ((a[rows, 0] < b[cols, 2]) & (a[rows, 2] > b[cols, 0]) &
+           (a[rows, 1] < b[cols, 3]) & (a[rows, 3] > b[cols, 1]))
+    return rows[hit], cols[hit]
+
+
+def pair_iou(a, b, rows, cols):
+    """IoU of the box pairs (a[rows], b[cols])"""
+    a, b = a[rows], b[cols]
+    iw = np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0])
+    ih = np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1])
+    inter = np.maximum(iw, 0) * np.maximum(ih, 0)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+DENSE_ASSIGNMENT_EDGES = 256  # Conflicting pairs up to which all groups share one lapjv call
+
+
+def _assign_block(rows, cols, cost, thresh):
+    """lapjv on the dense block spanned by some candidate pairs; absent pairs are infeasible"""
+    g_rows, ri = np.unique(rows, return_inverse=True)
+    g_cols, ci = np.unique(cols, return_inverse=True)
+    block = np.full((len(g_rows), len(g_cols)), thresh + 1.0)
+    block[ri, ci] = cost
+    _, x, _ = lap.lapjv(block, extend_cost=True, cost_limit=thresh)
+    hit = x >= 0
+    return np.stack([g_rows[hit], g_cols[x[hit]]], axis=1)
+
+
+def linear_assignment(rows, cols, cost, shape, thresh):
+    """
+    Optimal (Jonker-Volgenant) assignment over sparse candidate pairs (rows[k], cols[k], cost[k]);
+    pairs costing more than thresh stay unmatched. Returns (matches, unmatched rows, unmatched cols).
+
+    Boxes only compete with boxes they overlap, so the feasible pairs split into
+    small independent groups. Unambiguous 1:1 pairs and groups with a single row
+    or column are solved directly (cheapest pair); lapjv only runs on the groups
+    that genuinely conflict.
+    """
+    n_rows, n_cols = shape
+    feasible = cost <= thresh
+    rows, cols, cost = rows[feasible], cols[feasible], cost[feasible]
+    # Unambiguous 1:1 pairs need no grouping
+    simple = (np.bincount(rows, minlength=n_rows)[rows] == 1) & (np.bincount(cols, minlength=n_cols)[cols] == 1)
+    matches = [np.stack([rows[simple], cols[simple]], axis=1)]
+    rows, cols, cost = rows[~simple], cols[~simple], cost[~simple]
+
+    if len(rows):
+        graph = coo_matrix((np.ones(len(rows)), (rows, cols + n_rows)), shape=(n_rows + n_cols,) * 2)
+        _, component = connected_components(graph, directed=False)
+        edge_comp = component[rows]
+        # Rows / columns per group (each node belongs to exactly one group)
+        comp_rows = np.bincount(component[np.unique(rows)], minlength=component.max() + 1)
+        comp_cols = np.bincount(component[np.unique(cols) + n_rows], minlength=component.max() + 1)
+        star = (comp_rows[edge_comp] == 1) | (comp_cols[edge_comp] == 1)
+
+        # Stars: the cheapest edge of each group is optimal
+        order = np.lexsort((cost[star], edge_comp[star]))
+        s_rows, s_cols, s_comp = rows[star][order], cols[star][order], edge_comp[star][order]
+        first = np.ones(len(s_comp), dtype=bool)
+        first[1:] = s_comp[1:] != s_comp[:-1]
+        matches.append(np.stack([s_rows[first], s_cols[first]], axis=1))
+
+        # Conflicting groups. Few conflicting boxes: one lapjv call over all groups at once
+        # (cross-group entries are infeasible, so the optimum is the same); otherwise one per group
+        c_rows, c_cols, c_cost, c_comp = rows[~star], cols[~star], cost[~star], edge_comp[~star]
+        if len(c_rows) <= DENSE_ASSIGNMENT_EDGES:
+            if len(c_rows):
+                matches.append(_assign_block(c_rows, c_cols, c_cost, thresh))
+        else:
+            order = np.argsort(c_comp, kind='stable')
+            c_rows, c_cols, c_cost, c_comp = c_rows[order], c_cols[order], c_cost[order], c_comp[order]
+            bounds = np.flatnonzero(np.r_[True, c_comp[1:] != c_comp[:-1], True])
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                matches.append(_assign_block(c_rows[start:end], c_cols[start:end], c_cost[start:end], thresh))
+
+    matches = np.concatenate(matches).astype(int)
+    matched_rows = np.zeros(n_rows, dtype=bool)
+    matched_cols = np.zeros(n_cols, dtype=bool)
+    matched_rows[matches[:, 0]] = True
+    matched_cols[matches[:, 1]] = True
+    return matches, np.flatnonzero(~matched_rows), np.flatnonzero(~matched_cols)
+
+
+class KalmanBoxFilter:
+    """
+    Constant-velocity Kalman filter over (cx, cy, aspect, h) run on all tracks at once.
+    State is (N, 8) means and (N, 8, 8) covariances; noise scales with box height (SORT/ByteTrack).
+    """
+    std_position = 1. / 20
+    std_velocity = 1. / 160
+
+    def __init__(self):
+        self.F = np.eye(8)
+        self.F[:4, 4:] = np.eye(4)
+
+    @staticmethod
+    def to_xyah(boxes):
+        w = boxes[:, 2] - boxes[:, 0]
+        h = np.maximum(boxes[:, 3] - boxes[:, 1], 1e-3)
+        return np.stack([boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w / h, h], axis=1)
+
+    @staticmethod
+    def to_xyxy(xyah):
+        h = xyah[:, 3]
+        w = xyah[:, 2] * h
+        return np.stack([xyah[:, 0] - w / 2, xyah[:, 1] - h / 2, xyah[:, 0] + w / 2, xyah[:, 1] + h / 2], axis=1)
+
+    def _std(self, h, pos_scale, vel_scale=None, aspect=1e-2):
+        """Per-track standard deviations for the 4 position (and optionally 4 velocity) terms"""
+        ones = np.ones_like(h)
+        pos = [pos_scale * self.std_position * h] * 2 + [aspect * ones, pos_scale * self.std_position * h]
+        if vel_scale is None:
+            return np.stack(pos, axis=1)
+        vel = [vel_scale * self.std_velocity * h] * 2 + [1e-5 * ones, vel_scale * self.std_velocity * h]
+        return np.stack(pos + vel, axis=1)
+
+    def initiate(self, xyah):
+        mean = np.concatenate([xyah, np.zeros_like(xyah)], axis=1)
+        std = self._std(xyah[:, 3], 2, 10)
+        cov = np.zeros((len(xyah), 8, 8))
+        idx = np.arange(8)
+        cov[:, idx, idx] = std ** 2
+        return mean, cov
+
+    def predict(self, mean, cov):
+        if len(mean) == 0:
+            return mean, cov
+        std = self._std(mean[:, 3], 1, 1)
+        mean = mean @ self.F.T
+        cov = self.F @ cov @ self.F.T
+        idx = np.arange(8)
+        cov[:, idx, idx] += std ** 2
+        return mean, cov
+
+    def update(self, mean, cov, xyah):
+        if len(mean) == 0:
+            return mean, cov
+        std = self._std(mean[:, 3], 1, aspect=1e-1)
+        S = cov[:, :4, :4].copy()
+        idx = np.arange(4)
+        S[:, idx, idx] += std ** 2
+        PHt = cov[:, :, :4]
+        # K = P H^T S^-1, solved instead of inverted (S is symmetric)
+        K = np.linalg.solve(S, PHt.transpose(0, 2, 1)).transpose(0, 2, 1)
+        innovation = xyah - mean[:, :4]
+        mean = mean + np.einsum('nij,nj->ni', K, innovation)
+        cov = cov - K @ S @ K.transpose(0, 2, 1)
+        return mean, cov
+
+
+class ByteTracker:
+    """
+    Array-backed multi-object tracker (ByteTrack association).
+
+    All track state lives in parallel numpy arrays; each update runs one batched
+    Kalman predict, then matches in two stages with IoU cost and lap.lapjv:
+    high-confidence detections against every track, then low-confidence
+    detections against the tracks still unmatched that were seen last update
+    (recovers occluded people whose score dipped). Only box pairs that overlap are
+    scored (sort and sweep on x), so matching scales with overlapping pairs rather
+    than tracks x detections. Only unmatched high-confidence
+    detections start new tracks. Same update(rects, labels) contract and track
+    dicts as CentroidTracker; scores are optional.
+    """
+
+    def __init__(self, max_disappeared=30, high_thresh=0.5, low_thresh=0.1,
+                 match_thresh=0.8, low_match_thresh=0.5):
+        self.next_id = 1
+        self.max_disappeared = max_disappeared
+        self.high_thresh = high_thresh          # Detections at or above this may start tracks
+        self.low_thresh = low_thresh            # Below this detections are ignored entirely
+        self.match_thresh = match_thresh        # Max 1-IoU cost, first stage
+        self.low_match_thresh = low_match_thresh  # Max 1-IoU cost, second stage (low scores need tighter overlap)
+        self.kf = KalmanBoxFilter()
+
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros((0, 8))
+        self.cov = np.zeros((0, 8, 8))
+        self.out_boxes = np.zeros((0, 4))        # Last detection, or Kalman prediction while unobserved
+        self.labels = np.zeros(0, dtype=object)
+        self.label_codes = np.zeros(0, dtype=np.int64)  # Integer labels: cheap class gating in the cost matrix
+        self._codes = {}
+        self.disappeared = np.zeros(0, dtype=np.int64)
+        self.det_index = np.zeros(0, dtype=np.int64)
+
+    @property
+    def boxes(self):
+        """ID -> box, for callers that only need current positions"""
+        return dict(zip(self.ids.tolist(), self.out_boxes))
+
+    def _match(self, track_idx, det_idx, det_boxes, det_codes, thresh):
+        """Match a subset of tracks to a subset of detections; returns (matches, unmatched tracks, unmatched dets)"""
+        tracks, dets = self.out_boxes[track_idx], det_boxes[det_idx]
+        rows, cols = overlap_pairs(tracks, dets)  # Non-overlapping pairs cost 1.0 and can never match
+        same_class = self.label_codes[track_idx][rows] == det_codes[det_idx][cols]  # Never swap classes
+        rows, cols = rows[same_class], cols[same_class]
+        cost = 1.0 - pair_iou(tracks, dets, rows, cols)
+        matches, u_track, u_det = linear_assignment(rows, cols, cost, (len(track_idx), len(det_idx)), thresh)
+        return (track_idx[matches[:, 0]], det_idx[matches[:, 1]]), track_idx[u_track], det_idx[u_det]
+
+    def update(self, rects, labels, scores=None):
+        """
+        rects: list of (x1, y1, x2, y2)
+        labels: list of strings
+        scores: optional detection confidences (all treated as high when omitted)
+        Each returned track carries det_idx: the index of the rect it was matched
+        to (or registered from) this frame, -1 if it was not observed.
+        """
+        det_boxes = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        det_labels = np.array(list(labels), dtype=object)
+        det_codes = np.array([self._codes.setdefault(label, len(self._codes)) for label in labels], dtype=np.int64)
+        det_scores = np.ones(len(det_boxes)) if scores is None else np.asarray(scores, dtype=np.float64)
+
+        self.det_index[:] = -1
+        # Lost tracks keep drifting but stop growing/shrinking
+        self.mean[self.disappeared > 0, 7] = 0.0
+        self.mean, self.cov = self.kf.predict(self.mean, self.cov)
+        if len(self.mean):
+            self.out_boxes = self.kf.to_xyxy(self.mean[:, :4])
+
+        high = np.where(det_scores >= self.high_thresh)[0]
+        low = np.where((det_scores >= self.low_thresh) & (det_scores < self.high_thresh))[0]
+
+        # Stage 1: confident detections vs all tracks
+        all_tracks = np.arange(len(self.ids))
+        (t1, d1), u_tracks, u_high = self._match(all_tracks, high, det_boxes, det_codes, self.match_thresh)
+        # Stage 2: weak detections vs tracks that were live last update
+        live = u_tracks[self.disappeared[u_tracks] == 0]
+        (t2, d2), _, _ = self._match(live, low, det_boxes, det_codes, self.low_match_thresh)
+
+        matched_t = np.concatenate([t1, t2]).astype(int)
+        matched_d = np.concatenate([d1, d2]).astype(int)
+        if len(matched_t):
+            self.mean[matched_t], self.cov[matched_t] = self.kf.update(
+                self.mean[matched_t], self.cov[matched_t], self.kf.to_xyah(det_boxes[matched_d]))
+            self.out_boxes[matched_t] = det_boxes[matched_d]
+            self.labels[matched_t] = det_labels[matched_d]
+            self.label_codes[matched_t] = det_codes[matched_d]
+            self.det_index[matched_t] = matched_d
+
+        observed = np.zeros(len(self.ids), dtype=bool)
+        observed[matched_t] = True
+        self.disappeared[observed] = 0
+        self.disappeared[~observed] += 1
+
+        keep = self.disappeared <= self.max_disappeared
+        if not keep.all():
+            self._select(keep)
+
+        if len(u_high):
+            self._register(det_boxes[u_high], det_labels[u_high], det_codes[u_high], u_high)
+        return self.get_tracks()
+
+    def _select(self, mask):
+        self.ids = self.ids[mask]
+        self.mean = self.mean[mask]
+        self.cov = self.cov[mask]
+        self.out_boxes = self.out_boxes[mask]
+        self.labels = self.labels[mask]
+        self.label_codes = self.label_codes[mask]
+        self.disappeared = self.disappeared[mask]
+        self.det_index = self.det_index[mask]
+
+    def _register(self, boxes, labels, codes, det_idx):
+        n = len(boxes)
+        mean, cov = self.kf.initiate(self.kf.to_xyah(boxes))
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + n)])
+        self.next_id += n
+        self.mean = np.concatenate([self.mean, mean])
+        self.cov = np.concatenate([self.cov, cov])
+        self.out_boxes = np.concatenate([self.out_boxes, boxes])
+        self.labels = np.concatenate([self.labels, labels])
+        self.label_codes = np.concatenate([self.label_codes, codes])
+        self.disappeared = np.concatenate([self.disappeared, np.zeros(n, dtype=np.int64)])
+        self.det_index = np.concatenate([self.det_index, det_idx.astype(np.int64)])
+
+    def get_tracks(self):
+        """Return list of track objects for API consistency"""
+        boxes = self.out_boxes.tolist()
+        centroids = ((self.out_boxes[:, :2] + self.out_boxes[:, 2:]) / 2).astype(int).tolist()
+        return [
+            {
+                "id": object_id,
+                "label": label,
+                "box": box,  # [x1, y1, x2, y2]
+                "centroid": centroid,
+                "disappeared": disappeared,
+                "det_idx": det_idx
+            }
+            for object_id, label, box, centroid, disappeared, det_idx in zip(
+                self.ids.tolist(), self.labels.tolist(), boxes, centroids,
+                self.disappeared.tolist(), self.det_index.tolist())
+        ]
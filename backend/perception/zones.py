@@ -1,50 +1,371 @@
 import cv2
+import time
 import numpy as np
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from backend.core.models import Zone, Track, Event, AlertSeverity, ObjectType
+from backend.core.config import settings
 import uuid
 
 logger = logging.getLogger(__name__)
 
-class ZoneEngine:
-    def __init__(self):
+class ZoneRaster:
+    """
+    Zones rasterized once for one frame size.
+
+    Each active zone is filled into a bitmask cropped to its bounding box; all
+    masks share one flat buffer, so a frame's anchor points are looked up with a
+    single fancy-index (grid candidates -> bbox check -> flat offset -> mask bit)
+    instead of a polygon test per (track, zone).
+
+    Candidates come from a uniform grid over the frame: every cell lists the
+    zones whose bounding box overlaps it (CSR layout), so a point only meets the
+    handful of zones near it no matter how many the camera defines.
+    """
+
+    def __init__(self, zones: List[Zone], frame_shape: Tuple[int, int], cell_size: int = 64,
+                 polygons: Optional[List[np.ndarray]] = None):
+        h, w = frame_shape[:2]
+        if polygons is None:
+            polygons = [np.array([[p.x, p.y] for p in zone.polygon], np.int32) for zone in zones]
         self.zones: List[Zone] = []
+        boxes, offsets, flats = [], [], []
+        offset = 0
+        for zone, pts in zip(zones, polygons):
+            if not zone.active or len(pts) < 3:
+                continue
+            x1, y1 = np.clip(pts.min(axis=0), 0, [w - 1, h - 1])
+            x2, y2 = np.clip(pts.max(axis=0) + 1, 1, [w, h])
+            if x2 <= x1 or y2 <= y1:
+                continue  # Entirely outside this frame size
+            mask = np.zeros((y2 - y1, x2 - x1), dtype=np.uint8)
+            cv2.fillPoly(mask, [(pts - [x1, y1]).reshape((-1, 1, 2))], 1)
+            self.zones.append(zone)
+            boxes.append((x1, y1, x2, y2))
+            offsets.append(offset)
+            flats.append(mask.ravel())
+            offset += mask.size
+
+        self.boxes = np.array(boxes, dtype=np.int64).reshape(-1, 4)
+        self.offsets = np.array(offsets, dtype=np.int64)
+        self.widths = self.boxes[:, 2] - self.boxes[:, 0]
+        self.flat = np.concatenate(flats).astype(bool) if flats else np.zeros(0, dtype=bool)
+        self._build_grid(w, h, cell_size)
+
+    def _build_grid(self, w: int, h: int, cell_size: int):
+        self.cell_size = cell_size
+        self.grid_w = -(-w // cell_size)
+        self.grid_h = -(-h // cell_size)
+        cells, owners = [], []
+        for z, (x1, y1, x2, y2) in enumerate(self.boxes):
+            gx = np.arange(x1 // cell_size, (x2 - 1) // cell_size + 1)
+            gy = np.arange(y1 // cell_size, (y2 - 1) // cell_size + 1)
+            covered = (gy[:, None] * self.grid_w + gx[None, :]).ravel()
+            cells.append(covered)
+            owners.append(np.full(len(covered), z, dtype=np.int64))
+        cells = np.concatenate(cells) if cells else np.zeros(0, dtype=np.int64)
+        owners = np.concatenate(owners) if owners else np.zeros(0, dtype=np.int64)
+        order = np.argsort(cells, kind='stable')
+        self.cell_zones = owners[order]
+        counts = np.bincount(cells, minlength=self.grid_w * self.grid_h)
+        self.cell_start = np.concatenate([[0], np.cumsum(counts)])
+
+    def candidates(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(point_idx, zone_idx) pairs whose grid cell overlaps the zone's bounding box"""
+        gx = np.clip(points[:, 0] // self.cell_size, 0, self.grid_w - 1)
+        gy = np.clip(points[:, 1] // self.cell_size, 0, self.grid_h - 1)
+        cell = gy * self.grid_w + gx
+        start = self.cell_start[cell]
+        counts = self.cell_start[cell + 1] - start
+        p = np.repeat(np.arange(len(points)), counts)
+        # Concatenated ranges start[i]:start[i]+counts[i], without a Python loop
+        first = np.cumsum(counts) - counts
+        z = self.cell_zones[np.repeat(start - first, counts) + np.arange(counts.sum())]
+        return p, z
+
+    def lookup(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(point_idx, zone_idx) pairs for every anchor point inside a zone"""
+        if len(points) == 0 or len(self.zones) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        p, z = self.candidates(points)
+        x, y = points[p, 0], points[p, 1]
+        in_box = (x >= self.boxes[z, 0]) & (x < self.boxes[z, 2]) & (y >= self.boxes[z, 1]) & (y < self.boxes[z, 3])
+        p, z = p[in_box], z[in_box]
+        idx = self.offsets[z] + (points[p, 1] - self.boxes[z, 1]) * self.widths[z] + (points[p, 0] - self.boxes[z, 0])
+        hit = self.flat[idx]
+        return p[hit], z[hit]
+
+
+class ZoneSet:
+    """
+    Immutable, versioned set of zones for one stream.
+
+    Polygons are converted to numpy once here; rasters are built lazily per
+    frame size and cached on the set. Changes produce a new ZoneSet, which the
+    API thread publishes to a ZoneEngine by a single reference assignment, so
+    the perception thread never sees a half-updated set and takes no lock.
+    """
+    MAX_RASTERS = 4  # Frame sizes kept per set
+
+    def __init__(self, zones=(), version: int = 0):
+        self.zones: Tuple[Zone, ...] = tuple(zones)
+        self.version = version
+        self.polygons = [np.array([[p.x, p.y] for p in zone.polygon], np.int32).reshape(-1, 2) for zone in self.zones]
+        self._rasters: Dict[Tuple[int, int], ZoneRaster] = {}
+        self._json: Optional[List[Dict[str, Any]]] = None
+
+    def raster(self, frame_shape: tuple) -> ZoneRaster:
+        key = (frame_shape[0], frame_shape[1])
+        raster = self._rasters.get(key)
+        if raster is None:
+            if len(self._rasters) >= self.MAX_RASTERS:
+                self._rasters.clear()
+            raster = self._rasters[key] = ZoneRaster(self.zones, frame_shape, polygons=self.polygons)
+        return raster
+
+    def with_zone(self, zone: Zone, version: Optional[int] = None) -> "ZoneSet":
+        """New set with the zone added, or replaced if its id exists"""
+        if any(z.id == zone.id for z in self.zones):
+            zones = [zone if z.id == zone.id else z for z in self.zones]
+        else:
+            zones = list(self.zones) + [zone]
+        return ZoneSet(zones, self.version + 1 if version is None else version)
+
+    def without_zone(self, zone_id: str, version: Optional[int] = None) -> "ZoneSet":
+        """New set with the zone removed"""
+        return ZoneSet([z for z in self.zones if z.id != zone_id], self.version + 1 if version is None else version)
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        """Serialized once per version"""
+        if self._json is None:
+            self._json = [zone.model_dump(mode='json') for zone in self.zones]
+        return self._json
+
+
+class ZoneEngine:
+    """
+    Zone rules per camera stream.
+
+    update() is stateful: membership of every (track, zone) pair that breaks a
+    rule is kept in sorted parallel arrays keyed by track_id << 20 | zone slot,
+    and events fire only on transitions (enter, dwell threshold, exit) instead
+    of on every frame a track is inside. A short exit grace absorbs detector
+    misses at zone edges; re-entering the same zone within the cooldown is silent.
+    When a published set drops a zone, update() frees its slot and clears its
+    membership and cooldown rows, so deleted zones never fire exit or dwell events.
+    """
+    SLOT_BITS = 20
+
+    def __init__(self, dwell_seconds: float = settings.ZONE_DWELL_SECONDS, exit_grace: float = settings.ZONE_EXIT_GRACE,
+                 cooldown: float = settings.ZONE_EVENT_COOLDOWN, zone_set: Optional[ZoneSet] = None):
+        self.zone_set = zone_set or ZoneSet()  # Replaced wholesale, never mutated
+        self._rule_raster: Optional[ZoneRaster] = None
+
+        self.dwell_seconds = dwell_seconds
+        self.exit_grace = exit_grace
+        self.cooldown = cooldown
+        self._slots: Dict[str, int] = {}  # zone id -> stable slot (survives raster rebuilds)
+        self._zones_by_slot: Dict[int, Zone] = {}
+        self._free_slots: List[int] = []  # Slots of removed zones, reused first
+        self._slots_set: Optional[ZoneSet] = None  # Zone set the slot maps were last pruned against
+        self._rule_cache: Dict[Tuple[str, int], bool] = {}
+        # Membership arrays, sorted by key
+        self._keys = np.zeros(0, dtype=np.int64)
+        self._entered = np.zeros(0, dtype=np.float64)
+        self._last_inside = np.zeros(0, dtype=np.float64)
+        self._dwell_fired = np.zeros(0, dtype=bool)
+        self._labels: Dict[int, str] = {}  # track_id -> label, for exit events
+        # Recently exited pairs: re-entry before the deadline raises no event
+        self._cooldown_keys = np.zeros(0, dtype=np.int64)
+        self._cooldown_until = np.zeros(0, dtype=np.float64)
+
+        self.events_emitted = 0
+        self.events_suppressed = 0  # Frames a violation persisted without a new event
+
+    @property
+    def zones(self) -> List[Zone]:
+        return list(self.zone_set.zones)
+
+    @property
+    def version(self) -> int:
+        return self.zone_set.version
+
+    def publish(self, zone_set: ZoneSet):
+        """Swap in a new zone set; the perception thread picks it up on its next frame"""
+        self.zone_set = zone_set
 
     def add_zone(self, zone: Zone):
-        self.zones.append(zone)
+        self.publish(self.zone_set.with_zone(zone))
         logger.info(f"Added zone: {zone.name} ({zone.type})")
 
-    def check_track(self, track: Track, frame_shape: tuple) -> Optional[Event]:
+    def raster(self, frame_shape: tuple) -> ZoneRaster:
+        """Compiled masks of the current zone set for this frame size"""
+        return self.zone_set.raster(frame_shape)
+
+    @property
+    def occupied(self) -> int:
+        """(track, zone) rule violations currently in progress"""
+        return len(self._keys)
+
+    def _slot(self, zone: Zone) -> int:
+        slot = self._slots.get(zone.id)
+        if slot is None:
+            slot = self._free_slots.pop() if self._free_slots else len(self._slots)
+            self._slots[zone.id] = slot
+        self._zones_by_slot[slot] = zone
+        return slot
+
+    def _prune_slots(self, zone_set: ZoneSet):
+        """Free the slots of zones no longer published, with their membership and cooldown rows"""
+        self._slots_set = zone_set
+        live = {zone.id for zone in zone_set.zones}
+        dead = [slot for zone_id, slot in self._slots.items() if zone_id not in live]
+        if not dead:
+            return
+        for zone_id in [z for z in self._slots if z not in live]:
+            self._zones_by_slot.pop(self._slots.pop(zone_id), None)
+        self._free_slots.extend(dead)
+        slot_mask = (1 << self.SLOT_BITS) - 1
+        keep = ~np.isin(self._keys & slot_mask, dead)
+        self._keys, self._entered = self._keys[keep], self._entered[keep]
+        self._last_inside, self._dwell_fired = self._last_inside[keep], self._dwell_fired[keep]
+        keep = ~np.isin(self._cooldown_keys & slot_mask, dead)
+        self._cooldown_keys, self._cooldown_until = self._cooldown_keys[keep], self._cooldown_until[keep]
+
+    def _violations(self, tracks: List[Track], frame_shape: tuple) -> np.ndarray:
+        """Sorted unique keys of the (track, zone) pairs breaking a rule this frame"""
+        raster = self.raster(frame_shape)  # One snapshot per frame
+        if raster is not self._rule_raster:
+            self._rule_cache.clear()
+            self._rule_raster = raster
+        p, z = raster.lookup(self.anchors(tracks))
+        keys = []
+        for pi, zi in zip(p.tolist(), z.tolist()):
+            track = tracks[pi]
+            rule = self._rule_cache.get((track.label, zi))
+            if rule is None:
+                rule = self._rule_cache[(track.label, zi)] = self._is_disallowed(track.label, raster.zones[zi].disallowed_types)
+            if rule:
+                keys.append((track.id << self.SLOT_BITS) | self._slot(raster.zones[zi]))
+                self._labels[track.id] = track.label
+        return np.unique(np.array(keys, dtype=np.int64))
+
+    def update(self, tracks: List[Track], frame_shape: tuple, now: Optional[float] = None) -> List[Event]:
         """
-        Check a single track against all zones.
-        Returns an Event if a rule is violated, else None.
+        Advance zone membership by one frame.
+        Returns only enter, dwell and exit events.
         """
-        # Calculate centroid of track
-        cx = int((track.bbox[0] + track.bbox[2]) / 2)
-        cy = int((track.bbox[1] + track.bbox[3]) / 2)
-        track_point = (cx, cy)
+        now = now or time.time()
+        if self.zone_set is not self._slots_set:
+            self._prune_slots(self.zone_set)
+        current = self._violations(tracks, frame_shape)
+        events = []
 
-        for zone in self.zones:
-            if not zone.active:
-                continue
+        # Still inside (or back within the exit grace)
+        inside = np.isin(self._keys, current, assume_unique=True)
+        self._last_inside[inside] = now
+        self.events_suppressed += int(inside.sum())
+
+        # Dwell threshold crossed, once per visit
+        dwell = inside & ~self._dwell_fired & (now - self._entered >= self.dwell_seconds)
+        for key in self._keys[dwell].tolist():
+            events.append(self._event(key, "Dwell Limit Exceeded", f"in {{zone}} for over {int(self.dwell_seconds)}s"))
+        self._dwell_fired |= dwell
 
-            # Check if point is inside polygon
-            # Convert zone points to numpy array
-            pts = np.array([[p.x, p.y] for p in zone.polygon], np.int32)
-            pts = pts.reshape((-1, 1, 2))
-            
-            # measureDist=False returns +1 if inside, -1 if outside, 0 if on edge
-            is_inside = cv2.pointPolygonTest(pts, track_point, False) >= 0
-
-            if is_inside:
-                # Check rules
-                # 1. Disallowed Type
+        # Exits: absent for longer than the grace period (left, or track lost)
+        gone = now - self._last_inside > self.exit_grace
+        for key in self._keys[gone].tolist():
+            events.append(self._event(key, "Zone Exit", "left {zone}", severity=AlertSeverity.INFO))
+        if gone.any():
+            self._cooldown_keys = np.concatenate([self._cooldown_keys, self._keys[gone]])
+            self._cooldown_until = np.concatenate([self._cooldown_until, np.full(int(gone.sum()), now + self.cooldown)])
+            keep = ~gone
+            self._keys, self._entered = self._keys[keep], self._entered[keep]
+            self._last_inside, self._dwell_fired = self._last_inside[keep], self._dwell_fired[keep]
+
+        # Enters
+        new = current[~np.isin(current, self._keys, assume_unique=True)]
+        if len(new):
+            live = self._cooldown_until > now
+            self._cooldown_keys, self._cooldown_until = self._cooldown_keys[live], self._cooldown_until[live]
+            cooling = np.isin(new, self._cooldown_keys)
+            for key in new[~cooling].tolist():
+                events.append(self._event(key, "Intrusion Detected", "detected in {zone}"))
+            self.events_suppressed += int(cooling.sum())
+
+            keys = np.concatenate([self._keys, new])
+            order = np.argsort(keys)
+            self._keys = keys[order]
+            self._entered = np.concatenate([self._entered, np.full(len(new), now)])[order]
+            self._last_inside = np.concatenate([self._last_inside, np.full(len(new), now)])[order]
+            self._dwell_fired = np.concatenate([self._dwell_fired, np.zeros(len(new), dtype=bool)])[order]
+
+        live_tracks = set((self._keys >> self.SLOT_BITS).tolist())
+        for track_id in [t for t in self._labels if t not in live_tracks]:
+            del self._labels[track_id]
+
+        self.events_emitted += len(events)
+        return events
+
+    def _event(self, key: int, title: str, action: str, severity: Optional[AlertSeverity] = None) -> Event:
+        track_id = key >> self.SLOT_BITS
+        zone = self._zones_by_slot[key & ((1 << self.SLOT_BITS) - 1)]
+        label = self._labels.get(track_id, "object")
+        return Event(
+            id=str(uuid.uuid4()),
+            severity=severity or (AlertSeverity.CRITICAL if zone.type == "restricted" else AlertSeverity.WARNING),
+            title=f"{title}: {label.upper()}",
+            description=f"{label} {action.format(zone=zone.name)}",
+            zone_id=zone.id,
+            track_id=track_id
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "zones": len(self.zone_set.zones),
+            "version": self.zone_set.version,
+            "occupied": self.occupied,
+            "events_emitted": self.events_emitted,
+            "events_suppressed": self.events_suppressed
+        }
+
+    @staticmethod
+    def anchors(tracks: List[Track]) -> np.ndarray:
+        """Box centres, the point each track is tested with"""
+        if not tracks:
+            return np.zeros((0, 2), dtype=np.int64)
+        boxes = np.array([t.bbox for t in tracks], dtype=np.float64)
+        return ((boxes[:, :2] + boxes[:, 2:]) / 2).astype(np.int64)
+
+    def zones_containing(self, tracks: List[Track], frame_shape: tuple) -> List[List[Zone]]:
+        """For each track, the zones its anchor point is in (one vectorized lookup per frame)"""
+        raster = self.raster(frame_shape)
+        inside = [[] for _ in tracks]
+        for p, z in zip(*raster.lookup(self.anchors(tracks))):
+            inside[p].append(raster.zones[z])
+        return inside
+
+    def check_tracks(self, tracks: List[Track], frame_shape: tuple) -> List[Event]:
+        """
+        Check all of a frame's tracks against all zones.
+        Returns one Event per track violating a rule.
+        """
+        events = []
+        for track, zones in zip(tracks, self.zones_containing(tracks, frame_shape)):
+            for zone in zones:
                 # Map YOLO label (str) to ObjectType enum if possible, or string match
                 if self._is_disallowed(track.label, zone.disallowed_types):
-                     return self._create_alert(zone, track, "Intrusion Detected")
-        
-        return None
+                    events.append(self._create_alert(zone, track, "Intrusion Detected"))
+                    break
+        return events
+
+    def check_track(self, track: Track, frame_shape: tuple) -> Optional[Event]:
+        """
+        Check a single track against all zones.
+        Returns an Event if a rule is violated, else None.
+        """
+        events = self.check_tracks([track], frame_shape)
+        return events[0] if events else None
 
     def _is_disallowed(self, label: str, disallowed: List[ObjectType]) -> bool:
         # Normalize label
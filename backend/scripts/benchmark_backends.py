@@ -0,0 +1,111 @@
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from backend.perception.engines.sahi import AdvancedDetector
+from backend.perception.model_export import BACKENDS, TORCH
+
+def sample_frames(video_path, count=100, size=(854, 480)):
+    """Evenly spaced frames from local footage, resized to the AI proxy resolution"""
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+    frames = []
+    for idx in np.linspace(0, total - 1, num=min(count, total)).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+        ret, frame = cap.read()
+        if ret:
+            frames.append(cv2.resize(frame, size))
+    cap.release()
+    return frames
+
+def extract_boxes(result):
+    """(N, 4) xyxy and (N,) class ids from an Ultralytics result"""
+    if result.boxes is None or len(result.boxes) == 0:
+        return np.zeros((0, 4)), np.zeros((0,), dtype=int)
+    return result.boxes.xyxy.cpu().numpy(), result.boxes.cls.cpu().numpy().astype(int)
+
+def box_iou(a, b):
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes"""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)))
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+def match_boxes(ref_boxes, ref_cls, boxes, cls, iou_threshold=0.5):
+    """Greedy same-class matching. Returns (matched reference mask, IoUs of matches)."""
+    iou = box_iou(ref_boxes, boxes)
+    iou[ref_cls[:, None] != cls[None, :]] = 0.0
+    matched = np.zeros(len(ref_boxes), dtype=bool)
+    ious = []
+    while iou.size and iou.max() >= iou_threshold:
+        r, c = np.unravel_index(iou.argmax(), iou.shape)
+        matched[r] = True
+        ious.append(iou[r, c])
+        iou[r, :] = 0.0
+        iou[:, c] = 0.0
+    return matched, ious
+
+def run_backend(model_path, backend, frames, conf=0.3, warmup=3):
+    detector = AdvancedDetector(model_path, backend=backend)
+    for frame in frames[:warmup]:
+        detector.predict(frame, conf=conf)
+
+    outputs = []
+    start = time.perf_counter()
+    for frame in frames:
+        outputs.append(extract_boxes(detector.predict(frame, conf=conf)))
+    elapsed = time.perf_counter() - start
+    return detector, outputs, len(frames) / elapsed
+
+def compare(reference, outputs):
+    matched = total = predicted = 0
+    ious = []
+    for (ref_boxes, ref_cls), (boxes, cls) in zip(reference, outputs):
+        hits, match_ious = match_boxes(ref_boxes, ref_cls, boxes, cls)
+        matched += int(hits.sum())
+        total += len(ref_boxes)
+        predicted += len(boxes)
+        ious.extend(match_ious)
+    recall = matched / total if total else 1.0
+    precision = matched / predicted if predicted else 1.0
+    return recall, precision, float(np.mean(ious)) if ious else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CPU inference backends against the PyTorch path")
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--video", default="mall_theft.mp4")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--backends", default="onnx,openvino")
+    args = parser.parse_args()
+
+    frames = sample_frames(args.video, args.frames)
+    print(f"--- BACKEND BENCHMARK: {args.model} on {len(frames)} frames from {args.video} ---")
+
+    _, reference, torch_fps = run_backend(args.model, TORCH, frames)
+    print(f"{'backend':<10} {'fps':>8} {'speedup':>8} {'recall':>8} {'precision':>10} {'mean_iou':>9}")
+    print(f"{TORCH:<10} {torch_fps:>8.1f} {1.0:>8.2f} {1.0:>8.3f} {1.0:>10.3f} {1.0:>9.3f}")
+
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        if backend not in BACKENDS or backend == TORCH:
+            continue
+        detector, outputs, fps = run_backend(args.model, backend, frames)
+        if detector.backend != backend:
+            print(f"{backend:<10} export unavailable, skipped")
+            continue
+        recall, precision, mean_iou = compare(reference, outputs)
+        print(f"{backend:<10} {fps:>8.1f} {fps / torch_fps:>8.2f} {recall:>8.3f} {precision:>10.3f} {mean_iou:>9.3f}")
+
+if __name__ == "__main__":
+    main()
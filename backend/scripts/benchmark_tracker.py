@@ -0,0 +1,78 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from backend.perception.tracker import CentroidTracker, ByteTracker
+
+def synthetic_scene(num_tracks, frames, size=(1920, 1080), miss_rate=0.05, seed=0):
+    """
+    Per-frame (rects, scores, truth ids) for num_tracks boxes moving at constant
+    velocity with detector jitter, occasional misses and low-score frames.
+    """
+    rng = np.random.default_rng(seed)
+    w, h = size
+    # Box size shrinks with density so 1000 objects still fit a frame
+    side = max(6.0, min(60.0, np.sqrt(w * h / num_tracks) / 3))
+    pos = rng.uniform([0, 0], [w - side, h - side], size=(num_tracks, 2))
+    vel = rng.uniform(-side / 8, side / 8, size=(num_tracks, 2))
+    scene = []
+    for _ in range(frames):
+        pos += vel
+        bounce = (pos < 0) | (pos > np.array([w - side, h - side]))
+        vel[bounce] *= -1
+        pos = np.clip(pos, 0, [w - side, h - side])
+        jitter = rng.normal(0, side * 0.03, size=(num_tracks, 4))
+        boxes = np.concatenate([pos, pos + side], axis=1) + jitter
+        visible = rng.random(num_tracks) > miss_rate
+        scores = np.where(rng.random(num_tracks) < 0.1, rng.uniform(0.15, 0.45, num_tracks), rng.uniform(0.6, 0.95, num_tracks))
+        order = rng.permutation(np.where(visible)[0])  # Detector output order is arbitrary
+        scene.append((boxes[order], scores[order], order))
+    return scene, side
+
+def run(tracker, scene, use_scores):
+    """Median per-frame update cost (ms) and identity switches against ground truth"""
+    timings, assigned, switches = [], {}, 0
+    for boxes, scores, truth in scene:
+        rects = [tuple(b) for b in boxes]
+        labels = ['person'] * len(rects)
+        start = time.perf_counter()
+        if use_scores:
+            tracks = tracker.update(rects, labels, scores)
+        else:
+            # Baseline only ever saw detections above the old threshold
+            keep = scores >= 0.3
+            rects = [r for r, k in zip(rects, keep) if k]
+            truth = truth[keep]
+            tracks = tracker.update(rects, ['person'] * len(rects))
+        timings.append((time.perf_counter() - start) * 1000)
+        for t in tracks:
+            if t['det_idx'] < 0:
+                continue
+            gt = int(truth[t['det_idx']])
+            if gt in assigned and assigned[gt] != t['id']:
+                switches += 1
+            assigned[gt] = t['id']
+    return float(np.median(timings)), switches
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame cost and ID switches: CentroidTracker vs ByteTracker")
+    parser.add_argument("--tracks", default="10,100,1000")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'tracks':>7} {'tracker':<10} {'ms/frame':>9} {'id_switches':>12}")
+    for n in [int(x) for x in args.tracks.split(",") if x.strip()]:
+        scene, side = synthetic_scene(n, args.frames)
+        centroid = CentroidTracker(max_disappeared=40, max_distance=side * 2)
+        for name, tracker, use_scores in (("centroid", centroid, False),
+                                          ("bytetrack", ByteTracker(max_disappeared=40), True)):
+            ms, switches = run(tracker, scene, use_scores)
+            print(f"{n:>7} {name:<10} {ms:>9.3f} {switches:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from backend.core.models import Zone, Point, ObjectType
+from backend.perception.track_state import TrackState
+from backend.perception.zones import ZoneEngine, ZoneSet
+
+def random_zones(count, size=(1280, 720), seed=0):
+    """Small convex-ish restricted polygons (doors, shelves, valves) scattered over the frame"""
+    rng = np.random.default_rng(seed)
+    w, h = size
+    zones = []
+    for i in range(count):
+        cx, cy = rng.uniform(40, w - 40), rng.uniform(40, h - 40)
+        radius = rng.uniform(10, 60)
+        angles = np.sort(rng.uniform(0, 2 * np.pi, 6))
+        poly = [Point(x=int(cx + radius * np.cos(a)), y=int(cy + radius * np.sin(a))) for a in angles]
+        zones.append(Zone(id=f"z{i}", name=f"zone {i}", type="restricted", polygon=poly,
+                          disallowed_types=[ObjectType.PERSON]))
+    return zones
+
+def random_tracks(count, size=(1280, 720), seed=1):
+    rng = np.random.default_rng(seed)
+    w, h = size
+    tracks = []
+    for i in range(count):
+        x, y = rng.uniform(0, w - 40), rng.uniform(0, h - 80)
+        tracks.append(TrackState(id=i, label='person', confidence=0.9, bbox=(int(x), int(y), int(x) + 40, int(y) + 80)))
+    return tracks
+
+def legacy_check(engine, zones, tracks):
+    """The pre-raster path: rebuild each polygon and pointPolygonTest it per track"""
+    events = []
+    for track in tracks:
+        point = (int((track.bbox[0] + track.bbox[2]) / 2), int((track.bbox[1] + track.bbox[3]) / 2))
+        for zone in zones:
+            pts = np.array([[p.x, p.y] for p in zone.polygon], np.int32).reshape((-1, 1, 2))
+            if cv2.pointPolygonTest(pts, point, False) >= 0 and engine._is_disallowed(track.label, zone.disallowed_types):
+                events.append(engine._create_alert(zone, track, "Intrusion Detected"))
+                break
+    return events
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame zone check cost: polygon loop vs rasterized grid lookup")
+    parser.add_argument("--zones", default="10,100,1000")
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    shape = (720, 1280, 3)
+    tracks = random_tracks(args.tracks)
+    print(f"{'zones':>6} {'legacy_ms':>10} {'raster_ms':>10} {'lookup_ms':>10} {'build_ms':>9} {'speedup':>8}")
+    for n in [int(x) for x in args.zones.split(",") if x.strip()]:
+        zones = random_zones(n)
+        engine = ZoneEngine(zone_set=ZoneSet(zones))
+
+        start = time.perf_counter()
+        engine.raster(shape)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        legacy_ms = timed(lambda: legacy_check(engine, zones, tracks), max(1, args.repeats // 4))
+        raster_ms = timed(lambda: engine.check_tracks(tracks, shape), args.repeats)
+        lookup_ms = timed(lambda: engine.zones_containing(tracks, shape), args.repeats)
+        print(f"{n:>6} {legacy_ms:>10.2f} {raster_ms:>10.3f} {lookup_ms:>10.3f} {build_ms:>9.1f} {legacy_ms / raster_ms:>7.0f}x")
+
+if __name__ == "__main__":
+    main()
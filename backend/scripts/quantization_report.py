@@ -0,0 +1,98 @@
+import argparse
+import os
+import sys
+import numpy as np
+from collections import defaultdict
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from backend.core.config import settings
+from backend.perception.detector import ObjectDetector
+from backend.perception.model_export import (
+    calibration_indices, read_frames, video_frame_count, TORCH, ONNX, ONNX_INT8
+)
+from backend.scripts.benchmark_backends import run_backend, match_boxes
+
+# Which model each use case runs (mall_cctv switches to pose)
+USE_CASE_MODELS = {
+    use_case: "yolov8n-pose.pt" if use_case == "mall_cctv" else "yolov8n.pt"
+    for use_case in ObjectDetector.ENGINE_CLASSES
+}
+
+def per_class_recall(reference, outputs):
+    """Recall of each FP32 class when the FP32 detections are taken as ground truth"""
+    totals, hits = defaultdict(int), defaultdict(int)
+    for (ref_boxes, ref_cls), (boxes, cls) in zip(reference, outputs):
+        matched, _ = match_boxes(ref_boxes, ref_cls, boxes, cls)
+        for c, m in zip(ref_cls, matched):
+            totals[int(c)] += 1
+            hits[int(c)] += int(m)
+    return {c: (hits[c] / totals[c], totals[c]) for c in totals}
+
+def evaluation_indices(video_path, count):
+    """
+    Evenly spaced frame indices that exclude every frame the INT8 calibration
+    sampled, so accuracy is never measured on data the quantizer has seen.
+    """
+    total = video_frame_count(video_path)
+    excluded = set()
+    if os.path.abspath(video_path) == os.path.abspath(settings.INT8_CALIBRATION_VIDEO):
+        excluded = set(calibration_indices(total, settings.INT8_CALIBRATION_FRAMES).tolist())
+    candidates = [i for i in range(total) if i not in excluded]
+    if not candidates:
+        return []
+    picks = np.unique(np.linspace(0, len(candidates) - 1, num=min(count, len(candidates))).astype(int))
+    return [candidates[i] for i in picks]
+
+def report_model(model_path, frames, min_support):
+    print(f"\n=== {model_path} ({len(frames)} evaluation frames) ===")
+    detector, reference, torch_fps = run_backend(model_path, TORCH, frames)
+    names = detector.model.names
+    _, _, onnx_fps = run_backend(model_path, ONNX, frames)
+    int8, outputs, int8_fps = run_backend(model_path, ONNX_INT8, frames)
+    if int8.backend != ONNX_INT8:
+        print("INT8 model unavailable (export or quantization failed)")
+        return None
+
+    print(f"FPS  torch={torch_fps:.1f}  onnx_fp32={onnx_fps:.1f}  onnx_int8={int8_fps:.1f}")
+    print(f"INT8 speedup vs torch {int8_fps / torch_fps:.2f}x, vs onnx fp32 {int8_fps / onnx_fps:.2f}x")
+
+    recalls = per_class_recall(reference, outputs)
+    print(f"{'class':<16} {'fp32_dets':>9} {'int8_recall':>12} {'drift':>8}")
+    worst = 0.0
+    for c, (recall, support) in sorted(recalls.items(), key=lambda kv: -kv[1][1]):
+        drift = recall - 1.0
+        flag = "" if support >= min_support else "  (low support)"
+        print(f"{names[c]:<16} {support:>9} {recall:>12.3f} {drift:>+8.3f}{flag}")
+        if support >= min_support:
+            worst = min(worst, drift)
+    return {"speedup": int8_fps / torch_fps, "worst_drift": worst}
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 vs FP32 per-class recall drift and speedup")
+    parser.add_argument("--video", default="mall_theft.mp4")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--max-drift", type=float, default=0.05, help="Acceptable recall loss per class")
+    parser.add_argument("--min-speedup", type=float, default=1.5)
+    parser.add_argument("--min-support", type=int, default=20, help="FP32 detections needed to judge a class")
+    args = parser.parse_args()
+
+    # Calibration frames (INT8_CALIBRATION_FRAMES of INT8_CALIBRATION_VIDEO) are held out
+    eval_indices = evaluation_indices(args.video, args.frames)
+    frames = read_frames(args.video, eval_indices)
+    print(f"Evaluating on {len(frames)} frames of {args.video}, disjoint from the calibration sample")
+    results = {model: report_model(model, frames, args.min_support) for model in sorted(set(USE_CASE_MODELS.values()))}
+
+    print("\n=== Recommendation ===")
+    accepted = []
+    for use_case, model in USE_CASE_MODELS.items():
+        r = results.get(model)
+        ok = r is not None and r["worst_drift"] >= -args.max_drift and r["speedup"] >= args.min_speedup
+        print(f"{use_case:<12} {model:<18} {'INT8' if ok else 'FP32'}")
+        if ok:
+            accepted.append(use_case)
+    print(f'\nINT8_USE_CASES="{",".join(accepted)}"')
+
+if __name__ == "__main__":
+    main()
@@ -30,7 +30,7 @@ def test_sahi_loop():
     
     print("Running SAHI prediction...")
     res_sahi = detector.predict(frame, use_slicing=True)
-    print(f"SAHI results: {len(res_sahi.custom_tracks)} objects")
+    print(f"SAHI results: {len(res_sahi.detections)} objects")
     
     print("Testing Engine Switching...")
     obj_detector = ObjectDetector(model_path)
@@ -0,0 +1,41 @@
+import sys
+import time
+from backend.perception.sensor import VideoSensorConfig
+from backend.perception.ffmpeg_sensor import FFmpegVideoSensor
+
+def _sensor(script, **kwargs):
+    # A python process stands in for ffmpeg: same pipe protocol, scripted behaviour
+    sensor = FFmpegVideoSensor(VideoSensorConfig(source="rtsp://camera/live", name="FFTest",
+                                                 display_size=(64, 48), proxy_size=(32, 24)), **kwargs)
+    sensor._build_command = lambda: [sys.executable, "-c", script.format(size=sensor.frame_bytes)]
+    return sensor
+
+def test_connect_fails_when_decoder_exits_without_a_frame():
+    sensor = _sensor("import sys; sys.exit(1)", connect_timeout=5.0)
+    assert not sensor.connect(), "Bad source must not report as connected"
+    assert sensor.proc is None
+
+    sensor = _sensor("import time; time.sleep(5)", connect_timeout=0.3)
+    start = time.time()
+    assert not sensor.connect() and time.time() - start < 2.0, "Silent decoder must time out"
+
+def test_first_frame_is_kept_and_dead_source_backs_off():
+    sensor = _sensor("import sys; sys.stdout.buffer.write(bytes([7]) * {size})", max_backoff=0.2)
+    assert sensor.connect()
+    try:
+        ret, display, proxy = sensor.read_scaled()
+        assert ret and (display == 7).all() and proxy.shape == (24, 32, 3), "Frame read by connect() was lost"
+
+        # The source keeps dying after one frame: restarts are spaced out (0.1, 0.2, 0.2 s), not a busy loop
+        start = time.time()
+        for _ in range(6):
+            sensor.read_scaled()
+        assert sensor.get_stats()["restarts"] == 3
+        assert time.time() - start >= 0.5, "Decoder respawned without backoff"
+    finally:
+        sensor.disconnect()
+
+if __name__ == "__main__":
+    test_connect_fails_when_decoder_exits_without_a_frame()
+    test_first_frame_is_kept_and_dead_source_backs_off()
+    print("SUCCESS: FFmpeg sensor checks passed.")
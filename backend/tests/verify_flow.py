@@ -0,0 +1,38 @@
+import types
+import numpy as np
+from backend.perception.flow import FlowPropagator
+
+def _frame(x, texture):
+    frame = np.full((480, 854, 3), 80, dtype=np.uint8)
+    frame[200:260, x:x + 40] = texture
+    return frame
+
+def test_box_follows_moving_object():
+    texture = np.random.default_rng(0).integers(0, 255, (60, 40, 3), dtype=np.uint8)
+    scale = (1.5, 1.5) # 480p proxy -> 720p display
+    results = types.SimpleNamespace(custom_tracks=[
+        {'id': 1, 'box': [150.0, 300.0, 210.0, 390.0], 'centroid': [180, 345], 'disappeared': 0}
+    ])
+
+    flow = FlowPropagator()
+    flow.reset(_frame(100, texture), results, scale)
+    propagated = results
+    for step in range(1, 8):
+        propagated = flow.propagate(_frame(100 + 4 * step, texture), propagated, scale)
+
+    x1 = propagated.custom_tracks[0]['box'][0]
+    print(f"Propagated x1={x1:.1f}, expected {(100 + 28) * 1.5}")
+    assert abs(x1 - (100 + 28) * 1.5) < 2.0, "Box did not follow the object"
+    assert results.custom_tracks[0]['box'][0] == 150.0, "Detector results must not be mutated"
+
+def test_no_tracks_is_noop():
+    flow = FlowPropagator()
+    empty = types.SimpleNamespace(custom_tracks=[])
+    frame = np.zeros((480, 854, 3), dtype=np.uint8)
+    flow.reset(frame, empty)
+    assert flow.propagate(frame, empty) is empty
+
+if __name__ == "__main__":
+    test_box_follows_moving_object()
+    test_no_tracks_is_noop()
+    print("SUCCESS: Optical flow checks passed.")
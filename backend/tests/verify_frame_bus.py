@@ -0,0 +1,37 @@
+import time
+import numpy as np
+from backend.perception.sensor import VideoSensorConfig
+from backend.perception.frame_bus import SharedFrameRing, SharedMemorySensor
+
+def _config(source="missing_clip.mp4"):
+    return VideoSensorConfig(source=source, name="BusTest", display_size=(64, 48), proxy_size=(32, 24))
+
+def test_reads_are_copies_that_outlive_the_slot():
+    sensor = SharedMemorySensor(_config(), slots=2)
+    sensor.ring = SharedFrameRing(None, 2, (64, 48), (32, 24), create=True)
+    sensor.is_active = True
+    try:
+        sensor.ring.write(np.full((48, 64, 3), 10, np.uint8), np.full((24, 32, 3), 10, np.uint8))
+        ret, display, proxy = sensor.read_scaled()
+        assert ret and display.shape == (48, 64, 3) and proxy.shape == (24, 32, 3)
+
+        # Writer laps the ring while the pipeline still holds the frame
+        for value in (20, 30, 40):
+            sensor.ring.write(np.full((48, 64, 3), value, np.uint8), np.full((24, 32, 3), value, np.uint8))
+        assert (display == 10).all() and (proxy == 10).all(), "Held frame was overwritten in shared memory"
+    finally:
+        sensor.is_active = False
+        sensor.ring.close()
+        sensor.ring.unlink()
+
+def test_connect_fails_when_worker_cannot_open_source():
+    sensor = SharedMemorySensor(_config(), slots=2, connect_timeout=30.0)
+    start = time.time()
+    assert not sensor.connect(), "Dead source must not report as connected"
+    assert not sensor.is_active and sensor.process is None and sensor.ring is None
+    assert time.time() - start < 30.0, "Worker exit should be detected before the timeout"
+
+if __name__ == "__main__":
+    test_reads_are_copies_that_outlive_the_slot()
+    test_connect_fails_when_worker_cannot_open_source()
+    print("SUCCESS: Frame bus checks passed.")
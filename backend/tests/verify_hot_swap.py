@@ -0,0 +1,117 @@
+import os
+import time
+import tempfile
+import numpy as np
+from unittest.mock import MagicMock
+from backend.perception.hot_swap import ModelSwapper, SWAPPED, FAILED, ROLLED_BACK, ROLLBACK_REQUESTED
+
+def _model(path, names=None, task="detect"):
+    model = MagicMock(model_path=path)
+    model.model.names, model.model.task = names or {0: "person", 1: "car"}, task
+    return model
+
+def _detector(candidate):
+    detector = MagicMock()
+    detector.inference_errors = 0
+    detector.advanced_model = _model("old.pt")
+    detector.model_registry.get.return_value = candidate
+    return detector
+
+def _wait(swapper, states, timeout=2.0):
+    deadline = time.time() + timeout
+    while swapper.state not in states and time.time() < deadline:
+        swapper.offer_frame(np.zeros((48, 64, 3), dtype=np.uint8))
+        swapper.on_frame() # Inference stage frame boundary
+        time.sleep(0.01)
+
+def test_swap_happens_between_frames_and_rolls_back():
+    candidate = _model("new.pt")
+    detector = _detector(candidate)
+    old = detector.advanced_model
+    swapper = ModelSwapper(detector, live_inference_ms=lambda: 10.0, shadow_frames=2, max_errors=2)
+
+    assert swapper.submit("new.pt")
+    assert not swapper.submit("other.pt"), "Second swap must wait for the first"
+    _wait(swapper, (SWAPPED, FAILED))
+    assert swapper.state == SWAPPED and detector.advanced_model is candidate
+    assert candidate.predict.call_count == 2, "Shadow inference should use the offered live frames"
+
+    detector.inference_errors = 2 # New model fails on live frames
+    swapper.on_frame()
+    assert swapper.state == ROLLED_BACK and detector.advanced_model is old
+
+def test_failed_load_keeps_current_model():
+    detector = _detector(None)
+    detector.model_registry.get.side_effect = RuntimeError("corrupt weights")
+    old = detector.advanced_model
+    swapper = ModelSwapper(detector, live_inference_ms=lambda: 10.0)
+    swapper.submit("broken.pt")
+    _wait(swapper, (FAILED,))
+    assert swapper.state == FAILED and detector.advanced_model is old
+    assert "corrupt" in swapper.get_status()["error"]
+
+def test_probation_counts_detector_frames_and_rollback_waits_for_boundary():
+    candidate = _model("new.pt")
+    detector = _detector(candidate)
+    old = detector.advanced_model
+    swapper = ModelSwapper(detector, live_inference_ms=lambda: 10.0, shadow_frames=1, probation_frames=3)
+    swapper.submit("new.pt")
+    _wait(swapper, (SWAPPED, FAILED))
+    assert detector.model_registry.get.call_args[0][1] is detector.current_backend(), "Use-case backend ignored"
+
+    for _ in range(10):
+        swapper.on_frame(ran_detector=False) # Cadence skipped the detector: no evidence
+    assert swapper.get_status()["on_probation"]
+
+    # API-thread rollback only queues; the model changes at the next frame boundary
+    assert swapper.rollback()
+    assert swapper.state == ROLLBACK_REQUESTED and detector.advanced_model is candidate
+    swapper.on_frame(ran_detector=False)
+    assert swapper.state == ROLLED_BACK and detector.advanced_model is old
+
+def test_candidate_with_other_classes_or_task_fails_validation():
+    for candidate in (_model("new.pt", names={0: "helmet"}), _model("new.pt", task="segment")):
+        detector = _detector(candidate)
+        old = detector.advanced_model
+        swapper = ModelSwapper(detector, live_inference_ms=lambda: 10.0, shadow_frames=1)
+        swapper.submit("new.pt")
+        _wait(swapper, (SWAPPED, FAILED))
+        assert swapper.state == FAILED and detector.advanced_model is old
+
+def test_staged_upload_is_installed_only_after_probation():
+    with tempfile.TemporaryDirectory() as tmp:
+        live, staged = os.path.join(tmp, "custom.pt"), os.path.join(tmp, "staged.pt")
+        # (upload, loads, errors on live frames) -> installed file afterwards
+        for content, loads, errors, installed in ((b"broken", False, 0, b"live"), (b"flaky", True, 3, b"live"),
+                                                  (b"good", True, 0, b"good")):
+            with open(live, "wb") as f:
+                f.write(b"live")
+            with open(staged, "wb") as f:
+                f.write(content)
+            detector = _detector(_model(staged))
+            if not loads:
+                detector.model_registry.get.side_effect = RuntimeError("corrupt weights")
+            swapper = ModelSwapper(detector, live_inference_ms=lambda: 10.0, shadow_frames=1, probation_frames=2)
+            assert swapper.submit(staged, install_path=live)
+            _wait(swapper, (SWAPPED, FAILED))
+            if loads:
+                with open(live, "rb") as f:
+                    assert f.read() == b"live", "Installed before probation"
+                assert swapper.busy and not swapper.submit(staged), "Staged file in use during probation"
+                detector.inference_errors = errors
+                swapper.on_frame()
+                swapper.on_frame()
+            assert not os.path.exists(staged)
+            with open(live, "rb") as f:
+                assert f.read() == installed
+            if installed == b"good":
+                detector.model_registry.rename.assert_called_once_with(staged, live)
+                assert swapper.get_status()["model_path"] == live and not swapper.busy
+
+if __name__ == "__main__":
+    test_swap_happens_between_frames_and_rolls_back()
+    test_failed_load_keeps_current_model()
+    test_probation_counts_detector_frames_and_rollback_waits_for_boundary()
+    test_candidate_with_other_classes_or_task_fails_validation()
+    test_staged_upload_is_installed_only_after_probation()
+    print("SUCCESS: Hot-swap checks passed.")
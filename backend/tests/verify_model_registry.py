@@ -0,0 +1,83 @@
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from backend.perception import model_registry
+from backend.perception.model_registry import ModelRegistry
+
+loads = []
+
+def fake_detector(model_path, backend="torch"):
+    loads.append(model_path)
+    time.sleep(0.05) # Simulated weight loading
+    model = MagicMock()
+    model.model_path = model_path
+    model.backend = backend
+    return model
+
+@patch.object(ModelRegistry, "_estimate_memory_mb", staticmethod(lambda model: 100.0))
+@patch.object(model_registry, "AdvancedDetector", side_effect=fake_detector)
+def test_lru_eviction_and_warmup(_):
+    loads.clear()
+    registry = ModelRegistry(max_models=2, max_memory_mb=1000)
+    a = registry.get("a.pt")
+    a.predict.assert_called_once() # Dummy inference after load
+    registry.get("b.pt")
+    assert registry.get("a.pt") is a, "Cached model should be reused"
+    registry.get("c.pt") # Evicts b (least recently used)
+    stats = registry.get_stats()
+    assert [m["model"] for m in stats["loaded"]] == ["a.pt", "c.pt"], stats
+    assert loads == ["a.pt", "b.pt", "c.pt"] and stats["evictions"] == 1
+
+    registry = ModelRegistry(max_models=5, max_memory_mb=250)
+    for name in ("a.pt", "b.pt", "c.pt"):
+        registry.get(name)
+    assert registry.get_stats()["memory_mb"] <= 250, "Memory cap exceeded"
+
+@patch.object(ModelRegistry, "_estimate_memory_mb", staticmethod(lambda model: 0.0))
+@patch.object(model_registry, "AdvancedDetector", side_effect=fake_detector)
+def test_concurrent_get_loads_once(_):
+    loads.clear()
+    registry = ModelRegistry()
+    registry.prewarm([("pose.pt", "torch")])
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("pose.pt"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loads == ["pose.pt"], f"Model loaded {len(loads)} times"
+    assert all(r is results[0] for r in results)
+
+@patch.object(ModelRegistry, "_estimate_memory_mb", staticmethod(lambda model: 100.0))
+@patch.object(model_registry, "AdvancedDetector", side_effect=fake_detector)
+def test_pinned_models_are_never_evicted(_):
+    registry = ModelRegistry(max_models=2, max_memory_mb=1000)
+    active = registry.get("active.pt")
+    registry.pin("active", active)
+    previous = registry.get("previous.pt")
+    registry.pin("previous", previous)
+    registry.get("c.pt")  # Over the cap, but both older models are in use
+    assert registry.get("active.pt") is active and registry.get("previous.pt") is previous
+    assert registry.get_stats()["memory_mb"] == 300.0, "Weights in use must stay counted"
+
+    registry.unpin("previous")
+    registry.get("d.pt")
+    assert [m["model"] for m in registry.get_stats()["loaded"]] == ["active.pt", "d.pt"]
+
+@patch.object(ModelRegistry, "_estimate_memory_mb", staticmethod(lambda model: 0.0))
+@patch.object(model_registry, "AdvancedDetector", side_effect=fake_detector)
+def test_rename_rekeys_installed_model(_):
+    loads.clear()
+    registry = ModelRegistry()
+    registry.get("custom.pt")
+    staged = registry.get("staging/custom.pt")
+    registry.rename("staging/custom.pt", "custom.pt")
+    assert registry.get("custom.pt") is staged and staged.model_path == "custom.pt"
+    assert loads == ["custom.pt", "staging/custom.pt"], "Installed model must not reload"
+
+if __name__ == "__main__":
+    test_lru_eviction_and_warmup()
+    test_concurrent_get_loads_once()
+    test_pinned_models_are_never_evicted()
+    test_rename_rekeys_installed_model()
+    print("SUCCESS: Model registry checks passed.")
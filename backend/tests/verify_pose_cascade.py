@@ -0,0 +1,72 @@
+import types
+import numpy as np
+from backend.perception.pose_cascade import PoseCascade
+
+class _Arr:
+    """Minimal tensor stand-in: .cpu().numpy()"""
+    def __init__(self, a):
+        self.a = np.asarray(a, dtype=np.float32)
+    def cpu(self):
+        return self
+    def numpy(self):
+        return self.a
+
+class _Boxes:
+    def __init__(self, xyxy):
+        self.xyxy = _Arr(xyxy)
+    def __len__(self):
+        return len(self.xyxy.a)
+
+class FakePoseModel:
+    def __init__(self):
+        self.calls = []
+
+    def predict_batch(self, crops, conf=0.25, imgsz=None):
+        self.calls.append(len(crops))
+        results = []
+        for crop in crops:
+            h, w = crop.shape[:2]
+            kpts = np.zeros((17, 3), dtype=np.float32)
+            kpts[:, 0], kpts[:, 1], kpts[:, 2] = w / 2, h / 2, 0.9 # Skeleton centred in the crop
+            results.append(types.SimpleNamespace(boxes=_Boxes([[0, 0, w, h]]),
+                                                 keypoints=types.SimpleNamespace(data=_Arr([kpts]))))
+        return results
+
+def _tracks():
+    return [
+        {'id': 1, 'label': 'person', 'box': [100.0, 100.0, 200.0, 300.0], 'disappeared': 0},
+        {'id': 2, 'label': 'person', 'box': [400.0, 100.0, 500.0, 300.0], 'disappeared': 0},
+        {'id': 3, 'label': 'car', 'box': [600.0, 100.0, 700.0, 300.0], 'disappeared': 0},
+    ]
+
+def test_selection_priorities():
+    cascade = PoseCascade(lambda: None, max_crops=1, refresh_interval=10.0)
+    cascade.poses[1] = {'keypoints': None, 'center': np.array([150.0, 200.0]), 'time': 0.0}
+    cascade.poses[2] = {'keypoints': None, 'center': np.array([450.0, 200.0]), 'time': 0.0}
+    assert cascade.select(_tracks(), now=1.0) == [], "Unchanged recent tracks should be skipped"
+    assert [t['id'] for t in cascade.select(_tracks(), suspicious_ids={2}, now=1.0)] == [2]
+    assert [t['id'] for t in cascade.select(_tracks(), now=20.0)] == [1], "Stale tracks refresh, capped by max_crops"
+
+def test_keypoints_attach_to_owning_track():
+    model = FakePoseModel()
+    cascade = PoseCascade(lambda: model)
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    tracks = _tracks()
+    cascade.process(frame, tracks)
+    assert model.calls == [2], "One batch with the two person crops"
+    for t in tracks[:2]:
+        cx, cy = (t['box'][0] + t['box'][2]) / 2, (t['box'][1] + t['box'][3]) / 2
+        assert np.allclose(t['keypoints'][0, :2], [cx, cy], atol=1.0), "Keypoints not in frame coordinates"
+    assert 'keypoints' not in tracks[2]
+
+    # Next frame: no new pose call, the skeleton follows the box
+    moved = _tracks()
+    moved[0]['box'] = [110.0, 100.0, 210.0, 300.0]
+    cascade.process(frame, moved)
+    assert model.calls == [2]
+    assert np.isclose(moved[0]['keypoints'][0, 0], 160.0, atol=1.0)
+
+if __name__ == "__main__":
+    test_selection_priorities()
+    test_keypoints_attach_to_owning_track()
+    print("SUCCESS: Pose cascade checks passed.")
@@ -0,0 +1,40 @@
+from backend.perception.scheduler import (
+    InferenceScheduler, REASON_ALERT, REASON_BUDGET, REASON_IDLE, REASON_STEADY, REASON_FAST_MOTION
+)
+
+def _tick(scheduler, inference_ms, centroids, alert=False, now=0.0):
+    scheduler.record_inference(inference_ms, ran_detector=True)
+    scheduler.record_inference(2.0, ran_detector=False)
+    scheduler.observe_tracks(centroids, alert=alert, now=now)
+    scheduler.record_analysis(3.0, latency_ms=50.0)
+
+def test_cadence_follows_scene():
+    scheduler = InferenceScheduler(base_interval=4, target_fps=30)
+
+    _tick(scheduler, 10.0, [(("cam", 1), 100.0, 100.0)], now=1.0)
+    assert (scheduler.interval, scheduler.reason) == (4, REASON_STEADY), scheduler.get_stats()
+
+    _tick(scheduler, 10.0, [], now=2.0)
+    assert scheduler.reason == REASON_IDLE and scheduler.interval >= 4
+
+    _tick(scheduler, 10.0, [(("cam", 1), 100.0, 100.0)], now=3.0)
+    _tick(scheduler, 10.0, [(("cam", 1), 400.0, 100.0)], now=3.5) # 600 px/s
+    assert scheduler.reason == REASON_FAST_MOTION and scheduler.interval == 2
+
+    _tick(scheduler, 10.0, [(("cam", 1), 400.0, 100.0)], alert=True)
+    assert (scheduler.interval, scheduler.reason) == (1, REASON_ALERT)
+
+def test_budget_floor_slows_expensive_model():
+    scheduler = InferenceScheduler(base_interval=1, target_fps=30)
+    for _ in range(10):
+        _tick(scheduler, 100.0, [(("cam", 1), 100.0, 100.0)], now=1.0)
+    # 100 ms inference cannot run on every 33 ms frame
+    assert scheduler.reason == REASON_BUDGET and scheduler.interval >= 4, scheduler.get_stats()
+
+    runs = sum(scheduler.should_run() for _ in range(40))
+    assert runs == 40 // scheduler.interval
+
+if __name__ == "__main__":
+    test_cadence_follows_scene()
+    test_budget_floor_slows_expensive_model()
+    print("SUCCESS: Scheduler checks passed.")
@@ -0,0 +1,114 @@
+import numpy as np
+from backend.core.config import settings
+from backend.perception.detector import ObjectDetector
+from backend.perception.slice_planner import SlicePlanner, slice_grid
+
+def _frame(obj_x=None):
+    frame = np.full((1080, 1920, 3), 90, dtype=np.uint8)
+    if obj_x is not None:
+        frame[500:540, obj_x:obj_x + 40] = 250  # Small bright object
+    return frame
+
+def _covers(tiles, x, y):
+    return any(x1 <= x < x2 and y1 <= y < y2 for x1, y1, x2, y2 in tiles)
+
+def test_grid_covers_frame():
+    tiles = slice_grid(1080, 1920, 640, 0.2)
+    assert len(tiles) == 8
+    assert (tiles[:, 2] - tiles[:, 0] == 640).all() and (tiles[:, 3] - tiles[:, 1] == 640).all()
+    assert tiles[:, 2].max() == 1920 and tiles[:, 3].max() == 1080
+    # Frames smaller than a tile get one clamped tile
+    assert slice_grid(300, 400, 640, 0.2).tolist() == [[0, 0, 400, 300]]
+
+def test_static_scene_runs_no_tiles_between_sweeps():
+    planner = SlicePlanner(slice_size=640, overlap=0.2, full_sweep_interval=10)
+    counts = [len(planner.plan(_frame())) for _ in range(20)]
+    assert counts[0] == 8, "First frame sweeps every tile"
+    assert counts[1:10] == [0] * 9, f"Static frames should run no tiles: {counts}"
+    assert counts[10] == 8, "Periodic full sweep"
+    assert planner.get_stats()["full_sweeps"] == 2
+
+def test_motion_and_detections_select_tiles():
+    planner = SlicePlanner(slice_size=640, overlap=0.2, full_sweep_interval=100, track_memory=2)
+    planner.plan(_frame(100))
+    planner.observe([])
+
+    tiles = planner.plan(_frame(130))  # Object moved near the left edge
+    assert 0 < len(tiles) < 8 and _covers(tiles, 150, 520)
+    assert not _covers(tiles, 1900, 520)
+    planner.observe([[130, 500, 170, 540]])
+
+    # Object stops: its tiles keep running while the detection is remembered, then drop out
+    held = [len(planner.plan(_frame(130))) for _ in range(3)]
+    for _ in range(3):
+        planner.observe([])
+    assert held[0] > 0
+    assert len(planner.plan(_frame(130))) == 0
+    assert planner.get_stats()["tiles_last_frame"] == 0
+
+def test_unchanged_tiles_reuse_cached_detections():
+    planner = SlicePlanner(slice_size=640, overlap=0.2, full_sweep_interval=10)
+    box = {'bbox': [130, 500, 170, 540], 'class': 0, 'confidence': 0.8, 'label': 'car'}
+    tiles = planner.plan(_frame(130))
+    planner.record([[box] if _covers([t], 150, 520) else [] for t in tiles])
+    planner.observe([box['bbox']])
+
+    # Parked object: its tiles are still selected, but served from cache without inference
+    for _ in range(3):
+        assert len(planner.plan(_frame(130))) == 0
+        planner.record([])
+        results = planner.tile_results()
+        assert [b for dets in results for b in dets] == [box, box]  # Two overlapping tiles hold it
+        planner.observe([box['bbox']])
+    assert planner.get_stats()["tiles_reused_last_frame"] == 2
+
+    # The object moves: changed tiles run again, the cache is refreshed
+    tiles = planner.plan(_frame(200))
+    assert len(tiles) == 2
+    planner.record([[] for _ in tiles])
+    assert planner.tile_results() == [[], []]
+
+class _Model:
+    pass
+
+def test_swapped_model_does_not_reuse_cached_tiles():
+    planner = SlicePlanner(slice_size=640, overlap=0.2, full_sweep_interval=10)
+    old, new = _Model(), _Model()
+    box = {'bbox': [130, 500, 170, 540], 'class': 0, 'confidence': 0.8, 'label': 'car'}
+    tiles = planner.plan(_frame(130), model=old)
+    planner.record([[box] if _covers([t], 150, 520) else [] for t in tiles])
+    planner.observe([box['bbox']])
+    assert len(planner.plan(_frame(130), model=old)) == 0, "Same model reuses its tiles"
+    planner.record([])
+    planner.observe([box['bbox']])
+
+    # Hot-swap: the parked object's tiles run on the new model instead of serving the old boxes
+    tiles = planner.plan(_frame(130), model=new)
+    assert len(tiles) == 2
+    planner.record([[] for _ in tiles])
+    assert planner.tile_results() == [[], []]
+
+def test_non_adaptive_runs_every_tile():
+    planner = SlicePlanner(slice_size=512, overlap=0.25, adaptive=False)
+    counts = {len(planner.plan(_frame())) for _ in range(5)}
+    assert counts == {len(slice_grid(1080, 1920, 512, 0.25))}
+
+def test_camera_tiles_keyed_by_source():
+    saved = settings.SAHI_CAMERA_TILES
+    settings.SAHI_CAMERA_TILES = "rtsp://yard:554/live:1024:0.1, 0:320:0.3"
+    try:
+        assert ObjectDetector._sahi_camera_tiles("rtsp://yard:554/live") == (1024, 0.1)
+        assert ObjectDetector._sahi_camera_tiles("0") == (320, 0.3)
+        assert ObjectDetector._sahi_camera_tiles("Primary") is None, "Display names are not stream ids"
+    finally:
+        settings.SAHI_CAMERA_TILES = saved
+
+if __name__ == "__main__":
+    test_grid_covers_frame()
+    test_static_scene_runs_no_tiles_between_sweeps()
+    test_motion_and_detections_select_tiles()
+    test_unchanged_tiles_reuse_cached_detections()
+    test_swapped_model_does_not_reuse_cached_tiles()
+    test_non_adaptive_runs_every_tile()
+    test_camera_tiles_keyed_by_source()
+    print("SUCCESS: Slice planner verified")
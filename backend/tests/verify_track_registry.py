@@ -0,0 +1,50 @@
+import sys
+import numpy as np
+from backend.core.models import Track
+from backend.perception.track_state import TrackState
+from backend.perception.track_registry import IndustrialTracker
+
+def _track(track_id, confidence, x=100):
+    return TrackState(id=track_id, label='person', confidence=confidence, bbox=(x, 100, x + 40, 200))
+
+def test_bounded_history_and_running_average():
+    registry = IndustrialTracker(confidence_window=10, position_window=20)
+    for i in range(1000):
+        registry.register_object(_track(1, 0.5 if i < 990 else 0.9, x=i))
+    obj = registry.object_registry[1]
+    assert abs(obj.avg_confidence - 0.9) < 1e-6, "Average covers only the last 10 samples"
+    assert obj.detection_count == 1000
+    positions = obj.positions()
+    assert len(positions) == 20 and positions[-1][0] == 999 + 20 and positions[0][0] == 980 + 20
+    size = sys.getsizeof(obj._conf) + sys.getsizeof(obj._pos)
+    registry.register_object(_track(1, 0.7))
+    assert sys.getsizeof(obj._conf) + sys.getsizeof(obj._pos) == size
+
+def test_expiry_only_removes_stale_objects():
+    registry = IndustrialTracker(lost_timeout=5.0)
+    registry.register_object(_track(1, 0.8))
+    registry.register_object(_track(2, 0.8))
+    seen = registry.object_registry[1].last_seen
+
+    # Object 1 keeps being seen, object 2 goes away
+    registry.object_registry[1].last_seen = seen + 4.0
+    registry.cleanup_lost_objects(seen + 6.0)
+    assert list(registry.object_registry) == [1]
+    assert registry.get_stats()["pending_expiry"] == 1
+
+    registry.cleanup_lost_objects(seen + 9.5)
+    assert registry.object_registry == {} and registry.expired == 2
+
+def test_track_state_serializes_to_api_schema():
+    state = TrackState(id=3, label='person', confidence=0.8, bbox=(1, 2, 3, 4), first_seen=10.0, last_seen=11.0,
+                       persistent_id='person003', status='locked', keypoints=np.ones((17, 3), dtype=np.float32))
+    data = state.to_json()
+    expected = Track(id=3, label='person', confidence=0.8, bbox=(1, 2, 3, 4), first_seen=10.0, last_seen=11.0,
+                     persistent_id='person003', status='locked', keypoints=[[1.0] * 3] * 17).model_dump(mode='json')
+    assert data == expected
+
+if __name__ == "__main__":
+    test_bounded_history_and_running_average()
+    test_expiry_only_removes_stale_objects()
+    test_track_state_serializes_to_api_schema()
+    print("SUCCESS: Track registry checks passed.")
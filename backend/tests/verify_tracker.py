@@ -0,0 +1,91 @@
+import types
+import numpy as np
+from backend.perception.tracker import CentroidTracker, ByteTracker
+from backend.perception.detector import ObjectDetector
+from backend.perception.engines.sahi import AdvancedDetector
+
+def test_det_idx_follows_matches():
+    tracker = CentroidTracker(max_disappeared=5, max_distance=100)
+    rects = [(0, 0, 20, 40), (200, 0, 220, 40), (400, 0, 420, 40)]
+    tracks = tracker.update(rects, ['person'] * 3)
+    assert [t['det_idx'] for t in tracks] == [0, 1, 2]
+
+    # Same people, detector reports them in a different order; one is missing
+    rects = [(405, 0, 425, 40), (5, 0, 25, 40)]
+    tracks = {t['id']: t for t in tracker.update(rects, ['person'] * 2)}
+    assert tracks[1]['det_idx'] == 1
+    assert tracks[2]['det_idx'] == -1 and tracks[2]['disappeared'] == 1
+    assert tracks[3]['det_idx'] == 0
+
+    # New detection registers with its own index
+    rects = [(5, 0, 25, 40), (205, 0, 225, 40), (405, 0, 425, 40), (800, 0, 820, 40)]
+    tracks = {t['id']: t for t in tracker.update(rects, ['person'] * 4)}
+    assert [tracks[i]['det_idx'] for i in (1, 2, 3, 4)] == [0, 1, 2, 3]
+
+def test_payloads_gathered_by_det_idx():
+    tracks = [{'id': 7, 'det_idx': 2}, {'id': 8, 'det_idx': -1}, {'id': 9, 'det_idx': 0}]
+    kpts = np.arange(3 * 17 * 3, dtype=np.float32).reshape(3, 17, 3)
+    ObjectDetector._gather_payloads(tracks, {'keypoints': kpts, 'confidence': np.array([0.9, 0.8, 0.7]), 'embedding': None})
+    assert np.array_equal(tracks[0]['keypoints'], kpts[2]) and tracks[0]['confidence'] == 0.7
+    assert 'keypoints' not in tracks[1] and 'confidence' not in tracks[1]
+    assert np.array_equal(tracks[2]['keypoints'], kpts[0]) and tracks[2]['confidence'] == 0.9
+    assert 'embedding' not in tracks[0]
+
+def _walkers(step):
+    """Two people walking towards each other across a corridor"""
+    a = (100 + 20 * step, 100, 140 + 20 * step, 200)
+    b = (500 - 20 * step, 110, 540 - 20 * step, 210)
+    return [a, b]
+
+def test_bytetracker_keeps_ids_through_crossing():
+    tracker = ByteTracker(max_disappeared=10)
+    ids_a, ids_b = set(), set()
+    for step in range(20):
+        rects = _walkers(step)
+        order = [1, 0] if step % 2 else [0, 1]  # Detector output order is arbitrary
+        tracks = tracker.update([rects[i] for i in order], ['person', 'person'], [0.9, 0.9])
+        for t in tracks:
+            if t['det_idx'] < 0:
+                continue
+            (ids_a if order[t['det_idx']] == 0 else ids_b).add(t['id'])
+    assert ids_a == {1} and ids_b == {2}, (ids_a, ids_b)
+
+def test_bytetracker_low_score_extends_but_never_starts_tracks():
+    tracker = ByteTracker(max_disappeared=10, high_thresh=0.5, low_thresh=0.1)
+    tracker.update([(100, 100, 140, 200)], ['person'], [0.9])
+    # Partially occluded: score dips, the track survives on the weak detection
+    tracks = tracker.update([(104, 100, 144, 200), (600, 100, 640, 200)], ['person', 'person'], [0.2, 0.3])
+    assert len(tracks) == 1
+    assert tracks[0]['id'] == 1 and tracks[0]['det_idx'] == 0 and tracks[0]['disappeared'] == 0
+
+def test_bytetracker_lost_tracks_expire():
+    tracker = ByteTracker(max_disappeared=2)
+    tracker.update([(0, 0, 10, 10)], ['car'])
+    for _ in range(3):
+        tracker.update([], [])
+    assert tracker.get_tracks() == [] and tracker.boxes == {}
+
+def test_sahi_detections_keep_ids():
+    detector = ObjectDetector.__new__(ObjectDetector)  # No model needed: only the tracking step runs
+    detector.names = {0: 'person'}
+    detector.active_engine = None
+    wrapper = types.SimpleNamespace(model=types.SimpleNamespace(names=detector.names))
+    frame = np.zeros((480, 854, 3), dtype=np.uint8)
+    tracker = ByteTracker(max_disappeared=10)
+
+    ids = []
+    for step in range(5):
+        sahi = [{'bbox': list(box), 'class': 0, 'confidence': 0.9, 'label': 'person'} for box in _walkers(step)[::-1]]
+        results = detector._track_results(AdvancedDetector._wrap_sahi_results(wrapper, sahi, frame), frame, tracker)
+        ids.append(sorted(t['id'] for t in results.custom_tracks))
+        assert all(t['confidence'] == 0.9 for t in results.custom_tracks)
+    assert ids == [ids[0]] * 5 and len(ids[0]) == 2, f"SAHI tracks should keep their IDs: {ids}"
+
+if __name__ == "__main__":
+    test_det_idx_follows_matches()
+    test_payloads_gathered_by_det_idx()
+    test_bytetracker_keeps_ids_through_crossing()
+    test_bytetracker_low_score_extends_but_never_starts_tracks()
+    test_bytetracker_lost_tracks_expire()
+    test_sahi_detections_keep_ids()
+    print("SUCCESS: Tracker match index checks passed.")
@@ -0,0 +1,69 @@
+import os
+import tempfile
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.database import Base
+from backend.core.models import Zone, Point, ObjectType
+from backend.core.zone_store import ZoneStore
+from backend.perception.zones import ZoneEngine, ZoneSet
+from backend.perception.orchestrator import PerceptionOrchestrator, StreamContext
+
+def _zone(zone_id, x=0, disallowed=(ObjectType.PERSON,)):
+    return Zone(id=zone_id, name=zone_id, type="restricted", disallowed_types=list(disallowed),
+                polygon=[Point(x=x, y=0), Point(x=x + 100, y=0), Point(x=x + 100, y=100), Point(x=x, y=100)])
+
+def _store(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return ZoneStore(sessionmaker(bind=engine))
+
+def test_zones_round_trip_through_database():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = _store(os.path.join(tmp, "zones.db"))
+        assert store.save(_zone("door"), None) == 1
+        assert store.save(_zone("valve", 200, (ObjectType.VEHICLE,)), "CAM_2") == 2
+        assert store.save(_zone("door", 50), None) == 3  # Update
+        assert store.delete("valve") == 4 and store.delete("missing") is None
+        assert store.bump() == 5  # Change without a stored row (e.g. deleting an unsaved zone)
+
+        records, version = _store(os.path.join(tmp, "zones.db")).load_all()  # "Restart"
+        assert version == 5, "Deleting the newest zone must not take the version back"
+        assert [(z.id, s) for z, s in records] == [("door", None)]
+        zone = records[0][0]
+        assert zone.polygon[0].x == 50 and zone.disallowed_types == [ObjectType.PERSON]
+
+def test_published_zone_set_is_immutable_and_versioned():
+    engine = ZoneEngine(zone_set=ZoneSet([_zone("door")], version=4))
+    snapshot = engine.zone_set
+    raster = engine.raster((720, 1280, 3))
+    assert snapshot.to_json() is snapshot.to_json(), "Serialized once per version"
+
+    engine.publish(snapshot.with_zone(_zone("door", 300)))
+    assert engine.version == 5 and len(engine.zones) == 1 and engine.zones[0].polygon[0].x == 300
+    assert snapshot.zones[0].polygon[0].x == 0 and snapshot.raster((720, 1280, 3)) is raster, "Old set untouched"
+    assert engine.raster((720, 1280, 3)) is not raster
+
+def test_zone_changes_touch_only_their_streams():
+    orch = PerceptionOrchestrator.__new__(PerceptionOrchestrator)
+    orch.zone_engine, orch.zone_records, orch.zone_version = ZoneEngine(), {}, 0
+    # Zones are scoped by stream id (camera source), not by the display name
+    orch.streams = [StreamContext(f"Camera {i}", None, None, None, ZoneEngine(), stream_id=f"CAM_{i}") for i in (1, 2)]
+    orch.load_zones([(_zone("door"), None)], version=7)
+    cam1, cam2 = orch.get_zone_set("CAM_1"), orch.get_zone_set("CAM_2")
+
+    assert orch.add_zone(_zone("valve", 200), "CAM_2", version=8) == 8
+    assert orch.get_zone_set("CAM_1") is cam1, "Untouched stream keeps its set"
+    assert [z.id for z in orch.get_zone_set("CAM_2").zones] == ["door", "valve"]
+    assert [z.id for z in orch.get_zone_set().zones] == ["door"]
+
+    orch.add_zone(_zone("valve", 200), "CAM_1")  # Moved to the other stream
+    assert [z.id for z in orch.get_zone_set("CAM_1").zones] == ["door", "valve"]
+    assert [z.id for z in orch.get_zone_set("CAM_2").zones] == ["door"]
+    assert orch.remove_zone("door") == 10 and orch.get_zone_set().zones == ()
+    assert orch.get_zone_set("CAM_9") is None and orch.get_zone_set("Camera 1") is None, "Unknown stream"
+
+if __name__ == "__main__":
+    test_zones_round_trip_through_database()
+    test_published_zone_set_is_immutable_and_versioned()
+    test_zone_changes_touch_only_their_streams()
+    print("SUCCESS: Zone store checks passed.")
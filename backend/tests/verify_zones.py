@@ -0,0 +1,111 @@
+import cv2
+import numpy as np
+from backend.core.models import Zone, Point, ObjectType
+from backend.perception.track_state import TrackState
+from backend.perception.zones import ZoneEngine
+
+def _zone(zone_id, polygon, disallowed=(ObjectType.PERSON,)):
+    return Zone(id=zone_id, name=zone_id, type="restricted",
+                polygon=[Point(x=x, y=y) for x, y in polygon], disallowed_types=list(disallowed))
+
+def _track(track_id, cx, cy, label='person'):
+    return TrackState(id=track_id, label=label, confidence=0.9, bbox=(cx - 10, cy - 20, cx + 10, cy + 20))
+
+def test_raster_matches_point_polygon_test():
+    engine = ZoneEngine()
+    polygons = [[(100, 100), (400, 120), (350, 400), (80, 300)], [(300, 50), (600, 50), (450, 350)]]
+    for i, poly in enumerate(polygons):
+        engine.add_zone(_zone(f"z{i}", poly))
+
+    rng = np.random.default_rng(0)
+    pts = rng.integers(0, 700, size=(500, 2))
+    tracks = [_track(i, int(x), int(y)) for i, (x, y) in enumerate(pts)]
+    inside = engine.zones_containing(tracks, (720, 1280, 3))
+    for (x, y), zones in zip(pts, inside):
+        expected = {f"z{i}" for i, poly in enumerate(polygons)
+                    if cv2.pointPolygonTest(np.array(poly, np.int32).reshape(-1, 1, 2), (int(x), int(y)), False) >= 0}
+        assert {z.id for z in zones} == expected, (x, y)
+
+def test_grid_candidates_cover_many_small_zones():
+    rng = np.random.default_rng(1)
+    engine = ZoneEngine()
+    polygons = []
+    for i in range(300):
+        cx, cy, r = rng.uniform(0, 1280), rng.uniform(0, 720), rng.uniform(5, 80)
+        poly = [(int(cx - r), int(cy - r)), (int(cx + r), int(cy - r // 2)), (int(cx), int(cy + r))]
+        polygons.append(poly)
+        engine.add_zone(_zone(f"z{i}", poly))
+
+    pts = rng.integers(-20, 1300, size=(400, 2))
+    tracks = [_track(i, int(x), int(y)) for i, (x, y) in enumerate(pts)]
+    inside = engine.zones_containing(tracks, (720, 1280, 3))
+    for (x, y), zones in zip(pts, inside):
+        if not (0 <= x < 1280 and 0 <= y < 720):
+            assert zones == []
+            continue
+        dist = {f"z{i}": cv2.pointPolygonTest(np.array(poly, np.int32).reshape(-1, 1, 2), (int(x), int(y)), True)
+                for i, poly in enumerate(polygons)}
+        # Rasterization is exact up to a pixel on polygon edges
+        found = {z.id for z in zones if abs(dist[z.id]) > 1}
+        assert found == {z for z, d in dist.items() if d > 1}, (x, y)
+
+def test_cache_invalidation_and_rules():
+    engine = ZoneEngine()
+    engine.add_zone(_zone("door", [(0, 0), (100, 0), (100, 100), (0, 100)]))
+    shape = (720, 1280, 3)
+    raster = engine.raster(shape)
+    assert engine.raster(shape) is raster
+    assert engine.raster((480, 854, 3)) is not raster, "Frame size change rebuilds"
+
+    events = engine.check_tracks([_track(1, 50, 50), _track(2, 50, 50, 'car'), _track(3, 500, 500)], shape)
+    assert [e.track_id for e in events] == [1]
+
+    engine.add_zone(_zone("yard", [(400, 400), (600, 400), (600, 600), (400, 600)], (ObjectType.PERSON,)))
+    events = engine.check_tracks([_track(3, 500, 500)], shape)
+    assert [e.zone_id for e in events] == ["yard"], "New zone picked up"
+
+def test_enter_dwell_exit_events_are_deduplicated():
+    engine = ZoneEngine(dwell_seconds=5.0, exit_grace=1.0, cooldown=30.0)
+    engine.add_zone(_zone("vault", [(0, 0), (200, 0), (200, 200), (0, 200)]))
+    shape = (720, 1280, 3)
+    inside, outside = _track(1, 100, 100), _track(1, 600, 600)
+
+    titles = []
+    for frame in range(300):  # 10 s at 30 fps inside the zone
+        titles += [e.title for e in engine.update([inside], shape, now=1000.0 + frame / 30)]
+    assert titles == ["Intrusion Detected: PERSON", "Dwell Limit Exceeded: PERSON"], titles
+    assert engine.occupied == 1 and engine.events_suppressed > 250
+
+    # A missed detection shorter than the grace is not an exit
+    assert engine.update([], shape, now=1010.5) == []
+    assert engine.update([inside], shape, now=1010.6) == []
+
+    events = engine.update([outside], shape, now=1012.0)
+    assert [e.title for e in events] == ["Zone Exit: PERSON"] and events[0].track_id == 1
+    assert engine.occupied == 0
+
+    # Re-entry within the cooldown is tracked but silent; a different track is not
+    events = engine.update([inside, _track(2, 50, 50)], shape, now=1015.0)
+    assert [e.track_id for e in events] == [2]
+    assert engine.occupied == 2
+
+def test_removed_zone_frees_its_slot_and_state():
+    engine = ZoneEngine(dwell_seconds=5.0, exit_grace=1.0, cooldown=30.0)
+    engine.add_zone(_zone("vault", [(0, 0), (200, 0), (200, 200), (0, 200)]))
+    shape = (720, 1280, 3)
+    for i in range(50):  # Edit cycles: add a zone, track enters, zone is deleted
+        zone_id = f"tmp{i}"
+        engine.add_zone(_zone(zone_id, [(400, 400), (600, 400), (600, 600), (400, 600)]))
+        engine.update([_track(1, 100, 100), _track(2, 500, 500)], shape, now=1000.0 + i)
+        engine.publish(engine.zone_set.without_zone(zone_id))
+        events = engine.update([_track(1, 100, 100), _track(2, 500, 500)], shape, now=1000.5 + i)
+        assert all(e.zone_id == "vault" for e in events), "Deleted zone fired an event"
+    assert len(engine._slots) == 1 and engine.occupied == 1, "Slot maps grow with every edit"
+
+if __name__ == "__main__":
+    test_raster_matches_point_polygon_test()
+    test_grid_candidates_cover_many_small_zones()
+    test_cache_invalidation_and_rules()
+    test_enter_dwell_exit_events_are_deduplicated()
+    test_removed_zone_frees_its_slot_and_state()
+    print("SUCCESS: Zone raster checks passed.")